@@ -1,3 +1,5 @@
+import importlib
+
 import streamlit as st
 
 # 设置页面配置
@@ -8,28 +10,37 @@ st.set_page_config(
     initial_sidebar_state="expanded"         # 侧边栏默认展开
 )
 
-# 导入页面逻辑（注意路径改为 "page"）
-from page.routine_dashboard import routine_dashboard_page
-from page.user_management import user_management_page
-from page.fitness_management import fitness_management_page
-from page.category_management import category_management_page
-from page.item_management import item_management_page
-from page.account_book_management import account_book_management_page
+# 初始化数据库（每个进程只执行一次，后续重新运行脚本时直接返回）
+from models.database import init_db
+init_db()
+
+from utils.instrumentation import profile_page, debug_enabled, render_debug_sidebar
+from utils.page_registry import PAGE_GROUPS
+
+
+def lazy_page(module_name, function_name):
+    """
+    页面模块在首次进入该页面时才导入（注意路径改为 "page"），开启性能面板或 JSON 日志时记录每次运行的指标
+    :param module_name: page 包下的模块名 (str)
+    :param function_name: 页面函数名 (str)
+    :return: 页面函数 (callable)
+    """
+    def run_page():
+        with profile_page(function_name) as profile:
+            page_module = importlib.import_module(f"page.{module_name}")
+            getattr(page_module, function_name)()
+        if profile is not None and debug_enabled():
+            render_debug_sidebar(profile)
+    return run_page
+
 
-# 定义页面
+# 定义页面（url_path 与原先由页面函数名推断出的路径保持一致）
 pages = {
-    "图表": [
-        st.Page(routine_dashboard_page, title="图表分析"),
-    ],
-    "主数据": [
-        st.Page(fitness_management_page, title="健身管理"),
-        st.Page(account_book_management_page, title="账单管理"),
-    ],
-    "元数据": [
-        st.Page(user_management_page, title="用户管理"),
-        st.Page(category_management_page, title="分类管理"),
-        st.Page(item_management_page, title="分类项目管理"),
-    ],
+    group: [
+        st.Page(lazy_page(module_name, function_name), title=title, url_path=function_name)
+        for module_name, function_name, title in group_pages
+    ]
+    for group, group_pages in PAGE_GROUPS.items()
 }
 
 # 创建导航
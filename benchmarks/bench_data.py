@@ -0,0 +1,39 @@
+"""基准测试共用的模拟数据：由 `python manage.py generate-data` 生成并缓存在 benchmarks/.data 下"""
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+# 模拟数据的账单行数（1000 / 100000 / 1000000）
+BENCH_ROWS_ENV = "ROUTINE_BENCH_ROWS"
+DEFAULT_BENCH_ROWS = 1000
+
+
+def bench_rows():
+    """本次基准测试使用的账单行数"""
+    return int(os.environ.get(BENCH_ROWS_ENV, DEFAULT_BENCH_ROWS))
+
+
+def prepare_database(rows):
+    """
+    生成（或复用）模拟数据，并在导入 models 之前把数据库指向它的副本（写入类的测试不会污染缓存的模拟数据）
+    :param rows: 账单行数 (int)
+    :return: 副本的数据库 URL (str)
+    """
+    seed_path = DATA_DIR / f"routine-{rows}.db"
+    if not seed_path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        subprocess.run(
+            [sys.executable, str(ROOT / "manage.py"), "generate-data", "--rows", str(rows)],
+            cwd=ROOT, check=True, env={**os.environ, "ROUTINE_DB_URL": f"sqlite:///{seed_path}"},
+        )
+    work_path = DATA_DIR / f"routine-{rows}-work.db"
+    shutil.copyfile(seed_path, work_path)
+    database_url = os.environ["ROUTINE_DB_URL"] = f"sqlite:///{work_path}"
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    return database_url
@@ -0,0 +1,46 @@
+"""
+性能基准测试：在模拟数据的 SQLite 数据库上测量模型和图表页面的热点路径
+    pytest benchmarks                                          # 默认 1000 行账单
+    ROUTINE_BENCH_ROWS=100000 pytest benchmarks                # 10 万行
+    ROUTINE_BENCH_ROWS=1000000 pytest benchmarks --benchmark-autosave   # 100 万行并保存结果
+    pytest-benchmark compare                                   # 与之前保存的结果对比
+模拟数据由 `python manage.py generate-data` 生成并缓存在 benchmarks/.data 下，每次测试使用它的副本。
+页面重新运行耗时见 benchmarks/page_latency.py。
+"""
+import pytest
+
+from bench_data import bench_rows, prepare_database
+
+
+def pytest_configure(config):
+    """生成（或复用）模拟数据，并在导入 models 之前把数据库指向它的副本"""
+    prepare_database(bench_rows())
+
+
+@pytest.fixture(scope="session")
+def user_id():
+    """模拟数据中的第一个用户"""
+    from models.database import init_db
+    from models.metadata_index import get_metadata_index
+    init_db()
+    return next(iter(get_metadata_index().users))
+
+
+@pytest.fixture
+def cold():
+    """
+    包装查询函数，每次调用前清空查询缓存和训练日历，测量不命中缓存的耗时
+    用法：benchmark(cold(summarize_account_books), user_id, start, end)
+    """
+    from models.cache import clear_cache
+    from utils import fitness_analytics
+
+    def wrap(func):
+        def run(*args, **kwargs):
+            clear_cache()
+            with fitness_analytics._calendars_lock:
+                fitness_analytics._calendars.clear()
+            return func(*args, **kwargs)
+        return run
+
+    return wrap
@@ -0,0 +1,231 @@
+"""
+页面重新运行耗时回归测试：用 streamlit.testing.v1.AppTest 在模拟数据上逐个驱动 utils/page_registry.py 中注册的页面，
+切换用户、时间单位和年月，提交侧边栏表单，记录每次交互的重新运行耗时和内存峰值（相对运行前已分配内存的增量）
+    python benchmarks/page_latency.py --rows 100000 --output latency.json
+    python benchmarks/page_latency.py --rows 100000 --compare latency.json   # 与之前的报告对比，变慢超过阈值时返回 1
+内存峰值由 tracemalloc 统计，开启后耗时比正常运行偏高，报告只用于同一台机器上的前后对比。
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from bench_data import bench_rows, prepare_database
+
+# 变慢超过该比例时视为回归
+DEFAULT_THRESHOLD = 0.2
+
+# 每次重新运行的超时时间（秒）
+RUN_TIMEOUT = 300
+
+# 与 app.py 的 lazy_page 相同的页面入口
+PAGE_SCRIPT = """
+import importlib
+from models.database import init_db
+init_db()
+page_module = importlib.import_module("page.{module}")
+page_module.{function}()
+"""
+
+
+def _widget(at, kind, label=None, key=None):
+    """按 key 或标签查找控件，有多个同名控件时返回第一个，找不到时返回 None"""
+    widgets = getattr(at, kind)
+    if key is not None:
+        return next((widget for widget in widgets if widget.key == key), None)
+    return next((widget for widget in widgets if widget.label == label), None)
+
+
+def _select_next(widget):
+    """选中下拉列表的下一个选项（只有一个选项时不变）"""
+    if widget is not None and widget.options:
+        widget.select_index((widget.options.index(widget.value) + 1) % len(widget.options) if widget.value in widget.options else 0)
+
+
+def _set_value(widget, value):
+    if widget is not None:
+        widget.set_value(value)
+
+
+def _click(widget):
+    if widget is not None and not widget.disabled:
+        widget.click()
+
+
+def _submit_account_book_form(at):
+    expense = _widget(at, "number_input", label="支出金额")
+    if expense is not None:
+        expense.set_value(12.5)
+    _click(_widget(at, "button", label="提交"))
+
+
+def _submit_fitness_form(at):
+    activities = _widget(at, "multiselect", label="健身活动（多选）")
+    if activities is not None:
+        activities.set_value(["有氧"])
+    _click(_widget(at, "button", label="提交"))
+
+
+# 每个页面的交互：(交互名称, 修改控件的函数)，每次交互后重新运行页面
+INTERACTIONS = {
+    "routine_dashboard_page": [
+        ("切换用户", lambda at: (_select_next(_widget(at, "selectbox", key="fitness_user_selector")),
+                                _select_next(_widget(at, "selectbox", key="account_book_user_select")))),
+        ("按年查看", lambda at: (_set_value(_widget(at, "radio", label="时间单位"), "按年查看"),
+                                _set_value(_widget(at, "radio", key="bill_time_unit"), "按年查看"))),
+        ("按月查看", lambda at: (_set_value(_widget(at, "radio", label="时间单位"), "按月查看"),
+                                _set_value(_widget(at, "radio", key="bill_time_unit"), "按月查看"))),
+        ("切换月份", lambda at: (_select_next(_widget(at, "selectbox", key="fitness_month_selector")),
+                                _select_next(_widget(at, "selectbox", key="account_book_month_selector")))),
+        ("切换趋势范围", lambda at: (_set_value(_widget(at, "selectbox", key="fitness_trend_months"), 24),
+                                  _set_value(_widget(at, "selectbox", key="account_book_trend_months"), 24))),
+    ],
+    "fitness_management_page": [
+        ("切换用户", lambda at: _select_next(_widget(at, "selectbox", key="fitness_user_selector"))),
+        ("按年查看", lambda at: _set_value(_widget(at, "radio", label="时间单位"), "按年查看")),
+        ("按月查看", lambda at: _set_value(_widget(at, "radio", label="时间单位"), "按月查看")),
+        ("切换月份", lambda at: _select_next(_widget(at, "selectbox", key="fitness_month_selector"))),
+        ("提交健身打卡", _submit_fitness_form),
+    ],
+    "account_book_management_page": [
+        ("切换用户", lambda at: _select_next(_widget(at, "selectbox", label="选择用户"))),
+        ("按年查看", lambda at: _set_value(_widget(at, "radio", label="时间单位"), "按年查看")),
+        ("下一页", lambda at: _click(_widget(at, "button", key="account_book_next_page"))),
+        ("按月查看", lambda at: _set_value(_widget(at, "radio", label="时间单位"), "按月查看")),
+        ("切换月份", lambda at: _select_next(_widget(at, "selectbox", key="account_book_management_month_selector"))),
+        ("提交账单", _submit_account_book_form),
+    ],
+}
+
+
+def _timed_run(at):
+    """重新运行一次页面，返回 (耗时秒数, 运行期间的内存峰值增量字节数)"""
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    at.run(timeout=RUN_TIMEOUT)
+    seconds = time.perf_counter() - started
+    return seconds, tracemalloc.get_traced_memory()[1] - before
+
+
+def run_page(module, function):
+    """
+    驱动一个页面：首次加载后依次执行该页面的交互
+    :return: [(交互名称, 耗时秒数, 内存峰值增量字节数, 异常信息)] (list of tuple)
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(PAGE_SCRIPT.format(module=module, function=function), default_timeout=RUN_TIMEOUT)
+    results = []
+    for name, interact in [("首次加载", None)] + INTERACTIONS.get(function, []):
+        if interact is not None:
+            interact(at)
+        seconds, peak = _timed_run(at)
+        results.append((name, seconds, peak, "; ".join(e.message for e in at.exception)))
+    return results
+
+
+def measure(repeat):
+    """
+    每个页面驱动 repeat 遍，取每次交互耗时的中位数和内存峰值的最大值
+    :return: 报告中的结果列表 (list of dict)
+    """
+    from utils.page_registry import iter_pages  # prepare_database 把项目根目录加入 sys.path 之后才能导入
+
+    samples = {}
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            for module, function, _title in iter_pages():
+                for name, seconds, peak, error in run_page(module, function):
+                    sample = samples.setdefault((function, name), {"seconds": [], "peak": [], "errors": set()})
+                    sample["seconds"].append(seconds)
+                    sample["peak"].append(peak)
+                    if error:
+                        sample["errors"].add(error)
+    finally:
+        tracemalloc.stop()
+    return [
+        {
+            "page": function,
+            "interaction": name,
+            "median_ms": round(statistics.median(sample["seconds"]) * 1000, 2),
+            "min_ms": round(min(sample["seconds"]) * 1000, 2),
+            "peak_kib": round(max(sample["peak"]) / 1024, 1),
+            "errors": sorted(sample["errors"]),
+        }
+        for (function, name), sample in samples.items()
+    ]
+
+
+def compare(results, baseline, threshold):
+    """
+    与之前的报告对比，为每个结果补充 baseline_ms 和 change，返回变慢超过阈值的结果
+    :param results: 本次结果 (list of dict)
+    :param baseline: 之前的报告 (dict)
+    :param threshold: 回归阈值 (float)
+    :return: 回归的结果 (list of dict)
+    """
+    previous = {(result["page"], result["interaction"]): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["page"], result["interaction"]))
+        if before is None or not before["median_ms"]:
+            continue
+        result["baseline_ms"] = before["median_ms"]
+        result["change"] = round(result["median_ms"] / before["median_ms"] - 1, 3)
+        if result["change"] > threshold:
+            regressions.append(result)
+    return regressions
+
+
+def print_report(report):
+    print(f"账单行数: {report['rows']}  重复次数: {report['repeat']}  Streamlit {report['streamlit']}")
+    print(f"{'页面':<32}{'交互':<14}{'中位数(ms)':>12}{'最小(ms)':>12}{'内存峰值(KiB)':>16}{'对比':>10}")
+    for result in report["results"]:
+        change = f"{result['change']:+.0%}" if "change" in result else ""
+        print(f"{result['page']:<32}{result['interaction']:<14}{result['median_ms']:>12.1f}{result['min_ms']:>12.1f}"
+              f"{result['peak_kib']:>16.1f}{change:>10}")
+        for error in result["errors"]:
+            print(f"    异常: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="页面重新运行耗时回归测试")
+    parser.add_argument("--rows", type=int, default=bench_rows(), help="模拟数据的账单行数")
+    parser.add_argument("--repeat", type=int, default=3, help="每个页面驱动的遍数")
+    parser.add_argument("--output", help="把报告保存为 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 报告对比")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="中位数变慢超过该比例时视为回归")
+    args = parser.parse_args(argv)
+
+    prepare_database(args.rows)
+    import streamlit
+
+    report = {
+        "rows": args.rows,
+        "repeat": args.repeat,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "results": measure(args.repeat),
+    }
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report["results"], json.load(f), args.threshold)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    for result in regressions:
+        print(f"回归: {result['page']} {result['interaction']} {result['baseline_ms']:.1f} ms -> {result['median_ms']:.1f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
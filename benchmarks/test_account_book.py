@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import count
+
+from models.account_book_model import add_account_book, generate_account_book_id, get_all_account_books
+
+
+def _distinct_days():
+    """每轮使用不同的日期，避免用完同一天的 4 位账单序号（模拟数据中没有这些日期的账单）"""
+    days = (date(2100, 1, 1) + timedelta(days=offset) for offset in count())
+    return lambda: ((next(days),), {})
+
+
+def test_add_account_book(benchmark, user_id):
+    benchmark.pedantic(
+        lambda day: add_account_book(day, "20", "2001", Decimal("12.50"), user_id=user_id),
+        setup=_distinct_days(), rounds=200,
+    )
+
+
+def test_generate_account_book_id(benchmark):
+    benchmark.pedantic(generate_account_book_id, setup=_distinct_days(), rounds=1000)
+
+
+def test_get_all_account_books(benchmark):
+    books = benchmark.pedantic(get_all_account_books, rounds=3)
+    assert books
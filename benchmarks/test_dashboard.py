@@ -0,0 +1,31 @@
+from datetime import date
+
+from models.account_book_model import get_account_book_monthly_trend, summarize_account_books
+from models.fitness_model import get_fitness_activity_counts, get_fitness_monthly_days
+from utils.helpers import get_period_bounds, get_recent_months, get_month_bounds
+
+# 图表页面的默认选择：今年的汇总和最近 12 个月的趋势
+YEAR = date.today().year
+RECENT_MONTHS = get_recent_months(12)
+
+
+def test_summarize_account_books(benchmark, cold, user_id):
+    summary = benchmark(cold(summarize_account_books), user_id, *get_period_bounds(YEAR, None))
+    assert summary["has_records"]
+
+
+def test_summarize_account_books_cached(benchmark, user_id):
+    benchmark(summarize_account_books, user_id, *get_period_bounds(YEAR, None))
+
+
+def test_account_book_monthly_trend(benchmark, cold, user_id):
+    trend = benchmark(cold(get_account_book_monthly_trend), user_id, RECENT_MONTHS[0], RECENT_MONTHS[-1])
+    assert trend
+
+
+def test_fitness_monthly_days(benchmark, cold, user_id):
+    benchmark(cold(get_fitness_monthly_days), user_id, *get_month_bounds(RECENT_MONTHS[0], RECENT_MONTHS[-1]))
+
+
+def test_fitness_activity_counts(benchmark, cold, user_id):
+    benchmark(cold(get_fitness_activity_counts), user_id, *get_period_bounds(YEAR, None))
@@ -0,0 +1,15 @@
+from datetime import date
+
+from utils.fitness_analytics import calculate_training_frequency
+from utils.helpers import get_period_bounds
+
+YEAR = date.today().year
+
+
+def test_calculate_training_frequency(benchmark, cold, user_id):
+    training_days, total_days, _ = benchmark(cold(calculate_training_frequency), user_id, *get_period_bounds(YEAR, None))
+    assert 0 < training_days <= total_days
+
+
+def test_calculate_training_frequency_warm(benchmark, user_id):
+    benchmark(calculate_training_frequency, user_id, *get_period_bounds(YEAR, None))
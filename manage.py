@@ -0,0 +1,107 @@
+import argparse
+
+
+def rebuild_summary(args):
+    """从账单表重新计算月度汇总表"""
+    from models.account_book_model import rebuild_account_book_monthly_summary
+    count = rebuild_account_book_monthly_summary()
+    print(f"月度汇总重建完成，共 {count} 行。")
+
+
+def import_csv(args):
+    """流式导入 CSV 账单"""
+    from utils.importer import import_account_books_csv
+    default_user_id = None
+    if args.user:
+        from models.user_model import get_all_users
+        users = {user.username: user.user_id for user in get_all_users()}
+        default_user_id = users.get(args.user, args.user)
+    report = import_account_books_csv(
+        args.path,
+        chunk_size=args.chunk_size,
+        encoding=args.encoding,
+        default_user_id=default_user_id,
+        progress=lambda r: print(f"已导入 {r.rows_imported} 行（{r.rows_per_second:.0f} 行/秒）"),
+    )
+    for line_number, message in report.errors:
+        print(f"第 {line_number} 行: {message}")
+    print(report)
+
+
+def export(args):
+    """流式导出账单或健身记录"""
+    from datetime import date
+    from utils.exporter import export_account_books, export_fitness
+    exporter = export_account_books if args.table == "account_book" else export_fitness
+    count = exporter(
+        args.path,
+        fmt=args.format,
+        user_id=args.user,
+        start=date.fromisoformat(args.start) if args.start else None,
+        end=date.fromisoformat(args.end) if args.end else None,
+        batch_size=args.batch_size,
+    )
+    print(f"导出完成，共 {count} 行。")
+
+
+def generate_data(args):
+    """向空数据库写入可复现的模拟数据"""
+    from utils.synthetic_data import generate_synthetic_data
+    counts = generate_synthetic_data(
+        args.rows,
+        users=args.users,
+        years=args.years,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        progress=lambda table, count: print(f"{table}: 已写入 {count} 行"),
+    )
+    print(f"模拟数据生成完成：{counts}")
+
+
+def main(argv=None):
+    """命令行入口：python manage.py <命令>"""
+    parser = argparse.ArgumentParser(description="Routine 管理命令")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # 重建账单月度汇总表
+    rebuild_parser = subparsers.add_parser("rebuild-summary", help="从账单表重新计算账单月度汇总表")
+    rebuild_parser.set_defaults(func=rebuild_summary)
+
+    # 流式导入 CSV 账单
+    import_parser = subparsers.add_parser("import-csv", help="分批导入 CSV 账单（支持任意大小的文件）")
+    import_parser.add_argument("path", help="CSV 文件路径")
+    import_parser.add_argument("--chunk-size", type=int, default=5000, help="每批导入的行数")
+    import_parser.add_argument("--encoding", default="utf-8-sig", help="文件编码，银行流水常用 gbk")
+    import_parser.add_argument("--user", help="未指定用户的行归属的用户名或用户 ID")
+    import_parser.set_defaults(func=import_csv)
+
+    # 流式导出账单或健身记录
+    export_parser = subparsers.add_parser("export", help="流式导出账单或健身记录为 CSV/Parquet")
+    export_parser.add_argument("table", choices=["account_book", "fitness"], help="导出的数据表")
+    export_parser.add_argument("path", help="导出文件路径")
+    export_parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="导出格式")
+    export_parser.add_argument("--user", help="只导出该用户 ID 的记录")
+    export_parser.add_argument("--start", help="起始日期，格式 YYYY-MM-DD")
+    export_parser.add_argument("--end", help="截止日期，格式 YYYY-MM-DD")
+    export_parser.add_argument("--batch-size", type=int, default=5000, help="每批读取的行数")
+    export_parser.set_defaults(func=export)
+
+    # 生成模拟数据
+    generate_parser = subparsers.add_parser("generate-data", help="向空数据库写入可复现的模拟数据（用于性能测试）")
+    generate_parser.add_argument("--rows", type=int, default=100000, help="账单行数")
+    generate_parser.add_argument("--users", type=int, default=3, help="用户数量")
+    generate_parser.add_argument("--years", type=int, default=3, help="数据覆盖的年数（每个用户每天一条健身记录）")
+    generate_parser.add_argument("--seed", type=int, default=42, help="随机数种子，相同种子生成相同数据")
+    generate_parser.add_argument("--chunk-size", type=int, default=10000, help="每批写入的行数")
+    generate_parser.set_defaults(func=generate_data)
+
+    args = parser.parse_args(argv)
+
+    # 初始化数据库
+    from models.database import init_db
+    init_db()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,29 @@
 # 导入数据库连接和初始化逻辑
-from .database import engine, SessionLocal, Base, init_db
+from .database import engine, SessionLocal, Base, init_db, session_scope
+
+# 导入查询缓存
+from .cache import cached_query, invalidate_tables, clear_cache
 
 # 导入用户模型和相关操作
 from .user_model import User, add_user, get_all_users, update_user, delete_user
 
 # 导入健身记录模型和相关操作
-from .fitness_model import Fitness, add_fitness, get_all_fitness, update_fitness, delete_fitness
+from .fitness_model import Fitness, FitnessActivity, add_fitness, upsert_fitness, upsert_fitness_records, get_all_fitness, search_fitness, get_fitness_months, get_fitness_activity_counts, get_fitness_monthly_days, update_fitness, delete_fitness
 
 # 导入分类模型和相关操作
-from .category_model import Category, add_category, get_all_categories, get_category_by_id, update_category, delete_category
+from .category_model import Category, add_category, get_all_categories, search_categories, get_category_by_id, update_category, delete_category
 
 # 导入项目模型和相关操作
-from .item_model import Item, add_item, get_all_items, get_item_by_id, update_item, delete_item
+from .item_model import Item, add_item, get_all_items, search_items, get_item_by_id, update_item, delete_item
 
 # 导入账单模型和相关操作
-from .account_book_model import AccountBook, add_account_book, get_all_account_books, get_account_book_by_id, update_account_book, delete_account_book
+from .account_book_model import AccountBook, AccountBookSequence, adjust_salary_date, compute_accounting_date, add_account_book, generate_account_book_id, reserve_account_book_ids, reserve_account_book_id_blocks, add_account_books, get_all_account_books, get_account_books, get_account_books_page, get_account_book_months, get_account_book_category_totals, get_account_book_monthly_trend, summarize_account_books, rebuild_account_book_monthly_summary, search_account_books, get_account_book_by_id, update_account_book, delete_account_book
+
+# 导入分类、项目和用户的内存索引
+from .metadata_index import MetadataIndex, get_metadata_index
+
+# 导入账单月度汇总模型
+from .account_book_summary_model import AccountBookMonthlySummary
 
 # 初始化数据库表结构
 def initialize_database():
@@ -27,31 +36,62 @@ __all__ = [
     "SessionLocal",
     "Base",
     "init_db",
+    "session_scope",
+    "cached_query",
+    "invalidate_tables",
+    "clear_cache",
     "User",
     "add_user",
     "get_all_users",
     "update_user",
     "delete_user",
     "Fitness",
+    "FitnessActivity",
     "add_fitness",
+    "upsert_fitness",
+    "upsert_fitness_records",
     "get_all_fitness",
+    "search_fitness",
+    "get_fitness_months",
+    "get_fitness_activity_counts",
+    "get_fitness_monthly_days",
     "update_fitness",
     "delete_fitness",
     "Category",
     "add_category",
     "get_all_categories",
+    "search_categories",
     "get_category_by_id",
     "update_category",
     "delete_category",
     "Item",
     "add_item",
     "get_all_items",
+    "search_items",
     "get_item_by_id",
     "update_item",
     "delete_item",
     "AccountBook",
+    "AccountBookSequence",
+    "adjust_salary_date",
+    "compute_accounting_date",
+    "generate_account_book_id",
+    "reserve_account_book_ids",
+    "reserve_account_book_id_blocks",
     "add_account_book",
+    "add_account_books",
     "get_all_account_books",
+    "get_account_books",
+    "get_account_books_page",
+    "get_account_book_months",
+    "get_account_book_category_totals",
+    "get_account_book_monthly_trend",
+    "summarize_account_books",
+    "rebuild_account_book_monthly_summary",
+    "AccountBookMonthlySummary",
+    "MetadataIndex",
+    "get_metadata_index",
+    "search_account_books",
     "get_account_book_by_id",
     "update_account_book",
     "delete_account_book",
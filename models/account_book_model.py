@@ -1,15 +1,36 @@
-import uuid
-from sqlalchemy import Column, String, Date, DECIMAL, TIMESTAMP, func, ForeignKey
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import Column, Date, DECIMAL, Integer, TIMESTAMP, Index, func, ForeignKey, select, update, delete, bindparam, case, cast, extract, and_, or_
 from sqlalchemy.dialects.mysql import CHAR, VARCHAR
 from sqlalchemy.orm import relationship
-from models.database import Base, SessionLocal
+from models.database import Base, session_scope, build_upsert, migration, to_id_list, check_rowcount
+from models.cache import cached_query, invalidate_on_commit
+from utils.helpers import parse_date_query, SEARCH_LIMIT
+from models.account_book_summary_model import (
+    AccountBookMonthlySummary, summary_delta, apply_summary_deltas, get_monthly_category_totals, clear_monthly_summary
+)
+
+# 收入分类：该分类下的账单计为收入，其余分类计为支出
+INCOME_CATEGORY_ID = '13'
+
+# 会影响记账日期或月度汇总的账单字段
+SUMMARY_FIELDS = {"date", "category_id", "item_id", "expense", "refund", "user_id"}
+
+# 工资项目：当月 20 日（含）之前发放的工资计入上个月
+SALARY_ITEM_ID = '1301'
+SALARY_CUTOFF_DAY = 20
 
 class AccountBook(Base):
     __tablename__ = 'account_book'
+    __table_args__ = (
+        Index('ix_account_book_user_date', 'user_id', 'date'),  # 按用户和日期范围查询账单
+        Index('ix_account_book_user_accounting_date', 'user_id', 'accounting_date'),  # 按用户和账期范围查询账单
+    )
 
     # 定义字段
     account_book_id = Column(VARCHAR(20), primary_key=True, nullable=False)  # 自定义递增 ID
     date = Column(Date, nullable=False)  # 日期
+    accounting_date = Column(Date, nullable=True)  # 记账日期：工资按调整后的日期记账，其余与 date 相同，写入时计算
     category_id = Column(CHAR(36), ForeignKey('category.category_id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)  # 外键关联到 category 表
     item_id = Column(CHAR(36), ForeignKey('item.item_id', ondelete='CASCADE', onupdate='RESTRICT'), nullable=False)  # 外键关联到 item 表
     expense = Column(DECIMAL(10, 2), nullable=False)  # 支出金额
@@ -24,6 +45,13 @@ class AccountBook(Base):
     item = relationship("Item", back_populates="account_books")
     user = relationship("User", back_populates="account_books")
 
+class AccountBookSequence(Base):
+    __tablename__ = 'account_book_sequence'
+
+    # 定义字段：每天一行，记录当天已分配的最大序号
+    seq_date = Column(Date, primary_key=True, nullable=False)  # 账单 ID 的日期部分
+    last_value = Column(Integer, nullable=False, default=0)  # 当天已分配的最大序号
+
 # 在 Category、Item 和 User 模型中添加反向关系（如果尚未定义）
 from models.category_model import Category
 from models.item_model import Item
@@ -34,22 +62,221 @@ Item.account_books = relationship("AccountBook", order_by=AccountBook.date, back
 User.account_books = relationship("AccountBook", order_by=AccountBook.date, back_populates="user")
 
 
+@migration
+def seed_account_book_sequence(session):
+    """
+    序号表为空时，根据已有账单 ID 初始化每天的最大序号（兼容序号表创建之前的历史数据）
+    :param session: 当前会话 (Session)
+    """
+    if session.execute(select(AccountBookSequence.seq_date).limit(1)).first() is not None:
+        return
+    prefix = func.substr(AccountBook.account_book_id, 1, 8)
+    rows = session.execute(
+        select(prefix, func.max(cast(func.substr(AccountBook.account_book_id, 9), Integer)))
+        .group_by(prefix)
+    ).all()
+    if rows:
+        session.execute(
+            AccountBookSequence.__table__.insert(),
+            [{"seq_date": datetime.strptime(day, "%Y%m%d").date(), "last_value": last_value} for day, last_value in rows]
+        )
+
+
+def adjust_salary_date(record_date):
+    """
+    调整工资日期为发放月份的前一个月的最后一天。
+    :param record_date: 工资发放的实际日期
+    :return: 调整后的日期
+    """
+    # 获取发放月份的第一天
+    first_day_of_month = record_date.replace(day=1)
+    # 前一个月的最后一天 = 当前月份第一天 - 1天
+    last_day_of_previous_month = first_day_of_month - timedelta(days=1)
+    return last_day_of_previous_month
+
+
+def compute_accounting_date(record_date, item_id):
+    """
+    计算账单的记账日期：20 日（含）之前发放的工资计入上个月的最后一天，其余账单按实际日期记账
+    :param record_date: 账单日期 (datetime.date)
+    :param item_id: 项目 ID (str)
+    :return: 记账日期 (datetime.date)
+    """
+    if item_id == SALARY_ITEM_ID and record_date.day <= SALARY_CUTOFF_DAY:
+        return adjust_salary_date(record_date)
+    return record_date
+
+
+@migration
+def backfill_accounting_date(session):
+    """
+    为新增 accounting_date 列之前写入的账单补齐记账日期
+    :param session: 当前会话 (Session)
+    """
+    is_early_salary = and_(
+        AccountBook.item_id == SALARY_ITEM_ID,
+        extract('day', AccountBook.date) <= SALARY_CUTOFF_DAY
+    )
+    # 普通账单直接使用实际日期；显式保留 updated_at，避免 onupdate 把历史账单的更新时间全部改成迁移时间
+    session.execute(
+        update(AccountBook)
+        .where(AccountBook.accounting_date.is_(None), ~is_early_salary)
+        .values(accounting_date=AccountBook.date, updated_at=AccountBook.updated_at)
+    )
+    # 工资账单数量很少，逐条计算调整后的日期
+    rows = session.execute(
+        select(AccountBook.account_book_id, AccountBook.date)
+        .where(AccountBook.accounting_date.is_(None))
+    ).all()
+    if rows:
+        session.execute(
+            update(AccountBook.__table__)
+            .where(AccountBook.__table__.c.account_book_id == bindparam("b_account_book_id"))
+            .values(accounting_date=bindparam("b_accounting_date"), updated_at=AccountBook.__table__.c.updated_at),
+            [{"b_account_book_id": account_book_id, "b_accounting_date": adjust_salary_date(record_date)} for account_book_id, record_date in rows]
+        )
+
+
+def rebuild_account_book_monthly_summary():
+    """
+    根据账单表从头重新计算月度汇总表（用于修复汇总数据）
+    :return: 汇总行数 (int)
+    """
+    with session_scope() as session:
+        invalidate_on_commit(session, "account_book_monthly_summary")
+        clear_monthly_summary(session)
+        year = extract('year', AccountBook.accounting_date)
+        month = extract('month', AccountBook.accounting_date)
+        rows = session.execute(
+            select(
+                AccountBook.user_id, year, month, AccountBook.category_id,
+                func.sum(AccountBook.expense), func.sum(func.coalesce(AccountBook.refund, 0)), func.count()
+            )
+            .group_by(AccountBook.user_id, year, month, AccountBook.category_id)
+        ).all()
+        summary_rows = [
+            {
+                "user_id": user_id or '',
+                "year_month": f"{int(y)}-{int(m):02d}",
+                "category_id": category_id,
+                "expense": Decimal(str(expense or 0)),
+                "refund": Decimal(str(refund or 0)),
+                "record_count": record_count,
+            }
+            for user_id, y, m, category_id, expense, refund, record_count in rows
+        ]
+        # 未关联用户的账单和已关联用户的账单可能落在同一汇总键上，合并后写入
+        apply_summary_deltas(session, summary_rows)
+        return len(summary_rows)
+
+
+@migration
+def seed_account_book_monthly_summary(session):
+    """
+    月度汇总表为空而账单表有数据时（汇总表刚创建），从账单表生成汇总
+    :param session: 当前会话 (Session)
+    """
+    if session.execute(select(AccountBookMonthlySummary.user_id).limit(1)).first() is not None:
+        return
+    if session.execute(select(AccountBook.account_book_id).limit(1)).first() is None:
+        return
+    rebuild_account_book_monthly_summary()
+
+
+# 只读列表使用的列投影（其他模型的 *_ROW_COLUMNS 同理）：查询返回轻量的 Row（具名元组），不构造和跟踪 ORM 对象
+ACCOUNT_BOOK_ROW_COLUMNS = (
+    AccountBook.account_book_id,
+    AccountBook.date,
+    AccountBook.accounting_date,
+    AccountBook.category_id,
+    AccountBook.item_id,
+    (AccountBook.expense - func.coalesce(AccountBook.refund, 0)).label("amount"),  # 实际金额 = 支出金额 - 退款金额
+    AccountBook.remarks,
+    AccountBook.user_id,
+)
+
+# 带分类、项目名称和用户名的只读列投影，与 _labelled_account_book_select 的连接配合使用
+ACCOUNT_BOOK_LABEL_COLUMNS = ACCOUNT_BOOK_ROW_COLUMNS + (
+    Category.name.label("category_name"),
+    Item.name.label("item_name"),
+    User.username.label("username"),
+)
+
+def _account_book_select(with_labels=False):
+    """
+    构造账单只读查询：with_labels 为 True 时左连接分类、项目和用户表，在同一条查询中带出名称
+    :param with_labels: 是否带出分类、项目名称和用户名 (bool)
+    :return: 查询语句 (Select)
+    """
+    if not with_labels:
+        return select(*ACCOUNT_BOOK_ROW_COLUMNS)
+    return (
+        select(*ACCOUNT_BOOK_LABEL_COLUMNS)
+        .select_from(AccountBook)
+        .outerjoin(Category, Category.category_id == AccountBook.category_id)
+        .outerjoin(Item, Item.item_id == AccountBook.item_id)
+        .outerjoin(User, User.user_id == AccountBook.user_id)
+    )
+
+
 # CRUD 操作
+def reserve_account_book_id_blocks(counts):
+    """
+    原子地为多个日期分别分配一段连续的账单 ID（批量导入使用），并发写入时也不会重复
+    :param counts: {账单日期: 需要分配的 ID 数量} (dict of datetime.date -> int)
+    :return: {账单日期: 新的账单 ID 列表} (dict of datetime.date -> list of str)
+    """
+    if not counts:
+        return {}
+    with session_scope() as session:
+        table = AccountBookSequence.__table__
+        # 一条批量插入或更新语句递增所有日期的序号，这些行在事务提交前一直被锁定
+        session.execute(
+            build_upsert(
+                session, table, None, ["seq_date"],
+                lambda new: {"last_value": table.c.last_value + new.last_value}
+            ),
+            [{"seq_date": seq_date, "last_value": count} for seq_date, count in counts.items()]
+        )
+        last_values = dict(session.execute(
+            select(table.c.seq_date, table.c.last_value).where(table.c.seq_date.in_(list(counts)))
+        ).all())
+        # 生成新的 ID，格式为 YYYYMMDD + 四位递增数字
+        blocks = {}
+        for seq_date, count in counts.items():
+            prefix = seq_date.strftime('%Y%m%d')
+            last_value = last_values[seq_date]
+            blocks[seq_date] = [f"{prefix}{str(value).zfill(4)}" for value in range(last_value - count + 1, last_value + 1)]
+        return blocks
+
+
+def reserve_account_book_ids(date, count=1):
+    """
+    原子地为指定日期分配一段连续的账单 ID，并发写入时也不会重复
+    :param date: 账单日期 (datetime.date)
+    :param count: 需要分配的 ID 数量 (int)
+    :return: 新的账单 ID 列表 (list of str)
+    """
+    with session_scope() as session:
+        table = AccountBookSequence.__table__
+        # 单条插入或更新语句递增当天序号，该行在事务提交前一直被锁定
+        session.execute(build_upsert(
+            session, table, {"seq_date": date, "last_value": count}, ["seq_date"],
+            lambda new: {"last_value": table.c.last_value + new.last_value}
+        ))
+        last_value = session.execute(select(table.c.last_value).where(table.c.seq_date == date)).scalar_one()
+        # 生成新的 ID，格式为 YYYYMMDD + 四位递增数字
+        prefix = date.strftime('%Y%m%d')
+        return [f"{prefix}{str(value).zfill(4)}" for value in range(last_value - count + 1, last_value + 1)]
+
+
 def generate_account_book_id(date):
     """
     根据日期生成账单 ID
     :param date: 账单日期 (datetime.date)
     :return: 新的账单 ID (str)
     """
-    session = SessionLocal()
-    try:
-        # 查询当天已有的账单数量
-        count = session.query(AccountBook).filter(func.date(AccountBook.date) == date).count()
-        # 生成新的 ID，格式为 YYYYMMDD + 四位递增数字
-        new_id = f"{date.strftime('%Y%m%d')}{str(count + 1).zfill(4)}"
-        return new_id
-    finally:
-        session.close()
+    return reserve_account_book_ids(date)[0]
 
 
 def add_account_book(date, category_id, item_id, expense, refund=None, remarks=None, user_id=None):
@@ -63,15 +290,16 @@ def add_account_book(date, category_id, item_id, expense, refund=None, remarks=N
     :param remarks: 备注 (str, 可选)
     :param user_id: 用户 ID (str, 可选)
     """
-    session = SessionLocal()
-    try:
-        # 生成账单 ID
+    with session_scope() as session:
+        invalidate_on_commit(session, "account_book", "account_book_monthly_summary")
+        # 生成账单 ID（与插入共用同一会话和连接）
         account_book_id = generate_account_book_id(date)
 
         # 创建新记录
         new_record = AccountBook(
             account_book_id=account_book_id,
             date=date,
+            accounting_date=compute_accounting_date(date, item_id),
             category_id=category_id,
             item_id=item_id,
             expense=expense,
@@ -80,24 +308,250 @@ def add_account_book(date, category_id, item_id, expense, refund=None, remarks=N
             user_id=user_id
         )
         session.add(new_record)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+        session.flush()  # 在事务单元内立即暴露约束错误，后续生成的 ID 也能计入该记录
+
+        # 在同一事务中更新月度汇总
+        apply_summary_deltas(session, [summary_delta(
+            user_id, new_record.accounting_date, category_id, expense, refund
+        )])
+
+
+def add_account_books(records):
+    """
+    批量添加账单记录：按日期批量分配 ID，一次 executemany 插入，并在同一事务中更新月度汇总
+    :param records: 账单列表 (list of dict)，每项包含 date、category_id、item_id、expense，
+                    以及可选的 refund、remarks、user_id
+    :return: 新的账单 ID 列表 (list of str)，与 records 顺序一致
+    """
+    if not records:
+        return []
+    with session_scope() as session:
+        invalidate_on_commit(session, "account_book", "account_book_monthly_summary")
+        # 统计每天需要的 ID 数量并批量分配
+        counts = {}
+        for record in records:
+            counts[record["date"]] = counts.get(record["date"], 0) + 1
+        blocks = {seq_date: iter(ids) for seq_date, ids in reserve_account_book_id_blocks(counts).items()}
+
+        rows = []
+        deltas = []
+        for record in records:
+            accounting_date = compute_accounting_date(record["date"], record["item_id"])
+            rows.append({
+                "account_book_id": next(blocks[record["date"]]),
+                "date": record["date"],
+                "accounting_date": accounting_date,
+                "category_id": record["category_id"],
+                "item_id": record["item_id"],
+                "expense": record["expense"],
+                "refund": record.get("refund"),
+                "remarks": record.get("remarks"),
+                "user_id": record.get("user_id"),
+            })
+            deltas.append(summary_delta(
+                record.get("user_id"), accounting_date, record["category_id"], record["expense"], record.get("refund")
+            ))
+
+        session.execute(AccountBook.__table__.insert(), rows)
+        apply_summary_deltas(session, deltas)
+        return [row["account_book_id"] for row in rows]
 
 
 def get_all_account_books():
     """
-    获取所有账单记录
+    获取所有账单记录（只读）
+    :return: 账单行列表 (list of Row)，列见 ACCOUNT_BOOK_ROW_COLUMNS
+    """
+    with session_scope() as session:
+        records = session.execute(select(*ACCOUNT_BOOK_ROW_COLUMNS)).all()
+        return records
+
+
+def get_account_books(user_id, start, end, with_labels=False):
+    """
+    获取指定用户在账期 [start, end] 内的账单记录（按日期降序），过滤在数据库中完成
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :param with_labels: 是否在同一条查询中带出分类、项目名称和用户名 (bool)
+    :return: 账单行列表 (list of Row)，列见 ACCOUNT_BOOK_ROW_COLUMNS（带名称时见 ACCOUNT_BOOK_LABEL_COLUMNS）
     """
-    session = SessionLocal()
-    try:
-        records = session.query(AccountBook).all()
+    with session_scope() as session:
+        records = session.execute(
+            _account_book_select(with_labels)
+            .where(AccountBook.user_id == user_id, AccountBook.accounting_date.between(start, end))
+            .order_by(AccountBook.accounting_date.desc(), AccountBook.account_book_id.desc())
+        ).all()
         return records
-    finally:
-        session.close()
+
+
+def get_account_books_page(user_id, start, end, page_size=50, after=None, before=None, with_labels=False):
+    """
+    键集分页获取指定用户在账期 [start, end] 内的账单（按记账日期、账单 ID 降序），
+    每页的查询代价与翻到第几页无关
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :param page_size: 每页记录数 (int)
+    :param after: 游标 (记账日期, 账单 ID)，返回排在该游标之后的一页 (tuple, 可选)
+    :param before: 游标 (记账日期, 账单 ID)，返回排在该游标之前的一页 (tuple, 可选)
+    :param with_labels: 是否在同一条查询中带出分类、项目名称和用户名 (bool)
+    :return: (当前页账单行, 该方向上是否还有更多记录) (tuple of list of Row, bool)，
+             列见 ACCOUNT_BOOK_ROW_COLUMNS（带名称时见 ACCOUNT_BOOK_LABEL_COLUMNS）
+    """
+    with session_scope() as session:
+        query = _account_book_select(with_labels).where(
+            AccountBook.user_id == user_id, AccountBook.accounting_date.between(start, end)
+        )
+        if before is not None:
+            cursor_date, cursor_id = before
+            query = query.where(or_(
+                AccountBook.accounting_date > cursor_date,
+                and_(AccountBook.accounting_date == cursor_date, AccountBook.account_book_id > cursor_id),
+            )).order_by(AccountBook.accounting_date.asc(), AccountBook.account_book_id.asc())
+        else:
+            if after is not None:
+                cursor_date, cursor_id = after
+                query = query.where(or_(
+                    AccountBook.accounting_date < cursor_date,
+                    and_(AccountBook.accounting_date == cursor_date, AccountBook.account_book_id < cursor_id),
+                ))
+            query = query.order_by(AccountBook.accounting_date.desc(), AccountBook.account_book_id.desc())
+        # 多取一条用于判断是否还有下一页
+        records = session.execute(query.limit(page_size + 1)).all()
+        has_more = len(records) > page_size
+        records = records[:page_size]
+        if before is not None:
+            records.reverse()
+        return records, has_more
+
+
+@cached_query("account_book")
+def get_account_book_months(user_id):
+    """
+    获取指定用户有账单记录的年月列表（按时间降序）
+    :param user_id: 用户 ID (str)
+    :return: [(年, 月), ...] (list of tuple)
+    """
+    with session_scope() as session:
+        year = extract('year', AccountBook.accounting_date)
+        month = extract('month', AccountBook.accounting_date)
+        rows = session.execute(
+            select(year, month)
+            .where(AccountBook.user_id == user_id)
+            .group_by(year, month)
+            .order_by(year.desc(), month.desc())
+        ).all()
+        return [(int(y), int(m)) for y, m in rows]
+
+
+@cached_query("account_book", "account_book_monthly_summary")
+def get_account_book_category_totals(user_id, start, end):
+    """
+    按分类汇总指定用户在账期 [start, end] 内的实际金额（支出金额 - 退款金额），汇总在数据库中完成
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :return: {分类 ID: 实际金额} (dict of str -> Decimal)
+    """
+    # 整月账期直接读取月度汇总表，最多 12 × 分类数 行
+    if start.day == 1 and (end + timedelta(days=1)).day == 1:
+        return get_monthly_category_totals(user_id, start.strftime('%Y-%m'), end.strftime('%Y-%m'))
+
+    with session_scope() as session:
+        amount = func.sum(AccountBook.expense - func.coalesce(AccountBook.refund, 0))
+        rows = session.execute(
+            select(AccountBook.category_id, amount)
+            .where(AccountBook.user_id == user_id, AccountBook.accounting_date.between(start, end))
+            .group_by(AccountBook.category_id)
+        ).all()
+        return {category_id: Decimal(str(total or 0)).quantize(Decimal('0.01')) for category_id, total in rows}
+
+
+@cached_query("account_book_monthly_summary")
+def get_account_book_monthly_trend(user_id, start_month, end_month):
+    """
+    从月度汇总表按月份汇总指定用户的收入和支出（一次 GROUP BY）
+    :param user_id: 用户 ID (str)
+    :param start_month: 开始月份 (str, YYYY-MM)
+    :param end_month: 结束月份 (str, YYYY-MM)
+    :return: {"YYYY-MM": (收入, 支出)} (dict of str -> tuple of Decimal)，没有账单的月份不出现
+    """
+    table = AccountBookMonthlySummary.__table__
+    amount = table.c.expense - table.c.refund
+    is_income = table.c.category_id == INCOME_CATEGORY_ID
+    with session_scope() as session:
+        rows = session.execute(
+            select(
+                table.c.year_month,
+                func.sum(case((is_income, amount), else_=0)),
+                func.sum(case((is_income, 0), else_=amount)),
+            )
+            .where(
+                table.c.user_id == (user_id or ''),
+                table.c.year_month.between(start_month, end_month),
+            )
+            .group_by(table.c.year_month)
+            .having(func.sum(table.c.record_count) > 0)
+        ).all()
+        return {
+            year_month: (Decimal(str(income or 0)).quantize(Decimal('0.01')), Decimal(str(expense or 0)).quantize(Decimal('0.01')))
+            for year_month, income, expense in rows
+        }
+
+
+def summarize_account_books(user_id, start, end):
+    """
+    汇总指定用户在账期 [start, end] 内的收入、支出、结余和分类支出
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :return: 包含 total_income、total_expense、balance、expense_ratio、category_expenses、has_records 的字典 (dict)
+    """
+    category_totals = get_account_book_category_totals(user_id, start, end)
+    total_income = category_totals.get(INCOME_CATEGORY_ID, Decimal('0.00'))  # 收入
+    category_expenses = {
+        category_id: total for category_id, total in category_totals.items() if category_id != INCOME_CATEGORY_ID
+    }  # 分类支出
+    total_expense = sum(category_expenses.values(), Decimal('0.00'))  # 支出
+    return {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "balance": total_income - total_expense,  # 结余
+        "expense_ratio": total_expense / total_income if total_income > 0 else 0,  # 支出率
+        "category_expenses": category_expenses,
+        "has_records": bool(category_totals),
+    }
+
+
+def search_account_books(query="", user_id=None, limit=SEARCH_LIMIT):
+    """
+    搜索账单（用于更新和删除时选择账单）：按账单 ID 前缀、日期（YYYY-MM-DD / YYYY-MM / YYYY）和备注匹配，
+    日期同时匹配记账日期和实际日期（与账单列表一致，提前发放的工资在上个月也能搜到），
+    按记账日期从新到旧只返回前 limit 条，搜索词为空时返回最近的账单
+    :param query: 搜索词 (str)
+    :param user_id: 只搜索该用户的账单 (str, 可选)
+    :param limit: 最多返回的记录数 (int)
+    :return: 账单列表 (list of Row)，列见 ACCOUNT_BOOK_ROW_COLUMNS
+    """
+    statement = select(*ACCOUNT_BOOK_ROW_COLUMNS)
+    if user_id is not None:
+        statement = statement.where(AccountBook.user_id == user_id)
+    query = (query or "").strip()
+    if query:
+        conditions = [
+            AccountBook.account_book_id.startswith(query, autoescape=True),  # 账单 ID 以日期开头，也可以输入 YYYYMMDD
+            AccountBook.remarks.contains(query, autoescape=True),
+        ]
+        date_range = parse_date_query(query)
+        if date_range:
+            conditions.append(AccountBook.accounting_date.between(*date_range))
+            conditions.append(AccountBook.date.between(*date_range))
+        statement = statement.where(or_(*conditions))
+    with session_scope() as session:
+        return session.execute(
+            statement.order_by(AccountBook.accounting_date.desc(), AccountBook.account_book_id.desc()).limit(limit)
+        ).all()
 
 
 def get_account_book_by_id(account_book_id):
@@ -105,20 +559,17 @@ def get_account_book_by_id(account_book_id):
     根据账单 ID 获取账单记录
     :param account_book_id: 账单 ID (str)
     """
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
         record = session.query(AccountBook).filter_by(account_book_id=account_book_id).first()
         if not record:
             raise ValueError("账单记录不存在")
         return record
-    finally:
-        session.close()
 
 
 def update_account_book(account_book_id, date=None, category_id=None, item_id=None, expense=None, refund=None, remarks=None, user_id=None):
     """
-    更新账单记录
-    :param account_book_id: 账单 ID (str)
+    更新账单记录（支持传入账单 ID 列表批量更新）
+    :param account_book_id: 账单 ID (str) 或账单 ID 列表 (list of str)
     :param date: 新的日期 (datetime.date, 可选)
     :param category_id: 新的分类 ID (str, 可选)
     :param item_id: 新的项目 ID (str, 可选)
@@ -127,49 +578,81 @@ def update_account_book(account_book_id, date=None, category_id=None, item_id=No
     :param remarks: 新的备注 (str, 可选)
     :param user_id: 新的用户 ID (str, 可选)
     """
-    session = SessionLocal()
-    try:
-        record = session.query(AccountBook).filter_by(account_book_id=account_book_id).first()
-        if record:
-            if date is not None:
-                record.date = date
-            if category_id is not None:
-                record.category_id = category_id
-            if item_id is not None:
-                record.item_id = item_id
-            if expense is not None:
-                record.expense = expense
-            if refund is not None:
-                record.refund = refund
-            if remarks is not None:
-                record.remarks = remarks
-            if user_id is not None:
-                record.user_id = user_id
-            session.commit()
-        else:
+    account_book_ids = to_id_list(account_book_id)
+    values = {
+        field: value for field, value in {
+            "date": date, "category_id": category_id, "item_id": item_id, "expense": expense,
+            "refund": refund, "remarks": remarks, "user_id": user_id,
+        }.items() if value is not None
+    }
+    table = AccountBook.__table__
+    with session_scope() as session:
+        invalidate_on_commit(session, "account_book", "account_book_monthly_summary")
+        if not values.keys() & SUMMARY_FIELDS:
+            # 不影响记账日期和月度汇总（只改备注）：一条 UPDATE 完成
+            if values:
+                result = session.execute(update(table).where(table.c.account_book_id.in_(account_book_ids)).values(**values))
+                check_rowcount(result, len(account_book_ids), "账单记录不存在")
+            elif session.query(AccountBook).filter(AccountBook.account_book_id.in_(account_book_ids)).count() != len(account_book_ids):
+                raise ValueError("账单记录不存在")
+            return
+
+        # 锁定并读取旧记录中与月度汇总相关的列
+        old_rows = session.execute(
+            select(
+                table.c.account_book_id, table.c.date, table.c.item_id, table.c.accounting_date,
+                table.c.user_id, table.c.category_id, table.c.expense, table.c.refund,
+            )
+            .where(table.c.account_book_id.in_(account_book_ids))
+            .with_for_update()
+        ).all()
+        if len(old_rows) != len(account_book_ids):
             raise ValueError("账单记录不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+
+        deltas = []
+        accounting_dates = []
+        for row in old_rows:
+            new_accounting_date = compute_accounting_date(values.get("date", row.date), values.get("item_id", row.item_id))
+            if new_accounting_date != row.accounting_date:
+                accounting_dates.append({"b_account_book_id": row.account_book_id, "b_accounting_date": new_accounting_date})
+            deltas.append(summary_delta(
+                row.user_id, row.accounting_date, row.category_id, row.expense, row.refund, sign=-1
+            ))
+            deltas.append(summary_delta(
+                values.get("user_id", row.user_id), new_accounting_date, values.get("category_id", row.category_id),
+                values.get("expense", row.expense), values.get("refund", row.refund)
+            ))
+        session.execute(update(table).where(table.c.account_book_id.in_(account_book_ids)).values(**values))
+        if accounting_dates:
+            # 日期或项目变化导致记账日期变化的记录：一次 executemany 更新
+            session.execute(
+                update(table).where(table.c.account_book_id == bindparam("b_account_book_id"))
+                .values(accounting_date=bindparam("b_accounting_date")),
+                accounting_dates
+            )
+        # 在同一事务中更新月度汇总
+        apply_summary_deltas(session, deltas)
 
 
 def delete_account_book(account_book_id):
     """
-    删除账单记录
-    :param account_book_id: 账单 ID (str)
+    删除账单记录（支持传入账单 ID 列表批量删除）
+    :param account_book_id: 账单 ID (str) 或账单 ID 列表 (list of str)
     """
-    session = SessionLocal()
-    try:
-        record = session.query(AccountBook).filter_by(account_book_id=account_book_id).first()
-        if record:
-            session.delete(record)
-            session.commit()
-        else:
-            raise ValueError("账单记录不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
\ No newline at end of file
+    account_book_ids = to_id_list(account_book_id)
+    table = AccountBook.__table__
+    with session_scope() as session:
+        invalidate_on_commit(session, "account_book", "account_book_monthly_summary")
+        # 锁定并读取待删除记录对月度汇总的贡献
+        old_rows = session.execute(
+            select(table.c.user_id, table.c.accounting_date, table.c.category_id, table.c.expense, table.c.refund)
+            .where(table.c.account_book_id.in_(account_book_ids))
+            .with_for_update()
+        ).all()
+        result = session.execute(delete(table).where(table.c.account_book_id.in_(account_book_ids)))
+        check_rowcount(result, len(account_book_ids), "账单记录不存在")
+        # 在同一事务中撤销这些记录对月度汇总的贡献
+        apply_summary_deltas(session, [
+            summary_delta(row.user_id, row.accounting_date, row.category_id, row.expense, row.refund, sign=-1)
+            for row in old_rows
+        ])
\ No newline at end of file
@@ -0,0 +1,105 @@
+from decimal import Decimal
+from sqlalchemy import Column, String, DECIMAL, Integer, func, select, delete
+from sqlalchemy.dialects.mysql import CHAR
+from models.database import Base, session_scope, build_upsert
+
+class AccountBookMonthlySummary(Base):
+    __tablename__ = 'account_book_monthly_summary'
+
+    # 定义字段：每个用户、每个记账月份、每个分类一行
+    user_id = Column(CHAR(36), primary_key=True, nullable=False)  # 用户 ID，未关联用户的账单记为空字符串
+    year_month = Column(String(7), primary_key=True, nullable=False)  # 记账月份，格式为 YYYY-MM
+    category_id = Column(CHAR(36), primary_key=True, nullable=False)  # 分类 ID
+    expense = Column(DECIMAL(14, 2), nullable=False, default=0)  # 支出金额合计
+    refund = Column(DECIMAL(14, 2), nullable=False, default=0)  # 退款金额合计
+    record_count = Column(Integer, nullable=False, default=0)  # 账单数量
+
+def summary_delta(user_id, accounting_date, category_id, expense, refund, sign=1):
+    """
+    构造一条账单对月度汇总的增量
+    :param user_id: 用户 ID (str, 可为空)
+    :param accounting_date: 记账日期 (datetime.date)
+    :param category_id: 分类 ID (str)
+    :param expense: 支出金额 (Decimal/float)
+    :param refund: 退款金额 (Decimal/float, 可为空)
+    :param sign: 1 表示新增，-1 表示撤销 (int)
+    :return: 增量 (dict)
+    """
+    return {
+        "user_id": user_id or '',
+        "year_month": accounting_date.strftime('%Y-%m'),
+        "category_id": category_id,
+        "expense": sign * Decimal(str(expense or 0)),
+        "refund": sign * Decimal(str(refund or 0)),
+        "record_count": sign,
+    }
+
+def apply_summary_deltas(session, deltas):
+    """
+    将增量合并后写入月度汇总表，与账单写入处于同一事务
+    :param session: 当前会话 (Session)
+    :param deltas: summary_delta 生成的增量列表 (list of dict)
+    """
+    merged = {}
+    for delta in deltas:
+        key = (delta["user_id"], delta["year_month"], delta["category_id"])
+        if key in merged:
+            for field in ("expense", "refund", "record_count"):
+                merged[key][field] += delta[field]
+        else:
+            merged[key] = dict(delta)
+    rows = [row for row in merged.values() if row["record_count"] or row["expense"] or row["refund"]]
+    if not rows:
+        return
+    table = AccountBookMonthlySummary.__table__
+    stmt = build_upsert(
+        session, table, None, ["user_id", "year_month", "category_id"],
+        lambda new: {
+            "expense": table.c.expense + new.expense,
+            "refund": table.c.refund + new.refund,
+            "record_count": table.c.record_count + new.record_count,
+        }
+    )
+    session.execute(stmt, rows)
+
+def get_monthly_category_totals(user_id, start_month, end_month):
+    """
+    从月度汇总表中按分类汇总实际金额（支出金额 - 退款金额）
+    :param user_id: 用户 ID (str)
+    :param start_month: 开始月份 (str, YYYY-MM)
+    :param end_month: 结束月份 (str, YYYY-MM)
+    :return: {分类 ID: 实际金额} (dict of str -> Decimal)
+    """
+    with session_scope() as session:
+        table = AccountBookMonthlySummary.__table__
+        rows = session.execute(
+            select(table.c.category_id, func.sum(table.c.expense - table.c.refund))
+            .where(
+                table.c.user_id == (user_id or ''),
+                table.c.year_month.between(start_month, end_month),
+            )
+            .group_by(table.c.category_id)
+            .having(func.sum(table.c.record_count) > 0)
+        ).all()
+        return {category_id: Decimal(str(total or 0)).quantize(Decimal('0.01')) for category_id, total in rows}
+
+def move_user_summary(session, from_user_id, to_user_id):
+    """
+    将一个用户的月度汇总合并到另一个用户下（账单的 user_id 被整体修改时使用）
+    :param session: 当前会话 (Session)
+    :param from_user_id: 原用户 ID (str)
+    :param to_user_id: 新用户 ID (str, 空字符串表示未关联用户)
+    """
+    table = AccountBookMonthlySummary.__table__
+    rows = session.execute(select(table).where(table.c.user_id == from_user_id)).mappings().all()
+    if not rows:
+        return
+    session.execute(delete(AccountBookMonthlySummary).where(table.c.user_id == from_user_id))
+    apply_summary_deltas(session, [dict(row, user_id=to_user_id or '') for row in rows])
+
+def clear_monthly_summary(session):
+    """
+    清空月度汇总表
+    :param session: 当前会话 (Session)
+    """
+    session.execute(delete(AccountBookMonthlySummary))
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from models.database import _current_session, run_after_commit
+
+# 查询缓存的默认有效期（秒），写入操作提交后会立即失效相关缓存，TTL 只是兜底
+DEFAULT_CACHE_TTL = 300
+
+# 最多缓存的查询结果数量，超出时淘汰最久未使用的结果
+MAX_CACHE_ENTRIES = 1024
+
+# 进程内共享的查询缓存（所有 Streamlit 会话共用）：{(查询名, 参数): (过期时间, 表版本, 结果)}
+_cache = OrderedDict()
+# 每张表的数据版本号，写入提交后递增，缓存结果记录查询时依赖表的版本号
+_table_versions = {}
+_cache_lock = threading.Lock()
+
+
+def _versions(tables):
+    return tuple(_table_versions.get(table, 0) for table in tables)
+
+
+def _copy(value):
+    """返回列表和字典的浅拷贝，避免调用方修改缓存中的结果（如对列表排序）"""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def cached_query(*tables, ttl=DEFAULT_CACHE_TTL):
+    """
+    查询结果缓存装饰器：以 (查询名, 参数) 为键缓存结果，依赖的表有写入提交或超过有效期后重新查询
+    用法：
+        @cached_query("account_book", "account_book_monthly_summary")
+        def summarize_account_books(user_id, start, end): ...
+    :param tables: 查询依赖的表名 (str)
+    :param ttl: 有效期（秒）(int)
+    :return: 装饰器
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # 当前事务单元中已写入依赖的表时，缓存不包含这些未提交的修改，直接查询
+            session = _current_session.get()
+            if session is not None and session.info.get("dirty_tables", set()) & set(tables):
+                return func(*args, **kwargs)
+
+            key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with _cache_lock:
+                versions = _versions(tables)
+                entry = _cache.get(key)
+                if entry is not None and entry[0] > now and entry[1] == versions:
+                    _cache.move_to_end(key)
+                    return _copy(entry[2])
+
+            # 查询期间发生的写入会使版本号变化，写入缓存的版本号仍是查询前的，下次读取时会重新查询
+            value = func(*args, **kwargs)
+            with _cache_lock:
+                _cache[key] = (now + ttl, versions, value)
+                _cache.move_to_end(key)
+                while len(_cache) > MAX_CACHE_ENTRIES:
+                    _cache.popitem(last=False)
+            return _copy(value)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tables(*tables):
+    """
+    立即使依赖这些表的缓存失效
+    :param tables: 表名 (str)
+    """
+    with _cache_lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+
+
+def get_table_version(table):
+    """
+    读取表的数据版本号，进程内的其他派生数据可据此判断依赖的表是否有新的写入
+    :param table: 表名 (str)
+    :return: 版本号 (int)
+    """
+    with _cache_lock:
+        return _table_versions.get(table, 0)
+
+
+def invalidate_on_commit(session, *tables):
+    """
+    写入函数调用：当前事务单元提交后使依赖这些表的缓存失效，提交前同一事务中的读取绕过这些表的缓存
+    :param session: 当前会话 (Session)
+    :param tables: 写入的表名 (str)
+    """
+    dirty_tables = session.info.setdefault("dirty_tables", set())
+    new_tables = set(tables) - dirty_tables
+    if not new_tables:
+        return
+    dirty_tables.update(new_tables)
+    run_after_commit(session, lambda: invalidate_tables(*new_tables))
+
+
+def clear_cache():
+    """清空所有查询缓存"""
+    with _cache_lock:
+        _cache.clear()
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, update, delete, exists, select, or_
 from sqlalchemy.dialects.mysql import CHAR
 from sqlalchemy.orm import relationship
-from models.database import Base, SessionLocal
+from models.database import Base, session_scope, to_id_list, check_rowcount
+from models.cache import cached_query, invalidate_on_commit
+from utils.helpers import SEARCH_LIMIT
 
 class Category(Base):
     __tablename__ = 'category'
@@ -14,6 +16,8 @@ class Category(Base):
     # 如果有外键关联，可以在这里定义关系映射
     items = relationship("Item", back_populates="category")
 
+CATEGORY_ROW_COLUMNS = (Category.category_id, Category.name, Category.remark)
+
 # CRUD 操作
 def add_category(category_id, name, remark=None):
     """
@@ -22,85 +26,90 @@ def add_category(category_id, name, remark=None):
     :param name: 分类名称 (str)
     :param remark: 备注 (str, 可选)
     """
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
+        invalidate_on_commit(session, "category")
         new_category = Category(
             category_id=category_id,
             name=name,
             remark=remark
         )
         session.add(new_category)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+        session.flush()  # 在事务单元内立即暴露约束错误，后续查询也能看到该记录
 
+@cached_query("category")
 def get_all_categories():
     """
-    获取所有分类
+    获取所有分类（只读），列见 CATEGORY_ROW_COLUMNS
     """
-    session = SessionLocal()
-    try:
-        categories = session.query(Category).all()
+    with session_scope() as session:
+        categories = session.execute(select(*CATEGORY_ROW_COLUMNS)).all()
         return categories
-    finally:
-        session.close()
+
+def search_categories(query="", limit=SEARCH_LIMIT):
+    """
+    搜索分类（用于更新和删除时选择分类）：按分类 ID 前缀和名称匹配，按 ID 排序只返回前 limit 条
+    :param query: 搜索词 (str)
+    :param limit: 最多返回的记录数 (int)
+    :return: 分类列表 (list of Row)，列见 CATEGORY_ROW_COLUMNS
+    """
+    statement = select(*CATEGORY_ROW_COLUMNS)
+    query = (query or "").strip()
+    if query:
+        statement = statement.where(or_(
+            Category.category_id.startswith(query, autoescape=True),
+            Category.name.contains(query, autoescape=True),
+        ))
+    with session_scope() as session:
+        return session.execute(statement.order_by(Category.category_id).limit(limit)).all()
 
 def get_category_by_id(category_id):
     """
     根据 ID 获取分类
     :param category_id: 分类 ID (str)
     """
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
         category = session.query(Category).filter_by(category_id=category_id).first()
         if not category:
             raise ValueError("分类不存在")
         return category
-    finally:
-        session.close()
 
 def update_category(category_id, name=None, remark=None):
     """
-    更新分类信息
-    :param category_id: 分类 ID (str)
+    更新分类信息（支持传入分类 ID 列表批量更新）
+    :param category_id: 分类 ID (str) 或分类 ID 列表 (list of str)
     :param name: 新的分类名称 (str, 可选)
     :param remark: 新的备注 (str, 可选)
     """
-    session = SessionLocal()
-    try:
-        category = session.query(Category).filter_by(category_id=category_id).first()
-        if category:
-            if name is not None:
-                category.name = name
-            if remark is not None:
-                category.remark = remark
-            session.commit()
-        else:
+    category_ids = to_id_list(category_id)
+    values = {}
+    if name is not None:
+        values["name"] = name
+    if remark is not None:
+        values["remark"] = remark
+    with session_scope() as session:
+        invalidate_on_commit(session, "category")
+        if values:
+            result = session.execute(update(Category.__table__).where(Category.category_id.in_(category_ids)).values(**values))
+            check_rowcount(result, len(category_ids), "分类不存在")
+        elif session.query(Category).filter(Category.category_id.in_(category_ids)).count() != len(category_ids):
             raise ValueError("分类不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
 def delete_category(category_id):
     """
-    删除分类
-    :param category_id: 分类 ID (str)
+    删除分类（支持传入分类 ID 列表批量删除），分类下仍有分类项目或账单时拒绝删除
+    :param category_id: 分类 ID (str) 或分类 ID 列表 (list of str)
     """
-    session = SessionLocal()
-    try:
-        category = session.query(Category).filter_by(category_id=category_id).first()
-        if category:
-            session.delete(category)
-            session.commit()
-        else:
-            raise ValueError("分类不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
\ No newline at end of file
+    from models.item_model import Item
+    from models.account_book_model import AccountBook
+
+    category_ids = to_id_list(category_id)
+    with session_scope() as session:
+        invalidate_on_commit(session, "category")
+        referenced = session.execute(select(
+            exists().where(Item.category_id.in_(category_ids))
+            | exists().where(AccountBook.category_id.in_(category_ids))
+        )).scalar()
+        if referenced:
+            raise ValueError("分类下仍有分类项目或账单记录，无法删除")
+        result = session.execute(delete(Category.__table__).where(Category.category_id.in_(category_ids)))
+        check_rowcount(result, len(category_ids), "分类不存在")
\ No newline at end of file
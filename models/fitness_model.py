@@ -1,17 +1,20 @@
 import uuid
-from sqlalchemy import Column, CHAR, Date, JSON, TIMESTAMP, func, ForeignKey
+from sqlalchemy import Column, CHAR, String, Date, JSON, TIMESTAMP, SmallInteger, Index, MetaData, func, extract, distinct, ForeignKey, inspect, select, insert, update, delete, tuple_, or_
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.dialects.mysql import TINYINT
 from sqlalchemy.orm import relationship
-from models.database import Base, SessionLocal
+from models.database import Base, session_scope, build_upsert, migration, run_after_commit, to_id_list, check_rowcount
+from models.cache import cached_query, invalidate_on_commit
+from utils.helpers import parse_date_query, SEARCH_LIMIT
 
 class Fitness(Base):
     __tablename__ = 'fitness'
 
     # 定义字段
     fitness_id = Column(CHAR(36), primary_key=True, nullable=False, default=lambda: str(uuid.uuid4()))
-    activity_date = Column(Date, nullable=False, unique=True)  # 健身日期，唯一性约束
+    activity_date = Column(Date, nullable=False)  # 健身日期，每个用户每天一条记录
     activities = Column(JSON, nullable=False)  # JSON 字段存储健身活动列表
-    status = Column(TINYINT(1), nullable=False, default=0)  # 健身状态：0-未健身，1-已健身
+    status = Column(SmallInteger().with_variant(TINYINT(1), "mysql"), nullable=False, default=0)  # 健身状态：0-未健身，1-已健身
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())  # 创建时间
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp(), onupdate=func.current_timestamp())  # 更新时间
     user_id = Column(CHAR(36), ForeignKey('users.user_id', ondelete='CASCADE', onupdate='CASCADE'), nullable=True)  # 外键关联 users 表
@@ -19,10 +22,96 @@ class Fitness(Base):
     # 关系映射
     user = relationship("User", back_populates="fitness_records")
 
+    # 每个用户每天只有一条健身记录，upsert_fitness 依赖该唯一索引
+    __table_args__ = (
+        Index('uq_fitness_user_activity_date', 'user_id', 'activity_date', unique=True),
+    )
+
+class FitnessActivity(Base):
+    __tablename__ = 'fitness_activity'
+
+    # 定义字段：每条健身记录的每项活动一行，与 Fitness.activities 保持同步
+    fitness_id = Column(CHAR(36), ForeignKey('fitness.fitness_id', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True, nullable=False)  # 外键关联 fitness 表
+    activity = Column(String(20), primary_key=True, nullable=False, index=True)  # 健身活动，如 胸部、有氧
+
 # 在 User 模型中添加反向关系（如果尚未定义）
 from models.user_model import User
 User.fitness_records = relationship("Fitness", order_by=Fitness.activity_date, back_populates="user")
 
+# 训练日变化的监听函数，事务提交后以 [(用户 ID, 健身日期, 是否已健身), ...] 调用
+_training_day_listeners = []
+
+def on_training_days_changed(func):
+    """
+    注册训练日变化的监听函数（如 utils.fitness_analytics 的进程内训练日历）
+    :param func: 接收变化列表 [(user_id, activity_date, trained), ...] 的函数
+    :return: 原函数
+    """
+    _training_day_listeners.append(func)
+    return func
+
+def _notify_training_days(session, changes):
+    """在当前事务提交后通知监听函数"""
+    if not changes or not _training_day_listeners:
+        return
+    def notify():
+        for listener in _training_day_listeners:
+            listener(changes)
+    run_after_commit(session, notify)
+
+def _activity_rows(fitness_id, activities):
+    """将健身活动列表展开为 fitness_activity 表的行（去重）"""
+    return [{"fitness_id": fitness_id, "activity": activity} for activity in dict.fromkeys(activities or [])]
+
+@migration
+def drop_fitness_activity_date_unique(session):
+    """
+    旧版本的 activity_date 列有全局唯一约束（每天只能有一个用户打卡），改为 (user_id, activity_date) 唯一后删除旧约束
+    :param session: 当前会话 (Session)
+    """
+    connection = session.connection()
+    inspector = inspect(connection)
+    if "fitness" not in inspector.get_table_names():
+        return
+    old_constraints = [
+        constraint for constraint in inspector.get_unique_constraints("fitness")
+        if constraint["column_names"] == ["activity_date"]
+    ]
+    if not old_constraints:
+        return
+    table = Fitness.__table__
+    preparer = connection.dialect.identifier_preparer
+    if connection.dialect.name == "mysql":
+        for constraint in old_constraints:
+            connection.exec_driver_sql(f"ALTER TABLE fitness DROP INDEX {preparer.quote(constraint['name'])}")
+        return
+    # SQLite 无法删除建表语句中的约束，按新结构重建表。
+    # 删除旧表时 fitness_activity 中的行会被级联删除，随后由 backfill_fitness_activity 重新生成
+    rebuild_metadata = MetaData()
+    User.__table__.to_metadata(rebuild_metadata)  # 外键引用的表
+    new_table = table.to_metadata(rebuild_metadata, name="fitness_new")
+    columns = ", ".join(preparer.format_column(column) for column in table.columns)
+    connection.execute(CreateTable(new_table))
+    connection.exec_driver_sql(f"INSERT INTO fitness_new ({columns}) SELECT {columns} FROM fitness")
+    connection.exec_driver_sql("DROP TABLE fitness")
+    connection.exec_driver_sql("ALTER TABLE fitness_new RENAME TO fitness")
+    for index in table.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+@migration
+def backfill_fitness_activity(session):
+    """
+    fitness_activity 表为空而健身记录表有活动数据时（活动表刚创建），从 activities 列生成活动行
+    :param session: 当前会话 (Session)
+    """
+    if session.execute(select(FitnessActivity.fitness_id).limit(1)).first() is not None:
+        return
+    rows = []
+    for fitness_id, activities in session.execute(select(Fitness.fitness_id, Fitness.activities)):
+        rows.extend(_activity_rows(fitness_id, activities))
+    if rows:
+        session.execute(insert(FitnessActivity.__table__), rows)
+
 # CRUD 操作
 
 def add_fitness(activity_date, activities, status=0, user_id=None):
@@ -33,8 +122,8 @@ def add_fitness(activity_date, activities, status=0, user_id=None):
     :param status: 健身状态 (int, 默认 0)
     :param user_id: 用户 ID (str, 可选)
     """
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
+        invalidate_on_commit(session, "fitness", "fitness_activity")
         new_fitness = Fitness(
             activity_date=activity_date,
             activities=activities,
@@ -42,67 +131,239 @@ def add_fitness(activity_date, activities, status=0, user_id=None):
             user_id=user_id
         )
         session.add(new_fitness)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+        session.flush()  # 在事务单元内立即暴露约束错误，后续查询也能看到该记录
+        rows = _activity_rows(new_fitness.fitness_id, activities)
+        if rows:
+            session.execute(insert(FitnessActivity.__table__), rows)
+        _notify_training_days(session, [(user_id, activity_date, status == 1)])
+
+FITNESS_ROW_COLUMNS = (Fitness.fitness_id, Fitness.activity_date, Fitness.activities, Fitness.status, Fitness.user_id)
+
+def upsert_fitness(activity_date, activities, status=0, user_id=None):
+    """
+    健身打卡：该用户当天没有记录时新增，已有记录时覆盖活动和状态（一条 INSERT ... ON DUPLICATE KEY UPDATE）
+    :param activity_date: 健身日期 (datetime.date)
+    :param activities: 健身活动列表 (list of str)
+    :param status: 健身状态 (int, 默认 0)
+    :param user_id: 用户 ID，必须指定 (str)
+    """
+    upsert_fitness_records([{
+        "activity_date": activity_date,
+        "activities": activities,
+        "status": status,
+        "user_id": user_id,
+    }])
+
+def upsert_fitness_records(records):
+    """
+    批量健身打卡（用于补录），所有记录由一条批量执行的 upsert 语句写入
+    :param records: 健身记录列表，每项包含 activity_date、activities、user_id，可选 status (list of dict)
+    :return: 写入的记录数 (int)
+    """
+    # 唯一索引中 NULL 互不相等，未关联用户的记录无法按 (用户, 日期) 合并，只能用 add_fitness 新增
+    if any(record.get("user_id") is None for record in records):
+        raise ValueError("健身打卡必须指定用户")
+    # 同一用户同一天重复出现时以最后一条为准
+    merged = {}
+    for record in records:
+        merged[(record.get("user_id"), record["activity_date"])] = {
+            "fitness_id": str(uuid.uuid4()),
+            "activity_date": record["activity_date"],
+            "activities": record["activities"],
+            "status": record.get("status", 0),
+            "user_id": record.get("user_id"),
+        }
+    if not merged:
+        return 0
+    table = Fitness.__table__
+    with session_scope() as session:
+        invalidate_on_commit(session, "fitness", "fitness_activity")
+        stmt = build_upsert(
+            session, table, None, ["user_id", "activity_date"],
+            lambda new: {
+                "activities": new.activities,
+                "status": new.status,
+                "updated_at": func.current_timestamp(),
+            }
+        )
+        session.execute(stmt, list(merged.values()))
+
+        # 同步活动表：按 (用户, 日期) 查出实际的记录 ID，替换其活动行
+        fitness_ids = {
+            (user_id, activity_date): fitness_id
+            for fitness_id, user_id, activity_date in session.execute(
+                select(table.c.fitness_id, table.c.user_id, table.c.activity_date)
+                .where(tuple_(table.c.user_id, table.c.activity_date).in_(list(merged)))
+            )
+        }
+        session.execute(delete(FitnessActivity.__table__).where(FitnessActivity.fitness_id.in_(list(fitness_ids.values()))))
+        rows = [row for key, fitness_id in fitness_ids.items() for row in _activity_rows(fitness_id, merged[key]["activities"])]
+        if rows:
+            session.execute(insert(FitnessActivity.__table__), rows)
+        _notify_training_days(session, [
+            (row["user_id"], row["activity_date"], row["status"] == 1) for row in merged.values()
+        ])
+        return len(merged)
 
 def get_all_fitness():
-    """获取所有健身记录"""
-    session = SessionLocal()
-    try:
-        fitness_records = session.query(Fitness).all()
+    """获取所有健身记录（只读），列见 FITNESS_ROW_COLUMNS"""
+    with session_scope() as session:
+        fitness_records = session.execute(select(*FITNESS_ROW_COLUMNS)).all()
         return fitness_records
-    finally:
-        session.close()
-
-def get_fitness_by_user(user_id):
-    """根据用户 ID 获取健身记录"""
-    session = SessionLocal()
-    try:
-        fitness_records = session.query(Fitness).filter_by(user_id=user_id).all()
+
+def get_fitness_by_user(user_id, start=None, end=None):
+    """
+    根据用户 ID 获取健身记录（只读，按日期降序），列见 FITNESS_ROW_COLUMNS
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date, 可选)
+    :param end: 结束日期 (datetime.date, 可选)
+    :return: 健身记录列表 (list of Row)
+    """
+    with session_scope() as session:
+        query = select(*FITNESS_ROW_COLUMNS).where(Fitness.user_id == user_id)
+        if start is not None:
+            query = query.where(Fitness.activity_date >= start)
+        if end is not None:
+            query = query.where(Fitness.activity_date <= end)
+        fitness_records = session.execute(query.order_by(Fitness.activity_date.desc())).all()
         return fitness_records
-    finally:
-        session.close()
+
+def search_fitness(query="", user_id=None, limit=SEARCH_LIMIT):
+    """
+    搜索健身记录（用于更新和删除时选择记录）：按记录 ID 前缀、日期（YYYY-MM-DD / YYYY-MM / YYYY）和健身活动匹配，
+    按日期从新到旧只返回前 limit 条，搜索词为空时返回最近的记录
+    :param query: 搜索词 (str)
+    :param user_id: 只搜索该用户的记录 (str, 可选)
+    :param limit: 最多返回的记录数 (int)
+    :return: 健身记录列表 (list of Row)，列见 FITNESS_ROW_COLUMNS
+    """
+    statement = select(*FITNESS_ROW_COLUMNS)
+    if user_id is not None:
+        statement = statement.where(Fitness.user_id == user_id)
+    query = (query or "").strip()
+    if query:
+        conditions = [
+            Fitness.fitness_id.startswith(query, autoescape=True),
+            select(FitnessActivity.fitness_id).where(
+                FitnessActivity.fitness_id == Fitness.fitness_id, FitnessActivity.activity == query
+            ).exists(),
+        ]
+        date_range = parse_date_query(query)
+        if date_range:
+            conditions.append(Fitness.activity_date.between(*date_range))
+        statement = statement.where(or_(*conditions))
+    with session_scope() as session:
+        return session.execute(statement.order_by(Fitness.activity_date.desc()).limit(limit)).all()
+
+@cached_query("fitness")
+def get_fitness_months(user_id):
+    """
+    获取指定用户有健身记录的年月列表（按时间降序）
+    :param user_id: 用户 ID (str)
+    :return: [(年, 月), ...] (list of tuple)
+    """
+    with session_scope() as session:
+        year = extract('year', Fitness.activity_date)
+        month = extract('month', Fitness.activity_date)
+        rows = session.execute(
+            select(year, month)
+            .where(Fitness.user_id == user_id)
+            .group_by(year, month)
+            .order_by(year.desc(), month.desc())
+        ).all()
+        return [(int(y), int(m)) for y, m in rows]
+
+@cached_query("fitness", "fitness_activity")
+def get_fitness_activity_counts(user_id, start, end):
+    """
+    统计时间范围内已健身记录的各项活动次数（一次 GROUP BY）
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :return: {活动: 次数} (dict of str -> int)，按次数降序
+    """
+    with session_scope() as session:
+        rows = session.execute(
+            select(FitnessActivity.activity, func.count())
+            .join(Fitness, Fitness.fitness_id == FitnessActivity.fitness_id)
+            .where(
+                Fitness.user_id == user_id,
+                Fitness.status == 1,  # 只统计 status 为 1 的活动
+                Fitness.activity_date.between(start, end),
+            )
+            .group_by(FitnessActivity.activity)
+            .order_by(func.count().desc())
+        ).all()
+        return {activity: count for activity, count in rows}
+
+@cached_query("fitness")
+def get_fitness_monthly_days(user_id, start, end):
+    """
+    按自然月统计时间范围内的健身天数（一次 GROUP BY）
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :return: {"YYYY-MM": 健身天数} (dict of str -> int)，没有记录的月份不出现
+    """
+    with session_scope() as session:
+        year = extract('year', Fitness.activity_date)
+        month = extract('month', Fitness.activity_date)
+        rows = session.execute(
+            select(year, month, func.count(distinct(Fitness.activity_date)))
+            .where(
+                Fitness.user_id == user_id,
+                Fitness.status == 1,
+                Fitness.activity_date.between(start, end),
+            )
+            .group_by(year, month)
+        ).all()
+        return {f"{int(y)}-{int(m):02d}": days for y, m, days in rows}
 
 def update_fitness(fitness_id, activities=None, status=None):
     """
-    更新健身记录
-    :param fitness_id: 健身记录 ID (str)
+    更新健身记录（支持传入健身记录 ID 列表批量更新）
+    :param fitness_id: 健身记录 ID (str) 或健身记录 ID 列表 (list of str)
     :param activities: 新的健身活动列表 (list of str, 可选)
     :param status: 新的健身状态 (int, 可选)
     """
-    session = SessionLocal()
-    try:
-        fitness_record = session.query(Fitness).filter_by(fitness_id=fitness_id).first()
-        if fitness_record:
+    fitness_ids = to_id_list(fitness_id)
+    values = {}
+    if activities is not None:
+        values["activities"] = activities
+    if status is not None:
+        values["status"] = status
+    with session_scope() as session:
+        invalidate_on_commit(session, "fitness", "fitness_activity")
+        if values:
+            result = session.execute(update(Fitness.__table__).where(Fitness.fitness_id.in_(fitness_ids)).values(**values))
+            check_rowcount(result, len(fitness_ids), "健身记录不存在")
             if activities is not None:
-                fitness_record.activities = activities
-            if status is not None:
-                fitness_record.status = status
-            session.commit()
-        else:
+                # 同步活动表：删除旧活动行后写入新活动行
+                session.execute(delete(FitnessActivity.__table__).where(FitnessActivity.fitness_id.in_(fitness_ids)))
+                rows = [row for fid in fitness_ids for row in _activity_rows(fid, activities)]
+                if rows:
+                    session.execute(insert(FitnessActivity.__table__), rows)
+            if status is not None and _training_day_listeners:
+                changed = session.execute(
+                    select(Fitness.user_id, Fitness.activity_date).where(Fitness.fitness_id.in_(fitness_ids))
+                ).all()
+                _notify_training_days(session, [(uid, activity_date, status == 1) for uid, activity_date in changed])
+        elif session.query(Fitness).filter(Fitness.fitness_id.in_(fitness_ids)).count() != len(fitness_ids):
             raise ValueError("健身记录不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
 def delete_fitness(fitness_id):
-    """删除健身记录"""
-    session = SessionLocal()
-    try:
-        fitness_record = session.query(Fitness).filter_by(fitness_id=fitness_id).first()
-        if fitness_record:
-            session.delete(fitness_record)
-            session.commit()
-        else:
-            raise ValueError("健身记录不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
\ No newline at end of file
+    """
+    删除健身记录（支持传入健身记录 ID 列表批量删除）
+    :param fitness_id: 健身记录 ID (str) 或健身记录 ID 列表 (list of str)
+    """
+    fitness_ids = to_id_list(fitness_id)
+    with session_scope() as session:
+        invalidate_on_commit(session, "fitness", "fitness_activity")
+        if _training_day_listeners:
+            deleted = session.execute(
+                select(Fitness.user_id, Fitness.activity_date).where(Fitness.fitness_id.in_(fitness_ids))
+            ).all()
+            _notify_training_days(session, [(uid, activity_date, False) for uid, activity_date in deleted])
+        session.execute(delete(FitnessActivity.__table__).where(FitnessActivity.fitness_id.in_(fitness_ids)))
+        result = session.execute(delete(Fitness.__table__).where(Fitness.fitness_id.in_(fitness_ids)))
+        check_rowcount(result, len(fitness_ids), "健身记录不存在")
\ No newline at end of file
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, update, delete, exists, select, or_
 from sqlalchemy.dialects.mysql import CHAR
 from sqlalchemy.orm import relationship
-from models.database import Base, SessionLocal
+from models.database import Base, session_scope, to_id_list, check_rowcount
+from models.cache import cached_query, invalidate_on_commit
+from utils.helpers import SEARCH_LIMIT
 
 class Item(Base):
     __tablename__ = 'item'
@@ -19,6 +21,8 @@ class Item(Base):
 from models.category_model import Category
 Category.items = relationship("Item", order_by=Item.item_id, back_populates="category")
 
+ITEM_ROW_COLUMNS = (Item.item_id, Item.category_id, Item.name, Item.remark)
+
 # CRUD 操作
 def add_item(item_id, category_id, name, remark=None):
     """
@@ -28,8 +32,8 @@ def add_item(item_id, category_id, name, remark=None):
     :param name: 项目名称 (str)
     :param remark: 备注 (str, 可选)
     """
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
+        invalidate_on_commit(session, "item")
         new_item = Item(
             item_id=item_id,
             category_id=category_id,
@@ -37,77 +41,77 @@ def add_item(item_id, category_id, name, remark=None):
             remark=remark
         )
         session.add(new_item)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+        session.flush()  # 在事务单元内立即暴露约束错误，后续查询也能看到该记录
 
+@cached_query("item")
 def get_all_items():
     """
-    获取所有项目
+    获取所有项目（只读），列见 ITEM_ROW_COLUMNS
     """
-    session = SessionLocal()
-    try:
-        items = session.query(Item).all()
+    with session_scope() as session:
+        items = session.execute(select(*ITEM_ROW_COLUMNS)).all()
         return items
-    finally:
-        session.close()
+
+def search_items(query="", limit=SEARCH_LIMIT):
+    """
+    搜索项目（用于更新和删除时选择项目）：按项目 ID 前缀和名称匹配，按 ID 排序只返回前 limit 条
+    :param query: 搜索词 (str)
+    :param limit: 最多返回的记录数 (int)
+    :return: 项目列表 (list of Row)，列见 ITEM_ROW_COLUMNS
+    """
+    statement = select(*ITEM_ROW_COLUMNS)
+    query = (query or "").strip()
+    if query:
+        statement = statement.where(or_(
+            Item.item_id.startswith(query, autoescape=True),
+            Item.name.contains(query, autoescape=True),
+        ))
+    with session_scope() as session:
+        return session.execute(statement.order_by(Item.item_id).limit(limit)).all()
 
 def get_item_by_id(item_id):
     """
     根据项目 ID 获取项目
     :param item_id: 项目 ID (str)
     """
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
         item = session.query(Item).filter_by(item_id=item_id).first()
         if not item:
             raise ValueError("项目不存在")
         return item
-    finally:
-        session.close()
 
 def update_item(item_id, name=None, remark=None):
     """
-    更新项目信息
-    :param item_id: 项目 ID (str)
+    更新项目信息（支持传入项目 ID 列表批量更新）
+    :param item_id: 项目 ID (str) 或项目 ID 列表 (list of str)
     :param name: 新的项目名称 (str, 可选)
     :param remark: 新的备注 (str, 可选)
     """
-    session = SessionLocal()
-    try:
-        item = session.query(Item).filter_by(item_id=item_id).first()
-        if item:
-            if name is not None:
-                item.name = name
-            if remark is not None:
-                item.remark = remark
-            session.commit()
-        else:
+    item_ids = to_id_list(item_id)
+    values = {}
+    if name is not None:
+        values["name"] = name
+    if remark is not None:
+        values["remark"] = remark
+    with session_scope() as session:
+        invalidate_on_commit(session, "item")
+        if values:
+            result = session.execute(update(Item.__table__).where(Item.item_id.in_(item_ids)).values(**values))
+            check_rowcount(result, len(item_ids), "项目不存在")
+        elif session.query(Item).filter(Item.item_id.in_(item_ids)).count() != len(item_ids):
             raise ValueError("项目不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
 def delete_item(item_id):
     """
-    删除项目
-    :param item_id: 项目 ID (str)
+    删除项目（支持传入项目 ID 列表批量删除），项目下仍有账单时拒绝删除
+    :param item_id: 项目 ID (str) 或项目 ID 列表 (list of str)
     """
-    session = SessionLocal()
-    try:
-        item = session.query(Item).filter_by(item_id=item_id).first()
-        if item:
-            session.delete(item)
-            session.commit()
-        else:
-            raise ValueError("项目不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
\ No newline at end of file
+    from models.account_book_model import AccountBook
+
+    item_ids = to_id_list(item_id)
+    with session_scope() as session:
+        invalidate_on_commit(session, "item")
+        if session.execute(select(exists().where(AccountBook.item_id.in_(item_ids)))).scalar():
+            raise ValueError("项目下仍有账单记录，无法删除")
+        result = session.execute(delete(Item.__table__).where(Item.item_id.in_(item_ids)))
+        check_rowcount(result, len(item_ids), "项目不存在")
\ No newline at end of file
@@ -0,0 +1,50 @@
+from models.cache import cached_query
+from models.database import session_scope
+from models.category_model import get_all_categories
+from models.item_model import get_all_items
+from models.user_model import get_all_users
+
+
+class MetadataIndex:
+    """
+    分类、项目和用户的内存索引（只读快照），按 ID 或名称 O(1) 查找。
+    由 get_metadata_index 构建并在进程内共享，分类、项目或用户有写入提交后生成新的快照。
+    """
+
+    def __init__(self, categories, items, users):
+        self.categories = {category.category_id: category for category in categories}  # {分类 ID: 分类}
+        self.items = {item.item_id: item for item in items}  # {项目 ID: 项目}
+        self.users = {user.user_id: user for user in users}  # {用户 ID: 用户}
+        # 下拉列表使用的 {名称: ID}，保持数据库返回的顺序
+        self.category_options = {category.name: category.category_id for category in categories}
+        self.item_options = {item.name: item.item_id for item in items}
+        self.user_options = {user.username: user.user_id for user in users}
+        # {分类 ID: [项目, ...]}
+        self.items_by_category = {}
+        for item in items:
+            self.items_by_category.setdefault(item.category_id, []).append(item)
+
+    def category_name(self, category_id, default="未知分类"):
+        """根据分类 ID 获取分类名称"""
+        category = self.categories.get(category_id)
+        return category.name if category else default
+
+    def item_name(self, item_id, default="未知项目"):
+        """根据项目 ID 获取项目名称"""
+        item = self.items.get(item_id)
+        return item.name if item else default
+
+    def username(self, user_id, default="未知用户"):
+        """根据用户 ID 获取用户名"""
+        user = self.users.get(user_id)
+        return user.username if user else default
+
+
+@cached_query("category", "item", "users")
+def get_metadata_index():
+    """
+    获取分类、项目和用户的内存索引，首次调用时加载，分类、项目或用户有写入提交后重新加载
+    :return: 元数据索引 (MetadataIndex)
+    """
+    with session_scope():
+        return MetadataIndex(get_all_categories(), get_all_items(), get_all_users())
@@ -1,7 +1,8 @@
 import uuid
-from sqlalchemy import Column, String, TIMESTAMP, func
+from sqlalchemy import Column, String, TIMESTAMP, func, select, update, delete
 from sqlalchemy.dialects.mysql import CHAR
-from models.database import Base, SessionLocal
+from models.database import Base, session_scope, to_id_list, check_rowcount
+from models.cache import cached_query, invalidate_on_commit
 
 class User(Base):
     __tablename__ = 'users'
@@ -14,67 +15,67 @@ class User(Base):
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
+USER_ROW_COLUMNS = (User.user_id, User.username, User.password, User.email)
+
 # CRUD 操作
 
 def add_user(username, password, email):
     """添加用户"""
-    session = SessionLocal()
-    try:
+    with session_scope() as session:
+        invalidate_on_commit(session, "users")
         new_user = User(
             username=username,
             password=password,
             email=email
         )
         session.add(new_user)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+        session.flush()  # 在事务单元内立即暴露约束错误，后续查询也能看到该记录
 
+@cached_query("users")
 def get_all_users():
-    """获取所有用户"""
-    session = SessionLocal()
-    try:
-        users = session.query(User).all()
+    """获取所有用户（只读），列见 USER_ROW_COLUMNS"""
+    with session_scope() as session:
+        users = session.execute(select(*USER_ROW_COLUMNS)).all()
         return users
-    finally:
-        session.close()
 
 def delete_user(user_id):
-    """删除用户"""
-    session = SessionLocal()
-    try:
-        user = session.query(User).filter_by(user_id=user_id).first()
-        if user:
-            session.delete(user)
-            session.commit()
-        else:
-            raise ValueError("用户不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+    """
+    删除用户（支持传入用户 ID 列表批量删除），该用户的账单和健身记录保留并置为未关联用户
+    :param user_id: 用户 ID (str) 或用户 ID 列表 (list of str)
+    """
+    from models.account_book_model import AccountBook
+    from models.fitness_model import Fitness
+    from models.account_book_summary_model import move_user_summary
+
+    user_ids = to_id_list(user_id)
+    with session_scope() as session:
+        invalidate_on_commit(session, "users", "account_book", "account_book_monthly_summary", "fitness")
+        # 解除账单和健身记录与用户的关联
+        session.execute(update(AccountBook.__table__).where(AccountBook.user_id.in_(user_ids)).values(user_id=None))
+        session.execute(update(Fitness.__table__).where(Fitness.user_id.in_(user_ids)).values(user_id=None))
+        result = session.execute(delete(User.__table__).where(User.user_id.in_(user_ids)))
+        check_rowcount(result, len(user_ids), "用户不存在")
+        # 用户的月度汇总随之归入未关联用户
+        for removed_user_id in user_ids:
+            move_user_summary(session, removed_user_id, '')
 
 def update_user(user_id, username=None, password=None, email=None):
-    """更新用户信息"""
-    session = SessionLocal()
-    try:
-        user = session.query(User).filter_by(user_id=user_id).first()
-        if user:
-            if username:
-                user.username = username
-            if password:
-                user.password = password
-            if email:
-                user.email = email
-            session.commit()
-        else:
-            raise ValueError("用户不存在")
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
\ No newline at end of file
+    """
+    更新用户信息（支持传入用户 ID 列表批量更新）
+    :param user_id: 用户 ID (str) 或用户 ID 列表 (list of str)
+    """
+    user_ids = to_id_list(user_id)
+    values = {}
+    if username:
+        values["username"] = username
+    if password:
+        values["password"] = password
+    if email:
+        values["email"] = email
+    with session_scope() as session:
+        invalidate_on_commit(session, "users")
+        if values:
+            result = session.execute(update(User.__table__).where(User.user_id.in_(user_ids)).values(**values))
+            check_rowcount(result, len(user_ids), "用户不存在")
+        elif session.query(User).filter(User.user_id.in_(user_ids)).count() != len(user_ids):
+            raise ValueError("用户不存在")
\ No newline at end of file
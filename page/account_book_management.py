@@ -2,55 +2,68 @@ import streamlit as st
 import pandas as pd
 from decimal import Decimal  # 导入 Decimal 模块
 
-from datetime import date, timedelta
+from datetime import date
 from models.account_book_model import (
-    add_account_book, get_all_account_books, update_account_book, delete_account_book, get_account_book_by_id
+    add_account_book, get_account_books_page, get_account_book_months, summarize_account_books, update_account_book, delete_account_book, get_account_book_by_id,
+    search_account_books
 )
-from models.category_model import get_all_categories
-from models.item_model import get_all_items
-from models.user_model import get_all_users
+from models.metadata_index import get_metadata_index
+from utils.helpers import get_period_bounds
+from utils.importer import import_account_books_csv
+from utils.instrumentation import profiled_fragment, show_dataframe
+from utils.record_picker import record_picker
 
-# 初始化数据库
-from models.database import init_db
-init_db()
+# 账单表格每页条数选项
+PAGE_SIZE_OPTIONS = [20, 50, 100, 200]
 
-def adjust_salary_date(record_date):
-    """
-    调整工资日期为发放月份的前一个月的最后一天。
-    :param record_date: 工资发放的实际日期
-    :return: 调整后的日期
-    """
-    # 获取发放月份的第一天
-    first_day_of_month = record_date.replace(day=1)
-    # 前一个月的最后一天 = 当前月份第一天 - 1天
-    last_day_of_previous_month = first_day_of_month - timedelta(days=1)
-    return last_day_of_previous_month
+# 更新和删除账单时搜索框的提示
+ACCOUNT_BOOK_SEARCH_PLACEHOLDER = "账单 ID、日期（2024-05）或备注"
+
+def _format_account_book(book):
+    """账单在选择器中的显示文本，记账日期与实际日期不同时一并显示"""
+    accounting = f" 记账 {book.accounting_date}" if book.accounting_date != book.date else ""
+    return f"{book.date}{accounting} ({book.account_book_id}) ¥{book.amount:.2f} {book.remarks or ''}".rstrip()
+
+def _next_account_book_page(cursor):
+    """翻到下一页：记录当前页最后一条账单作为下一页的游标"""
+    st.session_state["account_book_page_cursors"].append(cursor)
+
+def _previous_account_book_page():
+    """翻到上一页：丢弃当前页的游标"""
+    if len(st.session_state["account_book_page_cursors"]) > 1:
+        st.session_state["account_book_page_cursors"].pop()
 
 def account_book_management_page():
     # 页面标题
     st.header("账单管理")
 
-    # 获取所有分类数据（用于下拉列表）
-    categories = get_all_categories()
-    category_options = {category.name: category.category_id for category in categories} if categories else {}
+    user_options = get_metadata_index().user_options
 
-    # 获取所有项目数据（用于下拉列表）
-    items = get_all_items()
-    item_options = {item.name: item.item_id for item in items} if items else {}
+    # 用户选择（切换用户时重新运行整个页面）
+    col1, _ = st.columns([2, 3])
+    with col1:
+        selected_user = st.selectbox("选择用户", list(user_options.keys()))
+        user_id = user_options[selected_user] if selected_user else None
 
-    # 获取所有用户数据（用于下拉列表）
-    users = get_all_users()
-    user_options = {user.username: user.user_id for user in users} if users else {}
+    # 筛选器、指标和账单表格在同一个片段中，切换时间范围或翻页时只重新运行该片段
+    _account_book_ledger(user_id)
 
-    # 获取所有账单记录数据
-    account_books = get_all_account_books()
+    # 侧边栏表单各自作为独立片段运行，填写和搜索选择记录时只重新运行该表单片段；
+    # 写入成功后调用 st.rerun(scope="app") 重新运行整个页面：片段只能重新运行自身，无法通知主区域的片段刷新账单表格和收支指标
+    with st.sidebar:
+        _add_account_book_form()
+        _import_account_books_form(user_id)
+        _update_account_book_form(user_id)  # 更新和删除在当前用户的账单中搜索
+        _delete_account_book_form(user_id)
 
-    # 筛选器：选择用户、时间单位、选择年份/月份
-    col1, col2, col3 = st.columns([2, 1, 2])  # 调整列宽比例
-    with col1:
-        selected_user = st.selectbox("选择用户", list(user_options.keys()))
-        user_id = user_options[selected_user]
 
+@profiled_fragment
+def _account_book_ledger(user_id):
+    """
+    时间范围筛选器、收支指标和分页的账单表格
+    :param user_id: 用户 ID (str)
+    """
+    col2, col3 = st.columns([1, 2])
     with col2:
         # 时间单位筛选器，默认为“按月查看”，且顺序调整为“按月查看”在前
         time_unit = st.radio(
@@ -61,71 +74,36 @@ def account_book_management_page():
         )
 
     with col3:
+        # 只查询当前用户有账单的年月，不加载账单明细
+        all_dates = get_account_book_months(user_id) if user_id else []
         if time_unit == "按年查看":
             selected_year = st.selectbox(
                 "选择年份",
-                sorted({record.date.year for record in account_books}, reverse=True),
+                sorted({year for year, _ in all_dates}, reverse=True),
                 key="account_book_management_year_selector"
             )
-            filtered_records = [
-                record for record in account_books
-                if (record.date.year == selected_year or 
-                    (record.date.day <= 20 and record.item_id == '1301' and adjust_salary_date(record.date).year == selected_year))
-                and record.user_id == user_id
-            ]
+            selected_month = None
         else:
-            # 提取所有年份和月份
-            all_dates = sorted({(record.date.year, record.date.month) for record in account_books}, reverse=True)
             selected_date = st.selectbox(
                 "选择年月",
                 [f"{year}-{month:02d}" for year, month in all_dates],
                 key="account_book_management_month_selector"
             )
-            selected_year, selected_month = map(int, selected_date.split("-"))
-            filtered_records = [
-                record for record in account_books
-                if ((record.date.year == selected_year and record.date.month == selected_month) or
-                    (record.date.day <= 20 and record.item_id == '1301' and 
-                     adjust_salary_date(record.date).year == selected_year and 
-                     adjust_salary_date(record.date).month == selected_month))
-                and record.user_id == user_id
-            ]
+            selected_year, selected_month = map(int, selected_date.split("-")) if selected_date else (None, None)
+
+    # 计算指标：总收入、总支出、支出率（在数据库中按分类汇总）
+    period_start, period_end = get_period_bounds(selected_year, selected_month) if selected_year else (None, None)
+    summary = summarize_account_books(user_id, period_start, period_end) if selected_year else None
 
     # 如果没有筛选到数据
-    if not filtered_records:
+    if not summary or not summary["has_records"]:
         st.info("当前时间范围内暂无账单记录数据。")
         return
 
-    # 区分工资记录和其他记录
-    final_records = []
-    for record in filtered_records:
-        if record.item_id == '1301' and record.date.day <= 20:  # 判断是否为工资记录
-            adjusted_date = adjust_salary_date(record.date)  # 调整日期为上个月的最后一天
-            # 判断调整后的日期是否属于当前筛选范围
-            if time_unit == "按年查看":
-                if adjusted_date.year == selected_year:
-                    record.date = adjusted_date  # 动态调整日期
-                    final_records.append(record)
-            else:  # 按月查看
-                if adjusted_date.year == selected_year and adjusted_date.month == selected_month:
-                    record.date = adjusted_date  # 动态调整日期
-                    final_records.append(record)
-        else:
-            # 非工资记录直接保留
-            final_records.append(record)
-
-    # 按日期从大到小排序
-    final_records.sort(key=lambda x: x.date, reverse=True)
-
-    # 计算指标：总收入、总支出、支出率
-    total_income = sum(
-        (record.expense - record.refund) for record in final_records if record.category_id == '13'
-    )  # 收入
-    total_expense = sum(
-        (record.expense - record.refund) for record in final_records if record.category_id != '13'
-    )  # 支出
-    balance = total_income - total_expense  # 结余
-    expense_ratio = total_expense / total_income if total_income > 0 else 0  # 支出率
+    total_income = summary["total_income"]  # 收入
+    total_expense = summary["total_expense"]  # 支出
+    balance = summary["balance"]  # 结余
+    expense_ratio = summary["expense_ratio"]  # 支出率
 
     # 显示指标
     col_metric1, col_metric2, col_metric3, col_metric4 = st.columns(4)
@@ -148,43 +126,77 @@ def account_book_management_page():
             delta_color="off"
         )
 
+    # 分页设置：筛选条件或每页条数变化时回到第一页
+    _, col_page_size = st.columns([4, 1])
+    with col_page_size:
+        page_size = st.selectbox("每页条数", PAGE_SIZE_OPTIONS, index=1, key="account_book_page_size")
+    pagination_key = (user_id, selected_year, selected_month, page_size)
+    if st.session_state.get("account_book_pagination_key") != pagination_key:
+        st.session_state["account_book_pagination_key"] = pagination_key
+        st.session_state["account_book_page_cursors"] = [None]
+    page_cursors = st.session_state["account_book_page_cursors"]
+
+    # 键集分页：只读取当前页的账单（已按记账日期从大到小排序）
+    # 分类、项目名称和用户名由同一条查询左连接带出
+    final_records, has_next_page = get_account_books_page(
+        user_id, period_start, period_end, page_size=page_size, after=page_cursors[-1], with_labels=True
+    )
+
     # 构建账单数据（隐藏账单 ID）
     account_book_data = [
         {
-            "日期": book.date,
-            "分类": next((c.name for c in categories if c.category_id == book.category_id), "未知分类"),
-            "项目": next((i.name for i in items if i.item_id == book.item_id), "未知项目"),
-            "实际金额": f"{book.expense - book.refund:.2f}",  # 实际金额 = 支出金额 - 退款金额
+            "日期": book.accounting_date,
+            "分类": book.category_name or "未知分类",
+            "项目": book.item_name or "未知项目",
+            "实际金额": f"{book.amount:.2f}",  # 实际金额 = 支出金额 - 退款金额
             "备注": book.remarks,
-            "用户": next((u.username for u in users if u.user_id == book.user_id), "未知用户"),
+            "用户": book.username or "未知用户",
         }
         for book in final_records
     ]
     df_account_books = pd.DataFrame(account_book_data)
-    st.dataframe(df_account_books, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
+    show_dataframe(df_account_books, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
+
+    # 翻页控制
+    col_prev, col_page_info, col_next = st.columns([1, 4, 1])
+    with col_prev:
+        st.button("上一页", disabled=len(page_cursors) == 1, on_click=_previous_account_book_page, key="account_book_prev_page")
+    with col_page_info:
+        st.caption(f"第 {len(page_cursors)} 页，每页 {page_size} 条")
+    with col_next:
+        last_record = final_records[-1] if final_records else None
+        st.button(
+            "下一页", disabled=not has_next_page, on_click=_next_account_book_page,
+            args=((last_record.accounting_date, last_record.account_book_id) if last_record else None,),
+            key="account_book_next_page"
+        )
+
 
-    # 侧边栏：添加账单记录
-    with st.sidebar.expander("添加账单记录"):
+@profiled_fragment
+def _add_account_book_form():
+    """侧边栏：添加账单记录"""
+    metadata = get_metadata_index()
+    category_options = metadata.category_options
+    item_options = metadata.item_options
+    user_options = metadata.user_options
+    with st.expander("添加账单记录"):
         with st.form("add_account_book_form"):
             record_date = st.date_input("账单日期", value=date.today())
-            category_name = st.selectbox("分类", list(category_options.keys())) if categories else None
-            item_name = st.selectbox("项目", list(item_options.keys())) if items else None
+            category_name = st.selectbox("分类", list(category_options.keys())) if category_options else None
+            item_name = st.selectbox("项目", list(item_options.keys())) if item_options else None
             expense = st.number_input("支出金额", min_value=0.0, step=0.01, format="%.2f")
             refund = st.number_input("退款金额（可选）", min_value=0.0, step=0.01, format="%.2f", value=0.0)
             remarks = st.text_input("备注（可选）", "")
-            user_name = st.selectbox("用户（可选）", list(user_options.keys())) if users else None
+            user_name = st.selectbox("用户（可选）", list(user_options.keys())) if user_options else None
             submitted = st.form_submit_button("提交")
             if submitted:
                 try:
-                    if not categories or not items:
+                    if not category_options or not item_options:
                         st.toast("请先添加分类和项目！", icon="❌")
                     else:
                         category_id = category_options[category_name]
                         item_id = item_options[item_name]
                         user_id = user_options[user_name] if user_name else None
-                        # 如果是工资记录，调整日期为上个月的最后一天
-                        if item_id == '1301' and record_date.day <= 20:  # 判断是否为工资记录
-                            record_date = adjust_salary_date(record_date)
                         add_account_book(
                             date=record_date,
                             category_id=category_id,
@@ -195,85 +207,119 @@ def account_book_management_page():
                             user_id=user_id
                         )
                         st.toast("账单记录添加成功！", icon="✅")
-                        st.rerun()  # 自动刷新页面
+                        st.rerun(scope="app")  # 自动刷新整个页面
                 except Exception as e:
                     st.toast(f"添加失败: {str(e)}", icon="❌")
 
-    # 侧边栏：更新账单记录
-    if account_books and categories and items:
-        with st.sidebar.expander("更新账单记录"):
-            account_book_to_update = st.selectbox(
-                "选择要更新的账单记录",
-                [f"{book.date} ({book.account_book_id})" for book in account_books],
-                key="update_account_book_select"
-            )
-            account_book_id_to_update = account_books[
-                [f"{b.date} ({b.account_book_id})" for b in account_books].index(account_book_to_update)
-            ].account_book_id
-
-            # 获取当前账单记录的数据
-            current_record = get_account_book_by_id(account_book_id_to_update)
-
-            # 填充默认值
-            new_record_date = st.date_input("新账单日期", value=current_record.date)
-            new_category_name = st.selectbox(
-                "新分类", list(category_options.keys()),
-                index=list(category_options.keys()).index(next((c.name for c in categories if c.category_id == current_record.category_id), ""))
-            )
-            new_item_name = st.selectbox(
-                "新项目", list(item_options.keys()),
-                index=list(item_options.keys()).index(next((i.name for i in items if i.item_id == current_record.item_id), ""))
-            )
-            # 使用 float 类型作为输入框的默认类型，并在存储时转换为 Decimal
-            new_expense = st.number_input("新支出金额", min_value=0.0, step=0.01, format="%.2f", value=float(current_record.expense))  # 转换为 float
-            new_refund = st.number_input("新退款金额（可选）", min_value=0.0, step=0.01, format="%.2f", value=float(current_record.refund or 0.0))  # 转换为 float
-        
-            new_remarks = st.text_input("新备注（可选）", value=current_record.remarks or "")
-            new_user_name = st.selectbox(
-                "新用户（可选）", list(user_options.keys()),
-                index=list(user_options.keys()).index(next((u.username for u in users if u.user_id == current_record.user_id), "")) if current_record.user_id else 0
-            )
 
-            if st.button("更新账单记录"):
-                try:
-                    new_category_id = category_options[new_category_name]
-                    new_item_id = item_options[new_item_name]
-                    new_user_id = user_options[new_user_name] if new_user_name else None
-
-                    # 如果是工资记录，调整日期为上个月的最后一天
-                    if new_item_id == '1301' and new_record_date.day <= 20:  # 判断是否为工资记录
-                        new_record_date = adjust_salary_date(new_record_date)
-
-                    update_account_book(
-                        account_book_id=account_book_id_to_update,
-                        date=new_record_date,
-                        category_id=new_category_id,
-                        item_id=new_item_id,
-                        expense=new_expense,
-                        refund=new_refund,
-                        remarks=new_remarks,
-                        user_id=new_user_id
-                    )
-                    st.toast("账单记录更新成功！", icon="✅")
-                    st.rerun()  # 自动刷新页面
-                except Exception as e:
-                    st.toast(f"更新失败: {str(e)}", icon="❌")
-
-    # 侧边栏：删除账单记录
-    if account_books:
-        with st.sidebar.expander("删除账单记录"):
-            account_book_to_delete = st.selectbox(
-                "选择要删除的账单记录",
-                [f"{book.date} ({book.account_book_id})" for book in account_books],
-                key="delete_account_book_select"
-            )
-            account_book_id_to_delete = account_books[
-                [f"{b.date} ({b.account_book_id})" for b in account_books].index(account_book_to_delete)
-            ].account_book_id
-            if st.button("删除账单记录"):
-                try:
-                    delete_account_book(account_book_id=account_book_id_to_delete)
-                    st.toast("账单记录删除成功！", icon="✅")
-                    st.rerun()  # 自动刷新页面
-                except Exception as e:
-                    st.toast(f"删除失败: {str(e)}", icon="❌")
\ No newline at end of file
+@profiled_fragment
+def _import_account_books_form(user_id):
+    """
+    侧边栏：批量导入账单记录
+    :param user_id: 未指定用户的行归属的用户 ID (str)
+    """
+    with st.expander("导入账单记录"):
+        # 上一次导入的结果（导入成功后整页刷新，结果保存在会话状态中，刷新后继续显示）
+        last_report = st.session_state.pop("account_book_import_report", None)
+        if last_report is not None:
+            summary, errors = last_report
+            st.write(summary)
+            if errors:
+                show_dataframe(pd.DataFrame(errors, columns=["行号", "错误"]), use_container_width=True, hide_index=True)
+        with st.form("import_account_book_form"):
+            uploaded_file = st.file_uploader("CSV 文件（日期、分类、项目、支出金额、退款金额、备注、用户）", type=["csv"])
+            encoding = st.selectbox("文件编码", ["utf-8-sig", "gbk"])
+            submitted = st.form_submit_button("导入")
+            if submitted:
+                if uploaded_file is None:
+                    st.toast("请先选择 CSV 文件！", icon="❌")
+                else:
+                    report = import_account_books_csv(uploaded_file, encoding=encoding, default_user_id=user_id)
+                    st.session_state["account_book_import_report"] = (str(report), report.errors)
+                    st.toast("账单导入完成！", icon="✅")
+                    st.rerun(scope="app")  # 自动刷新整个页面，账单列表和汇总显示导入后的数据
+
+
+@profiled_fragment
+def _update_account_book_form(user_id):
+    """
+    侧边栏：更新账单记录（在数据库中搜索账单，按账单 ID 读取和更新）
+    :param user_id: 只搜索该用户的账单 (str)
+    """
+    metadata = get_metadata_index()
+    category_options = metadata.category_options
+    item_options = metadata.item_options
+    user_options = metadata.user_options
+    if not category_options or not item_options:
+        return
+    with st.expander("更新账单记录"):
+        account_book_id_to_update = record_picker(
+            "选择要更新的账单记录", search_account_books, "account_book_id", _format_account_book,
+            key="update_account_book_select", placeholder=ACCOUNT_BOOK_SEARCH_PLACEHOLDER, user_id=user_id
+        )
+        if account_book_id_to_update is None:
+            return
+
+        # 获取当前账单记录的数据
+        current_record = get_account_book_by_id(account_book_id_to_update)
+
+        # 填充默认值
+        new_record_date = st.date_input("新账单日期", value=current_record.date)
+        new_category_name = st.selectbox(
+            "新分类", list(category_options.keys()),
+            index=list(category_options.keys()).index(metadata.category_name(current_record.category_id, ""))
+        )
+        new_item_name = st.selectbox(
+            "新项目", list(item_options.keys()),
+            index=list(item_options.keys()).index(metadata.item_name(current_record.item_id, ""))
+        )
+        # 使用 float 类型作为输入框的默认类型，并在存储时转换为 Decimal
+        new_expense = st.number_input("新支出金额", min_value=0.0, step=0.01, format="%.2f", value=float(current_record.expense))  # 转换为 float
+        new_refund = st.number_input("新退款金额（可选）", min_value=0.0, step=0.01, format="%.2f", value=float(current_record.refund or 0.0))  # 转换为 float
+
+        new_remarks = st.text_input("新备注（可选）", value=current_record.remarks or "")
+        new_user_name = st.selectbox(
+            "新用户（可选）", list(user_options.keys()),
+            index=list(user_options.keys()).index(metadata.username(current_record.user_id, "")) if current_record.user_id else 0
+        )
+
+        if st.button("更新账单记录"):
+            try:
+                new_category_id = category_options[new_category_name]
+                new_item_id = item_options[new_item_name]
+                new_user_id = user_options[new_user_name] if new_user_name else None
+
+                update_account_book(
+                    account_book_id=account_book_id_to_update,
+                    date=new_record_date,
+                    category_id=new_category_id,
+                    item_id=new_item_id,
+                    expense=new_expense,
+                    refund=new_refund,
+                    remarks=new_remarks,
+                    user_id=new_user_id
+                )
+                st.toast("账单记录更新成功！", icon="✅")
+                st.rerun(scope="app")  # 自动刷新整个页面
+            except Exception as e:
+                st.toast(f"更新失败: {str(e)}", icon="❌")
+
+
+@profiled_fragment
+def _delete_account_book_form(user_id):
+    """
+    侧边栏：删除账单记录（在数据库中搜索账单，按账单 ID 删除）
+    :param user_id: 只搜索该用户的账单 (str)
+    """
+    with st.expander("删除账单记录"):
+        account_book_id_to_delete = record_picker(
+            "选择要删除的账单记录", search_account_books, "account_book_id", _format_account_book,
+            key="delete_account_book_select", placeholder=ACCOUNT_BOOK_SEARCH_PLACEHOLDER, user_id=user_id
+        )
+        if account_book_id_to_delete is not None and st.button("删除账单记录"):
+            try:
+                delete_account_book(account_book_id=account_book_id_to_delete)
+                st.toast("账单记录删除成功！", icon="✅")
+                st.rerun(scope="app")  # 自动刷新整个页面
+            except Exception as e:
+                st.toast(f"删除失败: {str(e)}", icon="❌")
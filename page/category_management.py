@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
-from models.category_model import add_category, get_all_categories, update_category, delete_category, get_category_by_id
+from models.category_model import add_category, get_all_categories, search_categories, update_category, delete_category
+from utils.instrumentation import show_dataframe
+from utils.record_picker import record_picker
 
-# 初始化数据库
-from models.database import init_db
-init_db()
+def _format_category(category):
+    """分类在选择器中的显示文本"""
+    return f"{category.name} ({category.category_id})"
 
 def category_management_page():
     # 页面标题
@@ -15,7 +17,7 @@ def category_management_page():
     if categories:
         category_data = [{"分类 ID": category.category_id, "名称": category.name, "备注": category.remark} for category in categories]
         df_categories = pd.DataFrame(category_data)
-        st.dataframe(df_categories, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
+        show_dataframe(df_categories, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
     else:
         st.info("暂无分类数据。")
 
@@ -40,17 +42,13 @@ def category_management_page():
     # 侧边栏：更新分类
     if categories:
         with st.sidebar.expander("更新分类"):
-            category_to_update = st.selectbox(
-                "选择要更新的分类",
-                [f"{category.name} ({category.category_id})" for category in categories],
-                key="update_category_select"
+            category_id_to_update = record_picker(
+                "选择要更新的分类", search_categories, "category_id", _format_category,
+                key="update_category_select", placeholder="分类 ID 或名称"
             )
-            category_id_to_update = categories[
-                [f"{c.name} ({c.category_id})" for c in categories].index(category_to_update)
-            ].category_id
             new_name = st.text_input("新分类名称")
             new_remark = st.text_input("新备注（可选）", "")
-            if st.button("更新分类"):
+            if category_id_to_update is not None and st.button("更新分类"):
                 try:
                     update_category(category_id=category_id_to_update, name=new_name, remark=new_remark)
                     st.toast("分类更新成功！", icon="✅")
@@ -61,15 +59,11 @@ def category_management_page():
     # 侧边栏：删除分类
     if categories:
         with st.sidebar.expander("删除分类"):
-            category_to_delete = st.selectbox(
-                "选择要删除的分类",
-                [f"{category.name} ({category.category_id})" for category in categories],
-                key="delete_category_select"
+            category_id_to_delete = record_picker(
+                "选择要删除的分类", search_categories, "category_id", _format_category,
+                key="delete_category_select", placeholder="分类 ID 或名称"
             )
-            category_id_to_delete = categories[
-                [f"{c.name} ({c.category_id})" for c in categories].index(category_to_delete)
-            ].category_id
-            if st.button("删除分类"):
+            if category_id_to_delete is not None and st.button("删除分类"):
                 try:
                     delete_category(category_id=category_id_to_delete)
                     st.toast("分类删除成功！", icon="✅")
@@ -1,34 +1,36 @@
 import streamlit as st
 import pandas as pd
-from models.item_model import add_item, get_all_items, update_item, delete_item, get_item_by_id
-from models.category_model import get_all_categories
+from models.item_model import add_item, update_item, delete_item, search_items
+from models.metadata_index import get_metadata_index
+from utils.instrumentation import show_dataframe
+from utils.record_picker import record_picker
 
-# 初始化数据库
-from models.database import init_db
-init_db()
+def _format_item(item):
+    """项目在选择器中的显示文本"""
+    return f"{item.name} ({item.item_id})"
 
 def item_management_page():
     # 页面标题
     st.header("分类项目管理")
 
-    # 获取所有分类数据（用于下拉列表）
-    categories = get_all_categories()
-    category_options = {category.name: category.category_id for category in categories} if categories else {}
+    # 分类和项目从内存索引读取
+    metadata = get_metadata_index()
+    categories = list(metadata.categories.values())
+    items = list(metadata.items.values())
+    category_options = metadata.category_options
 
-    # 获取所有项目数据
-    items = get_all_items()
     if items:
         item_data = [
             {
                 "分类项目 ID": item.item_id,
                 "名称": item.name,
-                "所属分类": next((c.name for c in categories if c.category_id == item.category_id), "未知分类"),
+                "所属分类": metadata.category_name(item.category_id),
                 "备注": item.remark
             }
             for item in items
         ]
         df_items = pd.DataFrame(item_data)
-        st.dataframe(df_items, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
+        show_dataframe(df_items, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
     else:
         st.info("暂无分类项目数据。")
 
@@ -57,18 +59,14 @@ def item_management_page():
     # 侧边栏：更新项目
     if items and categories:
         with st.sidebar.expander("更新分类项目"):
-            item_to_update = st.selectbox(
-                "选择要更新的分类项目",
-                [f"{item.name} ({item.item_id})" for item in items],
-                key="update_item_select"
+            item_id_to_update = record_picker(
+                "选择要更新的分类项目", search_items, "item_id", _format_item,
+                key="update_item_select", placeholder="分类项目 ID 或名称"
             )
-            item_id_to_update = items[
-                [f"{i.name} ({i.item_id})" for i in items].index(item_to_update)
-            ].item_id
             new_name = st.text_input("新分类项目名称")
             new_category_name = st.selectbox("新所属分类", list(category_options.keys()))
             new_remark = st.text_input("新备注（可选）", "")
-            if st.button("更新分类项目"):
+            if item_id_to_update is not None and st.button("更新分类项目"):
                 try:
                     new_category_id = category_options[new_category_name]
                     update_item(item_id=item_id_to_update, name=new_name, remark=new_remark)
@@ -80,15 +78,11 @@ def item_management_page():
     # 侧边栏：删除项目
     if items:
         with st.sidebar.expander("删除分类项目"):
-            item_to_delete = st.selectbox(
-                "选择要删除的分类项目",
-                [f"{item.name} ({item.item_id})" for item in items],
-                key="delete_item_select"
+            item_id_to_delete = record_picker(
+                "选择要删除的分类项目", search_items, "item_id", _format_item,
+                key="delete_item_select", placeholder="分类项目 ID 或名称"
             )
-            item_id_to_delete = items[
-                [f"{i.name} ({i.item_id})" for i in items].index(item_to_delete)
-            ].item_id
-            if st.button("删除分类项目"):
+            if item_id_to_delete is not None and st.button("删除分类项目"):
                 try:
                     delete_item(item_id=item_id_to_delete)
                     st.toast("分类项目删除成功！", icon="✅")
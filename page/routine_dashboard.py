@@ -1,372 +1,321 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from datetime import date, timedelta
-# 初始化数据库
-from models.database import init_db
-init_db()
-# 获取所有用户数据（用于下拉列表）
-from models.user_model import get_all_users
-users = get_all_users()
-user_options = {user.username: user.user_id for user in users} if users else {}
-# 获取所有分类数据（用于账单记录）
-from models.category_model import get_all_categories
-categories = get_all_categories()
-category_options = {category.name: category.category_id for category in categories} if categories else {}
-# 获取所有项目数据（用于账单记录）
-from models.item_model import get_all_items
-items = get_all_items()
-item_options = {item.name: item.item_id for item in items} if items else {}
-# 获取所有账单记录数据
-from models.account_book_model import get_all_account_books
-account_books = get_all_account_books()
-# 获取所有健身记录数据
-from models.fitness_model import get_all_fitness
-fitness_records = get_all_fitness()
+from models.metadata_index import get_metadata_index
+from models.account_book_model import get_account_book_months, get_account_book_monthly_trend, summarize_account_books
+from utils.helpers import get_period_bounds, get_recent_months, get_month_bounds
+from utils.fitness_analytics import calculate_training_frequency
+from utils.instrumentation import profiled_fragment
+from models.fitness_model import get_fitness_months, get_fitness_activity_counts, get_fitness_monthly_days
 
-def adjust_salary_date(record_date):
-    """
-    调整工资日期为发放月份的前一个月的最后一天。
-    :param record_date: 工资发放的实际日期
-    :return: 调整后的日期
-    """
-    # 获取发放月份的第一天
-    first_day_of_month = record_date.replace(day=1)
-    # 前一个月的最后一天 = 当前月份第一天 - 1天
-    last_day_of_previous_month = first_day_of_month - timedelta(days=1)
-    return last_day_of_previous_month
-
-def calculate_training_frequency(filtered_records, time_unit, selected_year, selected_month=None):
-    """
-    计算训练频率，并返回分子（训练天数）、分母（总天数）和频率值
-    """
-    # 获取 status 为 1 的训练天数
-    training_days = len({record.activity_date for record in filtered_records if record.status == 1})
-    # 根据时间单位和选择的时间范围计算总天数
-    today = date.today()
-    if time_unit == "按年查看":
-        if selected_year == today.year:  # 当前年份
-            start_of_year = date(selected_year, 1, 1)
-            total_days = (today - start_of_year).days + 1
-        else:  # 往年
-            start_of_year = date(selected_year, 1, 1)
-            end_of_year = date(selected_year, 12, 31)
-            total_days = (end_of_year - start_of_year).days + 1
-    else:  # 按月查看
-        if selected_year == today.year and selected_month == today.month:  # 当前月份
-            start_of_month = date(selected_year, selected_month, 1)
-            total_days = (today - start_of_month).days + 1
-        else:  # 往月
-            if selected_month == 12:
-                next_month = date(selected_year + 1, 1, 1)
-            else:
-                next_month = date(selected_year, selected_month + 1, 1)
-            start_of_month = date(selected_year, selected_month, 1)
-            total_days = (next_month - start_of_month).days
-    # 计算训练频率
-    if total_days > 0:
-        training_frequency = training_days / total_days
-    else:
-        training_frequency = 0
-    return training_days, total_days, training_frequency
+# 月度趋势图可选的统计范围（月）
+TREND_WINDOWS = [12, 24, 60]
 
 def routine_dashboard_page():
     st.header("图表分析")
+
+    # 看板数据在每次渲染时读取，查询结果由进程内缓存共享，写入提交后自动失效
+    user_options = get_metadata_index().user_options  # 分类、项目和用户的内存索引
     
     # 创建 Tab 页面
     tab1, tab2 = st.tabs(["健身记录", "账单记录"])
-    
+
+    # 用户选择在页面级别（切换用户时重新运行整个页面），筛选器和图表各自作为独立片段运行，
+    # 切换时间范围或统计范围时只重新运行对应的片段
     with tab1:  # 健身记录页面
-        # 用户选择、时间单位选择、年月选择器放在同一行
-        col1, col2, col3 = st.columns([2, 1, 2])  # 调整列宽比例
+        col1, _ = st.columns([2, 3])
         with col1:
             fitness_selected_user = st.selectbox(
                 "选择用户", 
                 list(user_options.keys()),
                 key="fitness_user_selector"
             )
-            user_id = user_options[fitness_selected_user]
-        with col2:
-            time_unit = st.radio(
-                "时间单位", 
-                ["按月查看", "按年查看"], 
-                index=0,  # 默认选择“按月查看”
-                horizontal=True
-                )
-        with col3:
-            if time_unit == "按年查看":
-                selected_year = st.selectbox(
-                    "选择年份",
-                    sorted({record.activity_date.year for record in fitness_records}, reverse=True),
-                    key="fitness_year_selector"
-                )
-                filtered_records = [
-                    record for record in fitness_records
-                    if record.activity_date.year == selected_year and record.user_id == user_id
-                ]
-            else:
-                # 提取所有年份和月份
-                all_dates = sorted({(record.activity_date.year, record.activity_date.month) for record in fitness_records}, reverse=True)
-                selected_date = st.selectbox(
-                    "选择年月",
-                    [f"{year}-{month:02d}" for year, month in all_dates],
-                    key="fitness_month_selector"
-                )
-                selected_year, selected_month = map(int, selected_date.split("-"))
-                filtered_records = [
-                    record for record in fitness_records
-                    if record.activity_date.year == selected_year
-                    and record.activity_date.month == selected_month
-                    and record.user_id == user_id
-                ]
-        # 如果没有筛选到数据
-        if not filtered_records:
-            st.info("当前时间范围内暂无健身记录数据。")
-            return
-        # 分割线
-        st.markdown("---")
-        # 总体统计
-        st.subheader("总体统计")
-        activity_counts = {}
-        for record in filtered_records:
-            if record.status == 1:  # 只统计 status 为 1 的活动
-                for activity in record.activities:
-                    activity_counts[activity] = activity_counts.get(activity, 0) + 1
-        total_activities = sum(activity_counts.values())
-        # 计算训练频率
-        training_days, total_days, training_frequency = calculate_training_frequency(
-            filtered_records, time_unit, selected_year, selected_month if time_unit == "按月查看" else None
-        )
-        # 在同一行显示总训练次数、总训练天数和训练频率
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("总训练次数", total_activities)
-        with col2:
-            st.metric("总训练天数", training_days)
-        with col3:
-            # 显示训练频率（大指标）和分子/分母（小指标）
-            st.metric(
-                label="训练频率",
-                value=f"{training_frequency:.2%}",
-                delta=f"{training_days} / {total_days}",  # 小指标：分子 / 分母
-                delta_color="off"  # 禁用颜色变化
-            )
-        # 图表布局：活动分布图和月度趋势统计图并排显示
-        st.subheader("图表展示")
-        col_chart1, col_chart2 = st.columns(2)
-        # 活动分布图（横向条形图）
-        with col_chart1:
-            st.caption("健身活动分布图")
-            df_activity_counts = pd.DataFrame(list(activity_counts.items()), columns=["活动", "次数"])
-            df_activity_counts = df_activity_counts.sort_values(by="次数", ascending=False)
-            # Altair 横向条形图
-            bar_chart = alt.Chart(df_activity_counts).mark_bar(
-                color="#4C78A8",  # 条形颜色
-                cornerRadiusTopLeft=5,  # 圆角
-                cornerRadiusTopRight=5
-            ).encode(
-                x=alt.X("次数:Q", title="训练次数", axis=alt.Axis(grid=False)),  # X 轴为次数
-                y=alt.Y("活动:N", sort="-x", title="健身活动"),  # Y 轴为活动，按次数降序排列
-                tooltip=["活动:N", "次数:Q"]
-            ).properties(
-                width=400,
-                height=300,
-                title="健身活动分布"
-            ).configure_axis(
-                labelFontSize=12,
-                titleFontSize=14,
-                labelColor="#666666",  # 标签颜色
-                titleColor="#333333"   # 标题颜色
-            ).configure_title(
-                fontSize=16,
-                anchor="start",
-                color="#333333"  # 标题颜色
-            )
-            st.altair_chart(bar_chart, use_container_width=True)
-        # 月度趋势统计图（组合图：柱状图+折线图）
-        with col_chart2:
-            st.caption("月度趋势统计图")
-            # 获取最近5个月的数据
-            today = date.today()
-            recent_months = [(today - timedelta(days=i*30)).strftime("%Y-%m") for i in range(5)]
-            recent_months = sorted(recent_months)  # 按时间顺序排序
-            monthly_data = []
-            for month in recent_months:
-                year, month_num = map(int, month.split("-"))
-                start_of_month = date(year, month_num, 1)
-                if month_num == 12:
-                    next_month = date(year + 1, 1, 1)
-                else:
-                    next_month = date(year, month_num + 1, 1)
-                days_in_month = sum(
-                    1 for record in fitness_records
-                    if record.user_id == user_id and record.status == 1 and start_of_month <= record.activity_date < next_month
-                )
-                monthly_data.append({"YearMonth": month, "Days": days_in_month})
-            df_monthly = pd.DataFrame(monthly_data)
-            # Altair 柱状图【size参数改变柱子的宽度】
-            bar_chart = alt.Chart(df_monthly).mark_bar(color="#4C78A8", size=30).encode(
-                x=alt.X("YearMonth:N", title="月份"),
-                y=alt.Y("Days:Q", title="健身天数"),
-                tooltip=["YearMonth:N", "Days:Q"]
-            ).properties(
-                width=400,
-                height=300,
-                title="月度趋势统计"
-            ).configure_axis(
-                labelFontSize=12,
-                titleFontSize=14,
-                labelColor="#666666",  # 标签颜色
-                titleColor="#333333"   # 标题颜色
-            ).configure_title(
-                fontSize=16,
-                anchor="start",
-                color="#333333"  # 标题颜色
-            )
-            st.altair_chart(bar_chart, use_container_width=True)
+            user_id = user_options[fitness_selected_user] if fitness_selected_user else None
+        _fitness_overview(user_id)
+        _fitness_trend_chart(user_id)
 
     with tab2:  # 账单记录页面
         st.header("账单记录分析")
-        
-        # 用户选择、时间单位选择、年月选择器放在同一行
-        col1, col2, col3 = st.columns([2, 1, 2])  # 调整列宽比例
+        col1, _ = st.columns([2, 3])
         with col1:
             account_book_selected_user = st.selectbox(
                 "选择用户", 
                 list(user_options.keys()), 
                 key="account_book_user_select")
-            user_id = user_options[account_book_selected_user]
-        with col2:
-            time_unit = st.radio(
-                "时间单位", 
-                ["按月查看", "按年查看"],
-                index=0,  # 默认按月查看
-                horizontal=True, 
-                key="bill_time_unit")
-        with col3:
-            if time_unit == "按年查看":
-                selected_year = st.selectbox(
-                    "选择年份",
-                    sorted({record.date.year for record in account_books}, reverse=True),
-                    key="account_book_year_selector"
-                )
-                filtered_records = [
-                    record for record in account_books
-                    if (record.date.year == selected_year or 
-                        (record.date.day <= 20 and record.item_id == '1301' and adjust_salary_date(record.date).year == selected_year))
-                    and record.user_id == user_id
-                ]
-            else:
-                # 提取所有年份和月份
-                all_dates = sorted({(record.date.year, record.date.month) for record in account_books}, reverse=True)
-                selected_date = st.selectbox(
-                    "选择年月",
-                    [f"{year}-{month:02d}" for year, month in all_dates],
-                    key="account_book_month_selector"
-                )
-                selected_year, selected_month = map(int, selected_date.split("-"))
-                filtered_records = [
-                    record for record in account_books
-                    if ((record.date.year == selected_year and record.date.month == selected_month) or
-                        (record.date.day <= 20 and record.item_id == '1301' and 
-                         adjust_salary_date(record.date).year == selected_year and 
-                         adjust_salary_date(record.date).month == selected_month))
-                    and record.user_id == user_id
-                ]
-        
-        # 如果没有筛选到数据
-        if not filtered_records:
-            st.info("当前时间范围内暂无账单记录数据。")
-            return
-        
-        # 区分工资记录和其他记录
-        final_records = []
-        for record in filtered_records:
-            if record.item_id == '1301' and record.date.day <= 20:  # 判断是否为工资记录
-                adjusted_date = adjust_salary_date(record.date)  # 调整日期为上个月的最后一天
-                # 判断调整后的日期是否属于当前筛选范围
-                if time_unit == "按年查看":
-                    if adjusted_date.year == selected_year:
-                        record.date = adjusted_date  # 动态调整日期
-                        final_records.append(record)
-                else:  # 按月查看
-                    if adjusted_date.year == selected_year and adjusted_date.month == selected_month:
-                        record.date = adjusted_date  # 动态调整日期
-                        final_records.append(record)
-            else:
-                # 非工资记录直接保留
-                final_records.append(record)
-        
-        # 按日期从大到小排序
-        final_records.sort(key=lambda x: x.date, reverse=True)
-        
-        # 计算指标：总收入、总支出、结余、支出率
-        total_income = sum(record.expense - record.refund for record in final_records if record.category_id == '13')  # 收入
-        total_expense = sum(record.expense - record.refund for record in final_records if record.category_id != '13')  # 支出
-        balance = total_income - total_expense  # 结余
-        expense_ratio = total_expense / total_income if total_income > 0 else 0  # 支出率
-        
-        # 在一行显示指标
-        col_metric1, col_metric2, col_metric3, col_metric4 = st.columns(4)
-        with col_metric1:
-            st.metric("总收入", f"¥{total_income:.2f}")
-        with col_metric2:
-            st.metric("总支出", f"¥{total_expense:.2f}")
-        with col_metric3:
-            st.metric(
-                label="结余", 
-                value=f"¥{balance:.2f}",
-                delta=f'{total_income}-{total_expense}',
-                delta_color="off"
+            user_id = user_options[account_book_selected_user] if account_book_selected_user else None
+        _account_book_overview(user_id)
+        _account_book_trend_chart(user_id)
+
+
+@profiled_fragment
+def _fitness_overview(user_id):
+    """
+    健身记录的时间范围筛选器、总体统计和活动分布图
+    :param user_id: 用户 ID (str)
+    """
+    col2, col3 = st.columns([1, 2])
+    with col2:
+        time_unit = st.radio(
+            "时间单位", 
+            ["按月查看", "按年查看"], 
+            index=0,  # 默认选择“按月查看”
+            horizontal=True
             )
-        with col_metric4:
-            st.metric(
-                label="支出率", 
-                value=f"{expense_ratio:.2%}",
-                delta=f'{total_expense}/{total_income}',
-                delta_color="off"
+    with col3:
+        # 只查询当前用户有健身记录的年月，不加载健身记录明细
+        all_dates = get_fitness_months(user_id) if user_id else []
+        if time_unit == "按年查看":
+            selected_year = st.selectbox(
+                "选择年份",
+                sorted({year for year, _ in all_dates}, reverse=True),
+                key="fitness_year_selector"
             )
+            selected_month = None
+        else:
+            selected_date = st.selectbox(
+                "选择年月",
+                [f"{year}-{month:02d}" for year, month in all_dates],
+                key="fitness_month_selector"
+            )
+            selected_year, selected_month = map(int, selected_date.split("-")) if selected_date else (None, None)
+    # 如果没有筛选到数据
+    if not all_dates:
+        st.info("当前时间范围内暂无健身记录数据。")
+        return
+    # 分割线
+    st.markdown("---")
+    # 总体统计
+    st.subheader("总体统计")
+    period_start, period_end = get_period_bounds(selected_year, selected_month)
+    # 活动分布由数据库按活动分组统计（只统计 status 为 1 的活动）
+    activity_counts = get_fitness_activity_counts(user_id, period_start, period_end)
+    total_activities = sum(activity_counts.values())
+    # 计算训练频率
+    training_days, total_days, training_frequency = calculate_training_frequency(user_id, period_start, period_end)
+    # 在同一行显示总训练次数、总训练天数和训练频率
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("总训练次数", total_activities)
+    with col2:
+        st.metric("总训练天数", training_days)
+    with col3:
+        # 显示训练频率（大指标）和分子/分母（小指标）
+        st.metric(
+            label="训练频率",
+            value=f"{training_frequency:.2%}",
+            delta=f"{training_days} / {total_days}",  # 小指标：分子 / 分母
+            delta_color="off"  # 禁用颜色变化
+        )
+    st.subheader("图表展示")
+    # 活动分布图（横向条形图）
+    st.caption("健身活动分布图")
+    df_activity_counts = pd.DataFrame(list(activity_counts.items()), columns=["活动", "次数"])
+    df_activity_counts = df_activity_counts.sort_values(by="次数", ascending=False)
+    # Altair 横向条形图
+    bar_chart = alt.Chart(df_activity_counts).mark_bar(
+        color="#4C78A8",  # 条形颜色
+        cornerRadiusTopLeft=5,  # 圆角
+        cornerRadiusTopRight=5
+    ).encode(
+        x=alt.X("次数:Q", title="训练次数", axis=alt.Axis(grid=False)),  # X 轴为次数
+        y=alt.Y("活动:N", sort="-x", title="健身活动"),  # Y 轴为活动，按次数降序排列
+        tooltip=["活动:N", "次数:Q"]
+    ).properties(
+        width=400,
+        height=300,
+        title="健身活动分布"
+    ).configure_axis(
+        labelFontSize=12,
+        titleFontSize=14,
+        labelColor="#666666",  # 标签颜色
+        titleColor="#333333"   # 标题颜色
+    ).configure_title(
+        fontSize=16,
+        anchor="start",
+        color="#333333"  # 标题颜色
+    )
+    st.altair_chart(bar_chart, use_container_width=True)
+
+
+@profiled_fragment
+def _fitness_trend_chart(user_id):
+    """
+    最近若干个月的健身天数趋势图（统计范围可选）
+    :param user_id: 用户 ID (str)
+    """
+    if not user_id:
+        return
+    st.caption("月度趋势统计图")
+    trend_months = st.selectbox(
+        "统计范围", TREND_WINDOWS, format_func=lambda n: f"最近 {n} 个月", key="fitness_trend_months"
+    )
+    # 最近若干个自然月的健身天数，由数据库按月分组统计，没有记录的月份补 0
+    recent_months = get_recent_months(trend_months)
+    monthly_days = get_fitness_monthly_days(user_id, *get_month_bounds(recent_months[0], recent_months[-1]))
+    monthly_data = [{"YearMonth": month, "Days": monthly_days.get(month, 0)} for month in recent_months]
+    df_monthly = pd.DataFrame(monthly_data)
+    # Altair 柱状图【size参数改变柱子的宽度】
+    bar_chart = alt.Chart(df_monthly).mark_bar(color="#4C78A8", size=max(360 // trend_months, 4)).encode(
+        x=alt.X("YearMonth:N", title="月份"),
+        y=alt.Y("Days:Q", title="健身天数"),
+        tooltip=["YearMonth:N", "Days:Q"]
+    ).properties(
+        width=400,
+        height=300,
+        title="月度趋势统计"
+    ).configure_axis(
+        labelFontSize=12,
+        titleFontSize=14,
+        labelColor="#666666",  # 标签颜色
+        titleColor="#333333"   # 标题颜色
+    ).configure_title(
+        fontSize=16,
+        anchor="start",
+        color="#333333"  # 标题颜色
+    )
+    st.altair_chart(bar_chart, use_container_width=True)
+
+
+@profiled_fragment
+def _account_book_overview(user_id):
+    """
+    账单记录的时间范围筛选器、收支指标和分类支出图
+    :param user_id: 用户 ID (str)
+    """
+    metadata = get_metadata_index()
+    col2, col3 = st.columns([1, 2])
+    with col2:
+        time_unit = st.radio(
+            "时间单位", 
+            ["按月查看", "按年查看"],
+            index=0,  # 默认按月查看
+            horizontal=True, 
+            key="bill_time_unit")
+    with col3:
+        # 只查询当前用户有账单的年月，不加载账单明细
+        all_dates = get_account_book_months(user_id) if user_id else []
+        if time_unit == "按年查看":
+            selected_year = st.selectbox(
+                "选择年份",
+                sorted({year for year, _ in all_dates}, reverse=True),
+                key="account_book_year_selector"
+            )
+            selected_month = None
+        else:
+            selected_date = st.selectbox(
+                "选择年月",
+                [f"{year}-{month:02d}" for year, month in all_dates],
+                key="account_book_month_selector"
+            )
+            selected_year, selected_month = map(int, selected_date.split("-")) if selected_date else (None, None)
+
+    # 在数据库中按分类汇总当前用户在所选账期内的账单，只返回少量汇总行
+    summary = summarize_account_books(user_id, *get_period_bounds(selected_year, selected_month)) if selected_year else None
+
+    # 如果没有筛选到数据
+    if not summary or not summary["has_records"]:
+        st.info("当前时间范围内暂无账单记录数据。")
+        return
+
+    # 指标：总收入、总支出、结余、支出率
+    total_income = summary["total_income"]  # 收入
+    total_expense = summary["total_expense"]  # 支出
+    balance = summary["balance"]  # 结余
+    expense_ratio = summary["expense_ratio"]  # 支出率
         
-        # 图表布局：收入支出柱形图和分类支出柱形图并排显示
-        st.subheader("图表展示")
-        col_chart1, col_chart2 = st.columns(2)
+    # 在一行显示指标
+    col_metric1, col_metric2, col_metric3, col_metric4 = st.columns(4)
+    with col_metric1:
+        st.metric("总收入", f"¥{total_income:.2f}")
+    with col_metric2:
+        st.metric("总支出", f"¥{total_expense:.2f}")
+    with col_metric3:
+        st.metric(
+            label="结余", 
+            value=f"¥{balance:.2f}",
+            delta=f'{total_income}-{total_expense}',
+            delta_color="off"
+        )
+    with col_metric4:
+        st.metric(
+            label="支出率", 
+            value=f"{expense_ratio:.2%}",
+            delta=f'{total_expense}/{total_income}',
+            delta_color="off"
+        )
         
-        # 收入与支出对比柱形图
-        with col_chart1:
-            st.caption("收入与支出对比")
-            # 需要将decimal.Decimal转为float
-            income_data = [{"类型": "收入", "金额": float(total_income)}]
-            expense_data = [{"类型": "支出", "金额": float(total_expense)}]
-            df_income_expense = pd.DataFrame(income_data + expense_data)
-            bar_chart = alt.Chart(df_income_expense).mark_bar().encode(
-                x=alt.X("类型:N", title=None),
-                y=alt.Y("金额:Q", title="金额"),
-                color=alt.Color("类型:N", scale=alt.Scale(range=["#4C78A8", "#F8766D"]))
-            ).properties(
-                width=400,
-                height=300,
-                title="收入与支出对比"
-            )
-            st.altair_chart(bar_chart, use_container_width=True)
+    # 图表布局：收入支出柱形图和分类支出柱形图并排显示
+    st.subheader("图表展示")
+    col_chart1, col_chart2 = st.columns(2)
         
-        # 分类支出分布柱形图
-        with col_chart2:
-            st.caption("分类支出分布")
-            category_expenses = {}
-            for record in final_records:
-                if record.category_id != '13':  # 排除收入
-                    category_name = next((c.name for c in categories if c.category_id == record.category_id), "未知分类")
-                    # 需要将decimal.Decimal转为float
-                    category_expenses[category_name] = category_expenses.get(category_name, 0) + (float(record.expense - record.refund))
-            df_category_expenses = pd.DataFrame(list(category_expenses.items()), columns=["分类", "金额"])
-            df_category_expenses = df_category_expenses.sort_values(by="金额", ascending=False)
-            bar_chart = alt.Chart(df_category_expenses).mark_bar(color="#F8766D").encode(
-                x=alt.X("金额:Q", title="金额"),
-                y=alt.Y("分类:N", sort="-x", title="分类"),
-                tooltip=["分类:N", "金额:Q"]
-            ).properties(
-                width=400,
-                height=300,
-                title="分类支出分布"
-            )
-            st.altair_chart(bar_chart, use_container_width=True)
+    # 收入与支出对比柱形图
+    with col_chart1:
+        st.caption("收入与支出对比")
+        # 需要将decimal.Decimal转为float
+        income_data = [{"类型": "收入", "金额": float(total_income)}]
+        expense_data = [{"类型": "支出", "金额": float(total_expense)}]
+        df_income_expense = pd.DataFrame(income_data + expense_data)
+        bar_chart = alt.Chart(df_income_expense).mark_bar().encode(
+            x=alt.X("类型:N", title=None),
+            y=alt.Y("金额:Q", title="金额"),
+            color=alt.Color("类型:N", scale=alt.Scale(range=["#4C78A8", "#F8766D"]))
+        ).properties(
+            width=400,
+            height=300,
+            title="收入与支出对比"
+        )
+        st.altair_chart(bar_chart, use_container_width=True)
+        
+    # 分类支出分布柱形图
+    with col_chart2:
+        st.caption("分类支出分布")
+        category_expenses = {}
+        for category_id, amount in summary["category_expenses"].items():  # 已排除收入
+            category_name = metadata.category_name(category_id)
+            # 需要将decimal.Decimal转为float
+            category_expenses[category_name] = category_expenses.get(category_name, 0) + float(amount)
+        df_category_expenses = pd.DataFrame(list(category_expenses.items()), columns=["分类", "金额"])
+        df_category_expenses = df_category_expenses.sort_values(by="金额", ascending=False)
+        bar_chart = alt.Chart(df_category_expenses).mark_bar(color="#F8766D").encode(
+            x=alt.X("金额:Q", title="金额"),
+            y=alt.Y("分类:N", sort="-x", title="分类"),
+            tooltip=["分类:N", "金额:Q"]
+        ).properties(
+            width=400,
+            height=300,
+            title="分类支出分布"
+        )
+        st.altair_chart(bar_chart, use_container_width=True)
+
+
+@profiled_fragment
+def _account_book_trend_chart(user_id):
+    """
+    月度收支趋势图（读取月度汇总表，按月分组，统计范围可选）
+    :param user_id: 用户 ID (str)
+    """
+    if not user_id:
+        return
+    st.subheader("月度收支趋势")
+    account_book_trend_months = st.selectbox(
+        "统计范围", TREND_WINDOWS, format_func=lambda n: f"最近 {n} 个月", key="account_book_trend_months"
+    )
+    recent_months = get_recent_months(account_book_trend_months)
+    monthly_trend = get_account_book_monthly_trend(user_id, recent_months[0], recent_months[-1])
+    trend_data = []
+    for month in recent_months:
+        income, expense = monthly_trend.get(month, (0, 0))
+        # 需要将decimal.Decimal转为float
+        trend_data.append({"月份": month, "类型": "收入", "金额": float(income)})
+        trend_data.append({"月份": month, "类型": "支出", "金额": float(expense)})
+    df_trend = pd.DataFrame(trend_data)
+    line_chart = alt.Chart(df_trend).mark_line(point=True).encode(
+        x=alt.X("月份:N", title="月份"),
+        y=alt.Y("金额:Q", title="金额"),
+        color=alt.Color("类型:N", scale=alt.Scale(domain=["收入", "支出"], range=["#4C78A8", "#F8766D"])),
+        tooltip=["月份:N", "类型:N", "金额:Q"]
+    ).properties(
+        height=300,
+        title="月度收支趋势"
+    )
+    st.altair_chart(line_chart, use_container_width=True)
@@ -1,10 +1,7 @@
 import streamlit as st
 import pandas as pd
 from models.user_model import add_user, get_all_users, update_user, delete_user
-
-# 初始化数据库
-from models.database import init_db
-init_db()
+from utils.instrumentation import show_dataframe
 
 def user_management_page():
     # 获取所有用户数据
@@ -18,7 +15,7 @@ def user_management_page():
     if users:
         user_data = [{"用户名": user.username, "密码": user.password, "邮箱": user.email} for user in users]
         df_users = pd.DataFrame(user_data)
-        st.dataframe(df_users, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
+        show_dataframe(df_users, use_container_width=True, hide_index=True)  # 使用 DataFrame 显示，隐藏索引
     else:
         st.info("暂无用户数据。")
 
@@ -0,0 +1,61 @@
+"""
+行为测试：在内存 SQLite 数据库上验证账单、健身记录和导入等逻辑的正确性
+    pytest                 # 默认运行 tests
+    pytest tests -k summary
+性能基准测试使用另一个数据库，需要单独运行：pytest benchmarks
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def pytest_configure(config):
+    """在导入 models 之前把数据库指向内存 SQLite，测试不会读写 ROUTINE_DB_URL 指向的数据库"""
+    os.environ["ROUTINE_DB_URL"] = "sqlite://"
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def empty_database():
+    """每个测试使用空数据库：重新建表，并清空查询缓存和训练日历"""
+    from models.cache import clear_cache
+    from models.database import Base, engine, init_db
+    from utils import fitness_analytics
+
+    init_db()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    clear_cache()
+    with fitness_analytics._calendars_lock:
+        fitness_analytics._calendars.clear()
+
+
+@pytest.fixture
+def users():
+    """两个用户，返回 [张三的用户 ID, 李四的用户 ID]"""
+    from models.user_model import add_user, get_all_users
+
+    add_user("张三", "password", "zhangsan@example.com")
+    add_user("李四", "password", "lisi@example.com")
+    user_ids = {user.username: user.user_id for user in get_all_users()}
+    return [user_ids["张三"], user_ids["李四"]]
+
+
+@pytest.fixture
+def ledger_metadata(users):
+    """收入分类 13（工资项目 1301、奖金项目 1302）和支出分类 20（项目 2001、2002）"""
+    from models.category_model import add_category
+    from models.item_model import add_item
+
+    add_category("13", "收入")
+    add_category("20", "餐饮")
+    add_item("1301", "13", "工资")
+    add_item("1302", "13", "奖金")
+    add_item("2001", "20", "早餐")
+    add_item("2002", "20", "午餐")
+    return users
@@ -0,0 +1,189 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, text
+
+from models.account_book_model import (
+    AccountBook, AccountBookSequence, add_account_book, add_account_books, backfill_accounting_date, delete_account_book,
+    generate_account_book_id, get_account_books, get_account_books_page, rebuild_account_book_monthly_summary,
+    reserve_account_book_id_blocks, reserve_account_book_ids, search_account_books, seed_account_book_sequence,
+    update_account_book,
+)
+from models.account_book_summary_model import AccountBookMonthlySummary
+from models.database import session_scope
+from models.user_model import delete_user
+
+ITEMS = {"1301": "13", "1302": "13", "2001": "20", "2002": "20"}
+
+
+def _summary_snapshot():
+    """读取月度汇总表，忽略增量维护后归零的行（从头重建时不会生成这些行）"""
+    with session_scope() as session:
+        rows = session.execute(select(AccountBookMonthlySummary.__table__)).all()
+    return {
+        (row.user_id, row.year_month, row.category_id): (Decimal(row.expense), Decimal(row.refund), row.record_count)
+        for row in rows
+        if row.record_count or row.expense or row.refund
+    }
+
+
+def _random_record(rng, user_ids):
+    item_id = rng.choice(list(ITEMS))
+    return {
+        "date": date(2024, 1, 1) + timedelta(days=rng.randrange(120)),
+        "category_id": ITEMS[item_id],
+        "item_id": item_id,
+        "expense": Decimal(rng.randrange(100, 100000)) / 100,
+        "refund": Decimal(rng.randrange(100, 1000)) / 100 if rng.random() < 0.3 else None,
+        "user_id": rng.choice(user_ids + [None]),
+    }
+
+
+def _all_ids():
+    with session_scope() as session:
+        return session.execute(select(AccountBook.account_book_id)).scalars().all()
+
+
+def test_account_book_ids_are_sequential_per_day(ledger_metadata):
+    day = date(2024, 3, 5)
+    assert generate_account_book_id(day) == "202403050001"
+    assert reserve_account_book_ids(day, 3) == ["202403050002", "202403050003", "202403050004"]
+    blocks = reserve_account_book_id_blocks({day: 2, date(2024, 3, 6): 1})
+    assert blocks == {day: ["202403050005", "202403050006"], date(2024, 3, 6): ["202403060001"]}
+
+
+def test_account_book_sequence_is_seeded_from_existing_ids(ledger_metadata):
+    add_account_books([
+        {"date": date(2024, 3, 5), "category_id": "20", "item_id": "2001", "expense": Decimal("1")} for _ in range(3)
+    ])
+    with session_scope() as session:
+        session.execute(AccountBookSequence.__table__.delete())
+    with session_scope() as session:
+        seed_account_book_sequence(session)
+    assert generate_account_book_id(date(2024, 3, 5)) == "202403050004"
+
+
+def test_salary_accounting_date(ledger_metadata):
+    user_id = ledger_metadata[0]
+    add_account_book(date(2024, 5, 10), "13", "1301", Decimal("8000"), user_id=user_id)
+    add_account_book(date(2024, 5, 25), "13", "1301", Decimal("8000"), user_id=user_id)
+    add_account_book(date(2024, 5, 10), "13", "1302", Decimal("500"), user_id=user_id)
+    records = get_account_books(user_id, date(2024, 1, 1), date(2024, 12, 31))
+    accounting_dates = sorted((record.date, record.item_id, record.accounting_date) for record in records)
+    assert accounting_dates == [
+        (date(2024, 5, 10), "1301", date(2024, 4, 30)),  # 20 日（含）之前的工资计入上个月
+        (date(2024, 5, 10), "1302", date(2024, 5, 10)),
+        (date(2024, 5, 25), "1301", date(2024, 5, 25)),
+    ]
+
+    # 修改日期或项目后重新计算记账日期
+    salary_id = next(record.account_book_id for record in records if record.accounting_date == date(2024, 4, 30))
+    update_account_book(salary_id, date=date(2024, 5, 21))
+    bonus_id = next(record.account_book_id for record in records if record.item_id == "1302")
+    update_account_book(bonus_id, category_id="13", item_id="1301")
+    records = {record.account_book_id: record for record in get_account_books(user_id, date(2024, 1, 1), date(2024, 12, 31))}
+    assert records[salary_id].accounting_date == date(2024, 5, 21)
+    assert records[bonus_id].accounting_date == date(2024, 4, 30)
+
+
+def test_backfill_accounting_date_keeps_updated_at(ledger_metadata):
+    add_account_book(date(2024, 5, 10), "13", "1301", Decimal("8000"))
+    add_account_book(date(2024, 5, 12), "20", "2001", Decimal("12"))
+    with session_scope() as session:
+        session.execute(text("UPDATE account_book SET accounting_date = NULL, updated_at = '2000-01-01 00:00:00'"))
+    with session_scope() as session:
+        backfill_accounting_date(session)
+    with session_scope() as session:
+        rows = session.execute(select(AccountBook.date, AccountBook.accounting_date, AccountBook.updated_at)).all()
+    assert sorted((row.date, row.accounting_date) for row in rows) == [
+        (date(2024, 5, 10), date(2024, 4, 30)),
+        (date(2024, 5, 12), date(2024, 5, 12)),
+    ]
+    assert {row.updated_at for row in rows} == {datetime(2000, 1, 1)}
+
+
+def test_monthly_summary_matches_rebuild_after_mutations(ledger_metadata):
+    rng = random.Random(7)
+    user_ids = list(ledger_metadata)
+    add_account_books([_random_record(rng, user_ids) for _ in range(40)])
+    for _ in range(60):
+        ids = _all_ids()
+        operation = rng.random()
+        if operation < 0.25:
+            record = _random_record(rng, user_ids)
+            add_account_book(
+                record["date"], record["category_id"], record["item_id"], record["expense"],
+                refund=record["refund"], user_id=record["user_id"],
+            )
+        elif operation < 0.75:
+            # 修改日期、分类和项目、金额或用户，包括批量修改
+            targets = rng.sample(ids, rng.randint(1, 3))
+            changes = rng.choice([
+                {"date": date(2024, 1, 1) + timedelta(days=rng.randrange(120))},
+                {"category_id": "13", "item_id": "1301"},
+                {"category_id": "20", "item_id": "2002"},
+                {"expense": Decimal(rng.randrange(100, 100000)) / 100, "refund": Decimal("1.50")},
+                {"user_id": rng.choice(user_ids)},
+                {"remarks": "只改备注"},
+            ])
+            update_account_book(targets, **changes)
+        else:
+            delete_account_book(rng.sample(ids, rng.randint(1, 2)))
+    delete_user(user_ids[1])
+
+    incremental = _summary_snapshot()
+    rebuild_account_book_monthly_summary()
+    assert incremental == _summary_snapshot()
+    assert incremental
+
+
+def test_keyset_pages_match_full_list(ledger_metadata):
+    user_id = ledger_metadata[0]
+    rng = random.Random(3)
+    # 多条账单落在同一天，验证同一记账日期内按账单 ID 翻页
+    add_account_books([
+        {
+            "date": date(2024, 2, 1) + timedelta(days=rng.randrange(10)),
+            "category_id": "20", "item_id": "2001", "expense": Decimal("1"), "user_id": user_id,
+        }
+        for _ in range(23)
+    ])
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    expected = [record.account_book_id for record in get_account_books(user_id, start, end)]
+
+    pages = []
+    cursor = None
+    while True:
+        records, has_more = get_account_books_page(user_id, start, end, page_size=5, after=cursor)
+        pages.append([record.account_book_id for record in records])
+        if not has_more:
+            break
+        cursor = (records[-1].accounting_date, records[-1].account_book_id)
+    assert [account_book_id for page in pages for account_book_id in page] == expected
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+    # 从最后一页向前翻，得到与向后翻相同的页
+    last_page, _ = get_account_books_page(user_id, start, end, page_size=5, after=cursor)
+    previous_page, has_more = get_account_books_page(
+        user_id, start, end, page_size=5, before=(last_page[0].accounting_date, last_page[0].account_book_id)
+    )
+    assert [record.account_book_id for record in previous_page] == pages[-2]
+    assert has_more
+
+
+def test_search_matches_accounting_month(ledger_metadata):
+    user_id = ledger_metadata[0]
+    add_account_book(date(2024, 5, 10), "13", "1301", Decimal("8000"), remarks="五月工资", user_id=user_id)
+    add_account_book(date(2024, 4, 12), "20", "2001", Decimal("12"), user_id=user_id)
+    add_account_book(date(2024, 6, 1), "20", "2002", Decimal("30"), user_id=ledger_metadata[1])
+
+    def found(query):
+        return sorted((record.date, record.item_id) for record in search_account_books(query, user_id=user_id))
+
+    # 提前发放的工资记在四月，按记账月份和实际日期都能搜到
+    assert found("2024-04") == [(date(2024, 4, 12), "2001"), (date(2024, 5, 10), "1301")]
+    assert found("2024-05-10") == [(date(2024, 5, 10), "1301")]
+    assert found("工资") == [(date(2024, 5, 10), "1301")]
+    assert found("20240412") == [(date(2024, 4, 12), "2001")]
+    assert found("2024-06") == []  # 其他用户的账单不出现
@@ -0,0 +1,45 @@
+import pytest
+
+from models.cache import get_table_version
+from models.category_model import add_category, get_all_categories, update_category
+from models.database import session_scope
+
+
+def _names():
+    return sorted(category.name for category in get_all_categories())
+
+
+def test_cache_invalidated_after_commit():
+    add_category("20", "餐饮")
+    version = get_table_version("category")
+    assert _names() == ["餐饮"]
+    # 返回的是缓存结果的拷贝，调用方修改不影响缓存
+    get_all_categories().clear()
+    assert _names() == ["餐饮"]
+
+    update_category("20", name="饮食")
+    assert get_table_version("category") == version + 1
+    assert _names() == ["饮食"]
+
+
+def test_uncommitted_writes_bypass_cache():
+    add_category("20", "餐饮")
+    assert _names() == ["餐饮"]
+    with session_scope():
+        add_category("13", "收入")
+        # 同一事务中的读取能看到尚未提交的写入
+        assert _names() == ["收入", "餐饮"]
+    assert _names() == ["收入", "餐饮"]
+
+
+def test_rollback_keeps_cache_version():
+    add_category("20", "餐饮")
+    assert _names() == ["餐饮"]
+    version = get_table_version("category")
+    with pytest.raises(RuntimeError):
+        with session_scope():
+            add_category("13", "收入")
+            raise RuntimeError
+    # 回滚时不执行失效回调，缓存结果仍然有效
+    assert get_table_version("category") == version
+    assert _names() == ["餐饮"]
@@ -0,0 +1,49 @@
+from sqlalchemy import inspect
+
+from models import database
+from models.database import SCHEMA_VERSION, engine, get_schema_version, init_db, session_scope
+
+
+def _run_init_db(monkeypatch, migrations):
+    """以未初始化的进程状态执行 init_db，只运行给定的迁移"""
+    monkeypatch.setattr(database, "_db_initialized", False)
+    monkeypatch.setattr(database, "_migrations", migrations)
+    init_db()
+
+
+def test_init_db_skips_migrations_when_schema_is_current(monkeypatch):
+    calls = []
+    assert get_schema_version() is None
+    _run_init_db(monkeypatch, [calls.append])
+    assert len(calls) == 1
+    assert get_schema_version() == SCHEMA_VERSION
+
+    # 结构版本已是最新，新进程跳过建表和迁移；同一进程只初始化一次
+    _run_init_db(monkeypatch, [calls.append])
+    init_db()
+    assert len(calls) == 1
+
+    # 数据库中的版本较旧时重新执行迁移并更新版本
+    with session_scope() as session:
+        session.execute(database.SchemaVersion.__table__.update().values(version=SCHEMA_VERSION - 1))
+    _run_init_db(monkeypatch, [calls.append])
+    assert len(calls) == 2
+    assert get_schema_version() == SCHEMA_VERSION
+
+
+def test_migrations_are_registered_in_order():
+    names = [migration.__name__ for migration in database._migrations]
+    # 补列和补索引在各模型的数据迁移之前执行
+    assert names[:2] == ["add_missing_columns", "create_missing_indexes"]
+    assert "drop_fitness_activity_date_unique" in names
+    assert "backfill_accounting_date" in names
+    assert len(names) == len(set(names))
+
+
+def test_add_missing_columns_to_existing_table():
+    with session_scope() as session:
+        session.connection().exec_driver_sql("ALTER TABLE category DROP COLUMN remark")
+    assert "remark" not in {column["name"] for column in inspect(engine).get_columns("category")}
+    with session_scope() as session:
+        database.add_missing_columns(session)
+    assert "remark" in {column["name"] for column in inspect(engine).get_columns("category")}
@@ -0,0 +1,56 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+
+import pyarrow.parquet as pq
+
+from models.account_book_model import add_account_books
+from models.fitness_model import upsert_fitness_records
+from utils.exporter import export_account_books, export_fitness
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_export_account_books_in_batches(ledger_metadata, tmp_path):
+    user_id, other_user_id = ledger_metadata
+    add_account_books(
+        [{"date": date(2024, 5, day), "category_id": "20", "item_id": "2001", "expense": Decimal(day), "user_id": user_id} for day in range(1, 8)]
+        + [{"date": date(2024, 5, 10), "category_id": "13", "item_id": "1301", "expense": Decimal("8000"), "user_id": user_id}]
+        + [{"date": date(2024, 5, 3), "category_id": "20", "item_id": "2002", "expense": Decimal("9"), "user_id": other_user_id}]
+    )
+
+    # 批大小小于行数，验证分批写出的结果完整
+    csv_path = tmp_path / "account_book.csv"
+    assert export_account_books(str(csv_path), user_id=user_id, batch_size=3) == 8
+    rows = _read_csv(csv_path)
+    assert len(rows) == 8
+    assert {row["user_id"] for row in rows} == {user_id}
+    assert sum(Decimal(row["expense"]) for row in rows) == Decimal("8028")
+
+    # 按记账日期过滤：五月十日的工资记在四月
+    parquet_path = tmp_path / "account_book.parquet"
+    assert export_account_books(str(parquet_path), fmt="parquet", user_id=user_id, end=date(2024, 4, 30), batch_size=3) == 1
+    table = pq.read_table(parquet_path)
+    assert table.column("accounting_date").to_pylist() == [date(2024, 4, 30)]
+    assert table.column("expense").to_pylist() == [Decimal("8000.00")]
+
+
+def test_export_fitness(users, tmp_path):
+    upsert_fitness_records([
+        {"activity_date": date(2024, 6, 1), "activities": ["胸部", "有氧"], "status": 1, "user_id": users[0]},
+        {"activity_date": date(2024, 6, 2), "activities": [], "status": 0, "user_id": users[0]},
+        {"activity_date": date(2024, 6, 1), "activities": ["腿部"], "status": 1, "user_id": users[1]},
+    ])
+
+    csv_path = tmp_path / "fitness.csv"
+    assert export_fitness(str(csv_path), user_id=users[0], batch_size=1) == 2
+    rows = sorted(_read_csv(csv_path), key=lambda row: row["activity_date"])
+    assert [json.loads(row["activities"]) for row in rows] == [["胸部", "有氧"], []]
+
+    parquet_path = tmp_path / "fitness.parquet"
+    assert export_fitness(str(parquet_path), fmt="parquet", start=date(2024, 6, 1), end=date(2024, 6, 1)) == 2
+    assert sorted(pq.read_table(parquet_path).column("activities").to_pylist()) == [["胸部", "有氧"], ["腿部"]]
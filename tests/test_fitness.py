@@ -0,0 +1,147 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select, text, update
+
+from models.cache import invalidate_tables
+from models.database import Base, engine, session_scope
+from models.fitness_model import (
+    Fitness, FitnessActivity, backfill_fitness_activity, drop_fitness_activity_date_unique, get_all_fitness,
+    get_fitness_activity_counts, update_fitness, upsert_fitness, upsert_fitness_records,
+)
+from utils.fitness_analytics import TrainingCalendar, calculate_training_frequency, get_training_calendar
+
+
+def _activities_by_fitness_id():
+    with session_scope() as session:
+        rows = session.execute(select(FitnessActivity.fitness_id, FitnessActivity.activity)).all()
+    activities = {}
+    for fitness_id, activity in rows:
+        activities.setdefault(fitness_id, set()).add(activity)
+    return activities
+
+
+def test_upsert_fitness_keeps_one_record_per_user_and_day(users):
+    day = date(2024, 6, 1)
+    upsert_fitness(day, ["胸部", "有氧"], 1, users[0])
+    upsert_fitness(day, ["背部"], 1, users[0])
+    upsert_fitness(day, [], 0, users[1])
+    upsert_fitness_records([
+        {"activity_date": day + timedelta(days=1), "activities": ["腿部"], "status": 1, "user_id": users[0]},
+        {"activity_date": day + timedelta(days=1), "activities": ["手臂"], "status": 1, "user_id": users[0]},
+    ])
+
+    records = {(record.user_id, record.activity_date): record for record in get_all_fitness()}
+    assert len(records) == 3
+    assert records[(users[0], day)].activities == ["背部"]
+    assert records[(users[1], day)].status == 0
+    assert records[(users[0], day + timedelta(days=1))].activities == ["手臂"]
+    # 活动表与 activities 列保持同步
+    assert _activities_by_fitness_id() == {
+        records[(users[0], day)].fitness_id: {"背部"},
+        records[(users[0], day + timedelta(days=1))].fitness_id: {"手臂"},
+    }
+    assert get_fitness_activity_counts(users[0], day, day + timedelta(days=1)) == {"背部": 1, "手臂": 1}
+
+
+def test_upsert_fitness_requires_user(users):
+    # 唯一索引不约束 NULL，未指定用户时每次都会新增一条，因此直接拒绝
+    with pytest.raises(ValueError):
+        upsert_fitness(date(2024, 6, 1), ["胸部"], 1)
+    with pytest.raises(ValueError):
+        upsert_fitness_records([
+            {"activity_date": date(2024, 6, 1), "activities": ["胸部"], "status": 1, "user_id": users[0]},
+            {"activity_date": date(2024, 6, 2), "activities": ["背部"], "status": 1},
+        ])
+    assert get_all_fitness() == []
+
+
+def test_drop_old_activity_date_unique_constraint(users):
+    # 按旧版本的表结构重建 fitness 表：activity_date 全局唯一
+    FitnessActivity.__table__.drop(bind=engine)
+    Fitness.__table__.drop(bind=engine)
+    with session_scope() as session:
+        session.execute(text(
+            "CREATE TABLE fitness (fitness_id CHAR(36) NOT NULL PRIMARY KEY, activity_date DATE NOT NULL UNIQUE, "
+            "activities JSON NOT NULL, status SMALLINT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, "
+            "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, user_id CHAR(36) REFERENCES users (user_id))"
+        ))
+        session.execute(text(
+            "INSERT INTO fitness (fitness_id, activity_date, activities, status, user_id) "
+            "VALUES ('old', '2024-06-01', '[\"有氧\"]', 1, :user_id)"
+        ), {"user_id": users[0]})
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as session:
+        drop_fitness_activity_date_unique(session)
+        backfill_fitness_activity(session)
+
+    # 旧记录和活动行保留，不同用户可以在同一天打卡
+    upsert_fitness(date(2024, 6, 1), ["胸部"], 1, users[1])
+    records = {record.user_id: record for record in get_all_fitness()}
+    assert records[users[0]].fitness_id == "old"
+    assert records[users[1]].activities == ["胸部"]
+    assert _activities_by_fitness_id()["old"] == {"有氧"}
+
+
+def _brute_force_streaks(days, today):
+    """逐日检查的连续天数和最长连续天数"""
+    current = 0
+    day = today if today in days else today - timedelta(days=1)
+    while day in days:
+        current += 1
+        day -= timedelta(days=1)
+    longest = 0
+    for day in days:
+        if day - timedelta(days=1) not in days:
+            length = 1
+            while day + timedelta(days=length) in days:
+                length += 1
+            longest = max(longest, length)
+    return current, longest
+
+
+def test_training_calendar_matches_brute_force():
+    rng = random.Random(11)
+    start = date(2024, 1, 1)
+    today = start + timedelta(days=59)
+    days = {start + timedelta(days=offset) for offset in range(60) if rng.random() < 0.6}
+    calendar = TrainingCalendar(days)
+    for _ in range(300):
+        day = start + timedelta(days=rng.randrange(60))
+        if rng.random() < 0.5:
+            calendar.add(day)
+            days.add(day)
+        else:
+            calendar.remove(day)
+            days.discard(day)
+        current, longest = _brute_force_streaks(days, today)
+        assert calendar.current_streak(today) == current
+        assert calendar.longest_streak == longest
+        window_start = start + timedelta(days=rng.randrange(60))
+        window_end = window_start + timedelta(days=rng.randrange(30))
+        assert calendar.count_between(window_start, window_end) == sum(window_start <= d <= window_end for d in days)
+        assert calendar.weekday_counts == [sum(d.weekday() == weekday for d in days) for weekday in range(7)]
+
+
+def test_training_calendar_follows_writes(users):
+    user_id = users[0]
+    start = date(2024, 6, 1)
+    upsert_fitness_records([
+        {"activity_date": start + timedelta(days=offset), "activities": ["有氧"], "status": 1, "user_id": user_id}
+        for offset in range(3)
+    ])
+    assert calculate_training_frequency(user_id, start, start + timedelta(days=9), today=date(2024, 7, 1))[0] == 3
+
+    # 本进程的写入增量更新已加载的日历
+    calendar = get_training_calendar(user_id)
+    fitness_id = next(record.fitness_id for record in get_all_fitness() if record.activity_date == start)
+    update_fitness(fitness_id, status=0)
+    assert get_training_calendar(user_id) is calendar
+    assert start not in calendar
+
+    # 绕过模型函数的写入在使表版本失效后重新加载
+    with session_scope() as session:
+        session.execute(update(Fitness).where(Fitness.user_id == user_id).values(status=1))
+    invalidate_tables("fitness")
+    assert calculate_training_frequency(user_id, start, start + timedelta(days=9), today=date(2024, 7, 1))[0] == 3
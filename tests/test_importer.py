@@ -0,0 +1,38 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from models.account_book_model import get_account_books, get_all_account_books, summarize_account_books
+from utils.importer import import_account_books_csv
+
+CSV_HEADER = "日期,分类,项目,支出金额,退款金额,备注,用户\n"
+
+
+def test_import_account_books_csv(ledger_metadata):
+    user_id, other_user_id = ledger_metadata
+    csv_text = CSV_HEADER + (
+        "2024-05-10,收入,工资,8000,,五月工资,\n"       # 名称映射为 ID，未指定用户时归属默认用户
+        "2024/05/12,20,2001,12.50,2.50,,李四\n"       # ID 和名称混用、退款
+        "2024-05-13,餐饮,午餐,30,,,\n"
+        "2024-13-01,餐饮,午餐,30,,,\n"                # 日期错误
+        "2024-05-14,餐饮,工资,30,,,\n"                # 项目不属于分类
+        "2024-05-15,餐饮,早餐,abc,,,\n"               # 金额错误
+    )
+    report = import_account_books_csv(io.StringIO(csv_text), chunk_size=2, default_user_id=user_id)
+
+    assert report.rows_read == 6
+    assert report.rows_imported == 3
+    assert [line_number for line_number, _ in report.errors] == [5, 6, 7]
+
+    records = {record.remarks or record.item_id: record for record in get_account_books(user_id, date(2024, 1, 1), date(2024, 12, 31))}
+    assert set(records) == {"五月工资", "2002"}
+    assert records["五月工资"].accounting_date == date(2024, 4, 30)
+    assert records["2002"].amount == Decimal("30.00")
+    other_records = get_account_books(other_user_id, date(2024, 1, 1), date(2024, 12, 31))
+    assert [(record.item_id, record.amount) for record in other_records] == [("2001", Decimal("10.00"))]
+
+    # 导入的账单同步写入月度汇总
+    summary = summarize_account_books(user_id, date(2024, 4, 1), date(2024, 4, 30))
+    assert summary["total_income"] == Decimal("8000.00")
+    assert summarize_account_books(user_id, date(2024, 5, 1), date(2024, 5, 31))["total_expense"] == Decimal("30.00")
+    assert len(get_all_account_books()) == 3
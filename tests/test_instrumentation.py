@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+
+from models.account_book_model import AccountBook, add_account_books, get_all_account_books
+from models.database import collect_query_stats, engine, session_scope
+from utils.instrumentation import DEBUG_ENV, PERF_LOG_ENV, profile_page, show_dataframe
+
+
+@pytest.fixture
+def account_books(ledger_metadata):
+    add_account_books([
+        {"date": date(2024, 5, day), "category_id": "20", "item_id": "2001", "expense": Decimal("1"), "user_id": ledger_metadata[0]}
+        for day in range(1, 6)
+    ])
+
+
+def test_collect_query_stats_counts_statements_and_rows(account_books):
+    with collect_query_stats() as stats:
+        assert len(get_all_account_books()) == 5
+        with session_scope() as session:
+            assert session.execute(select(AccountBook.account_book_id).limit(2)).all()
+    assert stats["query_count"] == 2
+    assert stats["rows"] == 7
+    assert stats["sql_seconds"] > 0
+
+    # 统计结束后不再计数
+    get_all_account_books()
+    assert stats["query_count"] == 2
+
+
+def test_streamed_rows_are_not_buffered(account_books):
+    with collect_query_stats() as stats:
+        with session_scope() as session:
+            result = session.execute(select(AccountBook.account_book_id).execution_options(stream_results=True, yield_per=2))
+            assert [len(partition) for partition in result.partitions()] == [2, 2, 1]
+    assert stats["query_count"] == 1
+    assert stats["rows"] == 0
+
+
+def test_failed_statement_pops_query_timer():
+    with collect_query_stats() as stats:
+        with pytest.raises(Exception):
+            with session_scope() as session:
+                session.execute(text("SELECT * FROM missing_table"))
+        with engine.connect() as connection:
+            assert connection.info["query_start_time"] == []
+            connection.execute(text("SELECT 1"))
+    assert stats["query_count"] == 2
+
+
+def test_profile_page_only_records_when_enabled(monkeypatch, account_books):
+    monkeypatch.delenv(DEBUG_ENV, raising=False)
+    monkeypatch.delenv(PERF_LOG_ENV, raising=False)
+    with profile_page("账单管理") as profile:
+        get_all_account_books()
+    assert profile is None
+
+    monkeypatch.setenv(DEBUG_ENV, "1")
+    df = pd.DataFrame({"金额": [1.5, 2.5], "备注": ["早餐", "午餐"]})
+    with profile_page("账单管理") as profile:
+        get_all_account_books()
+        show_dataframe(df)
+    assert profile["page"] == "账单管理"
+    assert profile["query_count"] == 1
+    assert profile["rows"] == 5
+    assert profile["dataframe_count"] == 1
+    assert profile["dataframe_bytes"] > 0
+    assert profile["total_seconds"] >= profile["python_seconds"]
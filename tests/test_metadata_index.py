@@ -0,0 +1,42 @@
+from models.category_model import add_category, delete_category, update_category
+from models.item_model import add_item, delete_item, update_item
+from models.metadata_index import get_metadata_index
+from models.user_model import delete_user, update_user
+
+
+def test_index_lookups(ledger_metadata):
+    index = get_metadata_index()
+    assert index.category_name("13") == "收入"
+    assert index.item_name("2002") == "午餐"
+    assert index.username(ledger_metadata[1]) == "李四"
+    assert index.category_name("99") == "未知分类"
+    assert [item.item_id for item in index.items_by_category["20"]] == ["2001", "2002"]
+    assert index.user_options["张三"] == ledger_metadata[0]
+    # 没有写入时复用同一个快照
+    assert get_metadata_index() is index
+
+
+def test_index_refreshes_after_writes(ledger_metadata):
+    user_id = ledger_metadata[0]
+    index = get_metadata_index()
+
+    update_category("20", name="饮食")
+    index = get_metadata_index()
+    assert index.category_options == {"收入": "13", "饮食": "20"}
+
+    add_item("2003", "20", "晚餐")
+    update_item("2001", name="早点")
+    delete_item("2002")
+    index = get_metadata_index()
+    assert [item.name for item in index.items_by_category["20"]] == ["早点", "晚餐"]
+    assert index.item_name("2002") == "未知项目"
+
+    add_category("30", "交通")
+    assert get_metadata_index().category_name("30") == "交通"
+    delete_category("30")
+    assert "30" not in get_metadata_index().categories
+
+    update_user(user_id, username="张三丰")
+    assert get_metadata_index().username(user_id) == "张三丰"
+    delete_user(user_id)
+    assert get_metadata_index().user_options == {"李四": ledger_metadata[1]}
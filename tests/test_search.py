@@ -0,0 +1,78 @@
+from datetime import date
+
+from streamlit.testing.v1 import AppTest
+
+from models.category_model import add_category, search_categories
+from models.fitness_model import search_fitness, upsert_fitness_records
+from models.item_model import search_items
+from utils.helpers import parse_date_query
+
+
+def test_parse_date_query():
+    assert parse_date_query("2024-02-29") == (date(2024, 2, 29), date(2024, 2, 29))
+    assert parse_date_query("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert parse_date_query("2024") == (date(2024, 1, 1), date(2024, 12, 31))
+    assert parse_date_query("午餐") is None
+
+
+def test_search_categories_and_items(ledger_metadata):
+    add_category("21", "100%果汁")
+    assert [row.category_id for row in search_categories("")] == ["13", "20", "21"]
+    assert [row.category_id for row in search_categories("2")] == ["20", "21"]  # ID 前缀
+    assert [row.category_id for row in search_categories("餐")] == ["20"]  # 名称包含
+    assert [row.category_id for row in search_categories("%")] == ["21"]  # 通配符按字面匹配
+    assert [row.item_id for row in search_items("13")] == ["1301", "1302"]
+    assert [row.item_id for row in search_items("午")] == ["2002"]
+    assert len(search_items("", limit=3)) == 3
+
+
+def test_search_fitness(users):
+    upsert_fitness_records([
+        {"activity_date": date(2024, 5, 30), "activities": ["胸部"], "status": 1, "user_id": users[0]},
+        {"activity_date": date(2024, 6, 1), "activities": ["有氧", "腿部"], "status": 1, "user_id": users[0]},
+        {"activity_date": date(2024, 6, 2), "activities": [], "status": 0, "user_id": users[0]},
+        {"activity_date": date(2024, 6, 1), "activities": ["有氧"], "status": 1, "user_id": users[1]},
+    ])
+
+    def found(query, **kwargs):
+        return [row.activity_date for row in search_fitness(query, user_id=users[0], **kwargs)]
+
+    # 按日期从新到旧返回，只包含该用户的记录
+    assert found("") == [date(2024, 6, 2), date(2024, 6, 1), date(2024, 5, 30)]
+    assert found("", limit=1) == [date(2024, 6, 2)]
+    assert found("2024-06") == [date(2024, 6, 2), date(2024, 6, 1)]
+    assert found("2024-05-30") == [date(2024, 5, 30)]
+    assert found("有氧") == [date(2024, 6, 1)]
+    fitness_id = search_fitness("2024-05-30", user_id=users[0])[0].fitness_id
+    assert found(fitness_id[:8]) == [date(2024, 5, 30)]
+    assert len(search_fitness("有氧")) == 2
+
+
+def _picker_app(limit):
+    import streamlit as st
+
+    from models.category_model import search_categories
+    from utils.record_picker import record_picker
+
+    st.session_state["picked"] = record_picker(
+        "选择分类", search_categories, "category_id", lambda category: f"{category.name} ({category.category_id})",
+        key="category_select", limit=limit,
+    )
+
+
+def test_record_picker(ledger_metadata):
+    at = AppTest.from_function(_picker_app, args=(2,)).run()
+    # 匹配记录达到 limit 时提示输入更精确的搜索词，下拉列表的值为主键
+    assert at.selectbox(key="category_select").options == ["收入 (13)", "餐饮 (20)"]
+    assert at.caption[0].value.startswith("只显示前 2 条")
+    assert at.session_state["picked"] == "13"
+
+    at.text_input(key="category_select_query").input("餐").run()
+    assert at.selectbox(key="category_select").options == ["餐饮 (20)"]
+    assert not at.caption
+    assert at.session_state["picked"] == "20"
+
+    at.text_input(key="category_select_query").input("不存在").run()
+    assert not at.selectbox
+    assert at.caption[0].value == "没有匹配的记录。"
+    assert at.session_state["picked"] is None
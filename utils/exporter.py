@@ -0,0 +1,156 @@
+import csv
+import json
+
+from sqlalchemy import select
+
+from models.account_book_model import AccountBook
+from models.fitness_model import Fitness
+from models.database import session_scope
+
+# 每批从数据库游标读取并写出的行数
+DEFAULT_BATCH_SIZE = 5000
+
+# 支持的导出格式
+EXPORT_FORMATS = ("csv", "parquet")
+
+# 账单导出列
+ACCOUNT_BOOK_COLUMNS = [
+    AccountBook.account_book_id, AccountBook.date, AccountBook.accounting_date, AccountBook.category_id,
+    AccountBook.item_id, AccountBook.expense, AccountBook.refund, AccountBook.remarks, AccountBook.user_id,
+    AccountBook.created_at, AccountBook.updated_at,
+]
+
+# 健身记录导出列
+FITNESS_COLUMNS = [
+    Fitness.fitness_id, Fitness.activity_date, Fitness.activities, Fitness.status, Fitness.user_id,
+    Fitness.created_at, Fitness.updated_at,
+]
+
+
+def _account_book_arrow_schema(pa):
+    """账单的 Parquet 列类型"""
+    return pa.schema([
+        ("account_book_id", pa.string()),
+        ("date", pa.date32()),
+        ("accounting_date", pa.date32()),
+        ("category_id", pa.string()),
+        ("item_id", pa.string()),
+        ("expense", pa.decimal128(10, 2)),
+        ("refund", pa.decimal128(10, 2)),
+        ("remarks", pa.string()),
+        ("user_id", pa.string()),
+        ("created_at", pa.timestamp("s")),
+        ("updated_at", pa.timestamp("s")),
+    ])
+
+
+def _fitness_arrow_schema(pa):
+    """健身记录的 Parquet 列类型"""
+    return pa.schema([
+        ("fitness_id", pa.string()),
+        ("activity_date", pa.date32()),
+        ("activities", pa.list_(pa.string())),
+        ("status", pa.int8()),
+        ("user_id", pa.string()),
+        ("created_at", pa.timestamp("s")),
+        ("updated_at", pa.timestamp("s")),
+    ])
+
+
+def _write_csv(path, column_names, batches, convert=None):
+    """逐批写出 CSV 文件"""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(column_names)
+        for batch in batches:
+            rows = [convert(row) for row in batch] if convert else batch
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _write_parquet(path, schema, batches):
+    """逐批写出 Parquet 文件，每批一个 row group"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            count += len(batch)
+    return count
+
+
+def _fitness_csv_row(row):
+    """
+    将健身记录转换为 CSV 行：活动列表以 JSON 字符串保存
+    :param row: 按 FITNESS_COLUMNS 顺序的健身记录 (Row)
+    :return: CSV 行 (tuple)
+    """
+    return (*row[:2], json.dumps(row[2], ensure_ascii=False), *row[3:])
+
+
+def _export(stmt, columns, schema_factory, path, fmt, batch_size, convert_csv=None):
+    """按格式流式导出查询结果，返回导出的行数"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("导出 Parquet 需要安装 pyarrow")
+    with session_scope() as session:
+        # 使用服务端游标分批读取，内存占用与表大小无关
+        result = session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+        batches = result.partitions()
+        if fmt == "parquet":
+            return _write_parquet(path, schema_factory(pa), batches)
+        return _write_csv(path, [column.key for column in columns], batches, convert_csv)
+
+
+def export_account_books(path, fmt="csv", user_id=None, start=None, end=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    流式导出账单记录为 CSV 或 Parquet 文件
+    :param path: 导出文件路径 (str)
+    :param fmt: 导出格式，csv 或 parquet (str)
+    :param user_id: 只导出该用户的账单 (str, 可选)
+    :param start: 记账日期起始 (datetime.date, 可选)
+    :param end: 记账日期截止 (datetime.date, 可选)
+    :param batch_size: 每批读取的行数 (int)
+    :return: 导出的行数 (int)
+    """
+    stmt = select(*ACCOUNT_BOOK_COLUMNS)
+    if user_id is not None:
+        stmt = stmt.where(AccountBook.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(AccountBook.accounting_date >= start)
+    if end is not None:
+        stmt = stmt.where(AccountBook.accounting_date <= end)
+    return _export(stmt, ACCOUNT_BOOK_COLUMNS, _account_book_arrow_schema, path, fmt, batch_size)
+
+
+def export_fitness(path, fmt="csv", user_id=None, start=None, end=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    流式导出健身记录为 CSV 或 Parquet 文件
+    :param path: 导出文件路径 (str)
+    :param fmt: 导出格式，csv 或 parquet (str)
+    :param user_id: 只导出该用户的健身记录 (str, 可选)
+    :param start: 健身日期起始 (datetime.date, 可选)
+    :param end: 健身日期截止 (datetime.date, 可选)
+    :param batch_size: 每批读取的行数 (int)
+    :return: 导出的行数 (int)
+    """
+    stmt = select(*FITNESS_COLUMNS)
+    if user_id is not None:
+        stmt = stmt.where(Fitness.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(Fitness.activity_date >= start)
+    if end is not None:
+        stmt = stmt.where(Fitness.activity_date <= end)
+    return _export(stmt, FITNESS_COLUMNS, _fitness_arrow_schema, path, fmt, batch_size, _fitness_csv_row)
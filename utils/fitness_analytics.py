@@ -0,0 +1,227 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from models.cache import DEFAULT_CACHE_TTL, get_table_version
+from models.database import session_scope
+from models.fitness_model import Fitness, on_training_days_changed
+
+# 滚动训练频率的默认窗口（天）
+ROLLING_WINDOWS = (7, 30, 90)
+
+# 星期名称，与 date.weekday() 对应
+WEEKDAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+
+def _weekday(ordinal):
+    """日期序数对应的星期几（0 为周一），公元 1 年 1 月 1 日（序数 1）是周一"""
+    return (ordinal - 1) % 7
+
+
+class TrainingCalendar:
+    """
+    单个用户的训练日历：按序数（date.toordinal）升序保存已健身的日期。
+    区间计数、连续天数查询为 O(log n)，星期分布为 O(1)，增删一天时增量维护。
+    """
+
+    def __init__(self, days=()):
+        self.days = sorted({day.toordinal() for day in days})  # 已健身日期的序数，升序且不重复
+        self.weekday_counts = [0] * 7  # 每个星期几的训练天数，下标与 date.weekday() 一致
+        for ordinal in self.days:
+            self.weekday_counts[_weekday(ordinal)] += 1
+        self._longest = None  # 最长连续天数缓存，None 表示需要重新计算
+
+    def __len__(self):
+        return len(self.days)
+
+    def __contains__(self, day):
+        ordinal = day.toordinal()
+        index = bisect_left(self.days, ordinal)
+        return index < len(self.days) and self.days[index] == ordinal
+
+    def add(self, day):
+        """记录一天已健身"""
+        if day in self:
+            return
+        ordinal = day.toordinal()
+        insort(self.days, ordinal)
+        self.weekday_counts[_weekday(ordinal)] += 1
+        if self._longest is not None:
+            self._longest = max(self._longest, self._run_length(bisect_left(self.days, ordinal)))
+
+    def remove(self, day):
+        """取消一天的已健身记录"""
+        if day not in self:
+            return
+        ordinal = day.toordinal()
+        index = bisect_left(self.days, ordinal)
+        # 被拆开的连续段恰好是最长段时，最长连续天数需要重新计算
+        if self._longest is not None and self._run_length(index) == self._longest:
+            self._longest = None
+        del self.days[index]
+        self.weekday_counts[_weekday(ordinal)] -= 1
+
+    def _run_bounds(self, index):
+        """
+        返回包含 days[index] 的连续段的首尾下标。
+        连续段内 days[i] - i 相等，且 days[i] - i 随 i 单调不减，因此可以二分查找。
+        """
+        key = self.days[index] - index
+        low, high = 0, index
+        while low < high:
+            middle = (low + high) // 2
+            if self.days[middle] - middle == key:
+                high = middle
+            else:
+                low = middle + 1
+        start = low
+        low, high = index, len(self.days) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.days[middle] - middle == key:
+                low = middle
+            else:
+                high = middle - 1
+        return start, low
+
+    def _run_length(self, index):
+        start, end = self._run_bounds(index)
+        return end - start + 1
+
+    def count_between(self, start, end):
+        """
+        统计日期区间内的训练天数
+        :param start: 开始日期 (datetime.date)
+        :param end: 结束日期 (datetime.date)
+        :return: 训练天数 (int)
+        """
+        return bisect_right(self.days, end.toordinal()) - bisect_left(self.days, start.toordinal())
+
+    def current_streak(self, today=None):
+        """
+        当前连续训练天数：今天已训练时截止到今天，今天尚未训练时截止到昨天
+        :param today: 当前日期 (datetime.date, 默认今天)
+        :return: 连续天数 (int)
+        """
+        today = today or date.today()
+        for day in (today, today - timedelta(days=1)):
+            if day in self:
+                index = bisect_left(self.days, day.toordinal())
+                start, _ = self._run_bounds(index)
+                return index - start + 1
+        return 0
+
+    @property
+    def longest_streak(self):
+        """最长连续训练天数"""
+        if self._longest is None:
+            longest = current = 0
+            previous = None
+            for ordinal in self.days:
+                current = current + 1 if previous is not None and ordinal == previous + 1 else 1
+                longest = max(longest, current)
+                previous = ordinal
+            self._longest = longest
+        return self._longest
+
+    def rolling_frequency(self, window, today=None):
+        """
+        最近 window 天（含今天）的训练频率
+        :param window: 窗口天数 (int)
+        :param today: 当前日期 (datetime.date, 默认今天)
+        :return: 训练频率 (float)
+        """
+        today = today or date.today()
+        return self.count_between(today - timedelta(days=window - 1), today) / window
+
+
+# 进程内的训练日历缓存：{用户 ID: (过期时间, fitness 表版本, TrainingCalendar)}，首次查询时从数据库加载。
+# 本进程的健身记录写入会增量更新日历；其他进程（manage.py、其他 worker）的写入和未通知日历的写入
+# 由表版本号和有效期兜底，版本号变化或过期后重新加载
+_calendars = {}
+# 可重入锁：调用方在持有锁时获取日历并读取，避免读取期间被其他线程增量修改
+_calendars_lock = threading.RLock()
+
+
+def get_training_calendar(user_id):
+    """
+    获取用户的训练日历，缓存不存在、已过期或 fitness 表有未同步的写入时从数据库加载该用户所有已健身的日期。
+    返回的日历会被其他线程增量修改，读取时需持有 _calendars_lock
+    :param user_id: 用户 ID (str)
+    :return: 训练日历 (TrainingCalendar)
+    """
+    with _calendars_lock:
+        now = time.monotonic()
+        version = get_table_version("fitness")
+        entry = _calendars.get(user_id)
+        if entry is not None and entry[0] > now and entry[1] == version:
+            return entry[2]
+        with session_scope() as session:
+            days = session.execute(
+                select(Fitness.activity_date).where(Fitness.user_id == user_id, Fitness.status == 1)
+            ).scalars().all()
+        calendar = TrainingCalendar(days)
+        _calendars[user_id] = (now + DEFAULT_CACHE_TTL, version, calendar)
+        return calendar
+
+
+@on_training_days_changed
+def _apply_training_day_changes(changes):
+    """
+    健身记录提交后增量更新已加载的训练日历。
+    同一次提交已先使 fitness 表版本号加 1，日历只在版本号恰好是这次提交带来的变化时同步版本号，
+    期间还有其他写入时保留旧版本号，下次读取时重新加载
+    """
+    with _calendars_lock:
+        version = get_table_version("fitness")
+        for user_id, activity_date, trained in changes:
+            entry = _calendars.get(user_id)
+            if entry is None:
+                continue  # 尚未加载的用户在首次查询时从数据库读取
+            expires_at, calendar_version, calendar = entry
+            if trained:
+                calendar.add(activity_date)
+            else:
+                calendar.remove(activity_date)
+            if version - calendar_version in (0, 1):
+                _calendars[user_id] = (expires_at, version, calendar)
+
+
+def calculate_training_frequency(user_id, start, end, today=None):
+    """
+    计算时间范围内的训练频率；范围包含今天时只统计到今天
+    :param user_id: 用户 ID (str)
+    :param start: 开始日期 (datetime.date)
+    :param end: 结束日期 (datetime.date)
+    :param today: 当前日期 (datetime.date, 默认今天)
+    :return: (训练天数, 总天数, 训练频率) (tuple of int, int, float)
+    """
+    today = today or date.today()
+    if start <= today <= end:
+        end = today
+    with _calendars_lock:
+        training_days = get_training_calendar(user_id).count_between(start, end)
+    total_days = (end - start).days + 1
+    training_frequency = training_days / total_days if total_days > 0 else 0
+    return training_days, total_days, training_frequency
+
+
+def get_fitness_stats(user_id, today=None):
+    """
+    获取用户的连续训练和滚动频率统计
+    :param user_id: 用户 ID (str)
+    :param today: 当前日期 (datetime.date, 默认今天)
+    :return: 统计结果 (dict)，包含 current_streak、longest_streak、
+             rolling_frequency（{窗口天数: 频率}）和 weekday_counts（{星期名称: 训练天数}）
+    """
+    with _calendars_lock:
+        calendar = get_training_calendar(user_id)
+        return {
+            "current_streak": calendar.current_streak(today),
+            "longest_streak": calendar.longest_streak,
+            "rolling_frequency": {window: calendar.rolling_frequency(window, today) for window in ROLLING_WINDOWS},
+            "weekday_counts": dict(zip(WEEKDAY_NAMES, calendar.weekday_counts)),
+        }
@@ -0,0 +1,60 @@
+from calendar import monthrange
+from datetime import date, datetime
+
+# 搜索选择器最多返回的匹配记录数
+SEARCH_LIMIT = 20
+
+
+def get_period_bounds(year, month=None):
+    """
+    获取年或月的起止日期
+    :param year: 年份 (int)
+    :param month: 月份 (int, 可选)，为空时返回整年
+    :return: (开始日期, 结束日期) (tuple of datetime.date)
+    """
+    if month is None:
+        return date(year, 1, 1), date(year, 12, 31)
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def get_recent_months(count, today=None):
+    """
+    获取截止到当前月份的最近若干个自然月（按时间升序）
+    :param count: 月份数量 (int)
+    :param today: 当前日期 (datetime.date, 默认今天)
+    :return: ["YYYY-MM", ...] (list of str)
+    """
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1  # 以月为单位的序号
+    return [f"{i // 12}-{i % 12 + 1:02d}" for i in range(index - count + 1, index + 1)]
+
+
+def get_month_bounds(start_month, end_month):
+    """
+    获取月份区间的起止日期
+    :param start_month: 开始月份 (str, YYYY-MM)
+    :param end_month: 结束月份 (str, YYYY-MM)
+    :return: (开始日期, 结束日期) (tuple of datetime.date)
+    """
+    start_year, start_month_num = map(int, start_month.split("-"))
+    end_year, end_month_num = map(int, end_month.split("-"))
+    return get_period_bounds(start_year, start_month_num)[0], get_period_bounds(end_year, end_month_num)[1]
+
+
+def parse_date_query(text):
+    """
+    将搜索词解析为日期区间：YYYY-MM-DD 为当天，YYYY-MM 为当月，YYYY 为当年
+    :param text: 搜索词 (str)
+    :return: (开始日期, 结束日期) (tuple of datetime.date)，不是日期时返回 None
+    """
+    for fmt in ("%Y-%m-%d", "%Y-%m", "%Y"):
+        try:
+            parsed = datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+        if fmt == "%Y-%m-%d":
+            return parsed, parsed
+        if fmt == "%Y-%m":
+            return get_period_bounds(parsed.year, parsed.month)
+        return get_period_bounds(parsed.year)
+    return None
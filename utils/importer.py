@@ -0,0 +1,211 @@
+import csv
+import io
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from models.account_book_model import add_account_books
+from models.metadata_index import get_metadata_index
+
+# 每批导入的行数：每批一个事务、一次 executemany
+DEFAULT_CHUNK_SIZE = 5000
+
+# CSV 表头别名，银行流水等其他格式可以通过 column_map 参数补充
+COLUMN_ALIASES = {
+    "date": ["日期", "账单日期", "交易日期", "date"],
+    "category": ["分类", "分类ID", "category", "category_id"],
+    "item": ["项目", "项目ID", "item", "item_id"],
+    "expense": ["支出金额", "金额", "实际金额", "expense", "amount"],
+    "refund": ["退款金额", "退款", "refund"],
+    "remarks": ["备注", "摘要", "remarks", "remark"],
+    "user": ["用户", "用户名", "user", "user_id", "username"],
+}
+
+# 支持的日期格式
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%Y%m%d", "%Y.%m.%d"]
+
+
+class ImportReport:
+    """账单导入结果：读取行数、成功行数、逐行错误和耗时"""
+
+    def __init__(self):
+        self.rows_read = 0  # 读取的数据行数
+        self.rows_imported = 0  # 成功导入的行数
+        self.errors = []  # [(行号, 错误信息), ...]
+        self.elapsed = 0.0  # 耗时（秒）
+
+    @property
+    def rows_per_second(self):
+        """导入速度（行/秒）"""
+        return self.rows_imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"读取 {self.rows_read} 行，导入 {self.rows_imported} 行，失败 {len(self.errors)} 行，"
+            f"耗时 {self.elapsed:.2f} 秒（{self.rows_per_second:.0f} 行/秒）"
+        )
+
+
+def _parse_date(value):
+    """解析日期字符串"""
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的日期: {value}")
+
+
+def _parse_amount(value, field_name):
+    """解析金额字符串，允许千分位和货币符号"""
+    value = (value or "").strip().replace(",", "").replace("¥", "").replace("￥", "")
+    if not value:
+        return Decimal("0.00")
+    try:
+        return Decimal(value).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"无法识别的{field_name}: {value}")
+
+
+def _resolve_columns(fieldnames, column_map=None):
+    """
+    将 CSV 表头映射到标准字段
+    :param fieldnames: CSV 表头 (list of str)
+    :param column_map: 额外的表头映射 {标准字段: CSV 表头} (dict, 可选)
+    :return: {标准字段: CSV 表头} (dict)
+    """
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        if column_map and field in column_map:
+            columns[field] = column_map[field]
+            continue
+        for alias in aliases:
+            if alias in fieldnames:
+                columns[field] = alias
+                break
+    missing = [field for field in ("date", "category", "item", "expense") if field not in columns]
+    if missing:
+        raise ValueError(f"CSV 缺少必需的列: {', '.join(missing)}")
+    return columns
+
+
+class _MetadataLookup:
+    """分类、项目和用户的名称/ID 到 ID 的映射，导入开始时由内存索引构建一次"""
+
+    def __init__(self):
+        metadata = get_metadata_index()
+        categories = metadata.categories.values()
+        items = metadata.items.values()
+        users = metadata.users.values()
+        self.categories = {c.category_id: c.category_id for c in categories}
+        self.categories.update({c.name: c.category_id for c in categories})
+        self.items = {i.item_id: i for i in items}
+        self.items_by_name = {}
+        for item in items:
+            self.items_by_name.setdefault((item.category_id, item.name), item)
+            self.items_by_name.setdefault((None, item.name), item)
+        self.users = {u.user_id: u.user_id for u in users}
+        self.users.update({u.username: u.user_id for u in users})
+
+    def category_id(self, value):
+        category_id = self.categories.get(value.strip())
+        if category_id is None:
+            raise ValueError(f"分类不存在: {value}")
+        return category_id
+
+    def item(self, value, category_id):
+        value = value.strip()
+        item = self.items.get(value) or self.items_by_name.get((category_id, value)) or self.items_by_name.get((None, value))
+        if item is None:
+            raise ValueError(f"项目不存在: {value}")
+        return item
+
+    def user_id(self, value, default_user_id):
+        value = (value or "").strip()
+        if not value:
+            return default_user_id
+        user_id = self.users.get(value)
+        if user_id is None:
+            raise ValueError(f"用户不存在: {value}")
+        return user_id
+
+
+def _parse_row(row, columns, lookup, default_user_id):
+    """将一行 CSV 转换为 add_account_books 的账单字典"""
+    category_id = lookup.category_id(row[columns["category"]] or "")
+    item = lookup.item(row[columns["item"]] or "", category_id)
+    if item.category_id != category_id:
+        raise ValueError(f"项目 {item.name} 不属于分类 {row[columns['category']]}")
+    return {
+        "date": _parse_date(row[columns["date"]] or ""),
+        "category_id": category_id,
+        "item_id": item.item_id,
+        "expense": _parse_amount(row[columns["expense"]], "支出金额"),
+        "refund": _parse_amount(row.get(columns.get("refund", ""), ""), "退款金额"),
+        "remarks": (row.get(columns.get("remarks", ""), "") or "").strip()[:255],
+        "user_id": lookup.user_id(row.get(columns.get("user", ""), ""), default_user_id),
+    }
+
+
+def _flush_chunk(chunk, report):
+    """在一个事务中写入一批账单，失败时整批回滚并记录错误"""
+    if not chunk:
+        return
+    try:
+        add_account_books([record for _, record in chunk])
+        report.rows_imported += len(chunk)
+    except Exception as e:
+        report.errors.append((chunk[0][0], f"第 {chunk[0][0]}-{chunk[-1][0]} 行写入失败: {e}"))
+
+
+def import_account_books_csv(source, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8-sig", column_map=None,
+                             default_user_id=None, progress=None):
+    """
+    流式导入 CSV 账单：分批读取，名称映射为 ID，批量分配账单 ID，每批一个事务、一次 executemany
+    :param source: CSV 文件路径 (str) 或文件对象（文本或二进制）
+    :param chunk_size: 每批导入的行数 (int)
+    :param encoding: 文件编码 (str)
+    :param column_map: 额外的表头映射 {标准字段: CSV 表头} (dict, 可选)
+    :param default_user_id: 未指定用户的行使用的用户 ID (str, 可选)
+    :param progress: 每批完成后的回调，参数为 ImportReport (callable, 可选)
+    :return: 导入结果 (ImportReport)
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+
+    if isinstance(source, str):
+        file = open(source, newline="", encoding=encoding)
+    elif isinstance(source, io.TextIOBase):
+        file = source
+    else:
+        file = io.TextIOWrapper(source, encoding=encoding, newline="")
+
+    try:
+        reader = csv.DictReader(file)
+        columns = _resolve_columns(reader.fieldnames or [], column_map)
+        lookup = _MetadataLookup()
+
+        chunk = []
+        for row in reader:
+            report.rows_read += 1
+            line_number = reader.line_num
+            try:
+                chunk.append((line_number, _parse_row(row, columns, lookup, default_user_id)))
+            except (ValueError, KeyError) as e:
+                report.errors.append((line_number, str(e)))
+            if len(chunk) >= chunk_size:
+                _flush_chunk(chunk, report)
+                chunk = []
+                report.elapsed = time.perf_counter() - started
+                if progress:
+                    progress(report)
+        _flush_chunk(chunk, report)
+    finally:
+        if isinstance(source, str):
+            file.close()
+
+    report.elapsed = time.perf_counter() - started
+    if progress:
+        progress(report)
+    return report
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+import pyarrow as pa
+import streamlit as st
+
+from models.database import collect_query_stats
+
+# 设置 ROUTINE_DEBUG=1 或在 URL 中加 ?debug=1 时在侧边栏显示性能面板
+DEBUG_ENV = "ROUTINE_DEBUG"
+
+# 设置 ROUTINE_PERF_LOG 时把每次重新运行的指标以 JSON 行写入该文件，"-" 表示写到标准错误输出
+PERF_LOG_ENV = "ROUTINE_PERF_LOG"
+
+logger = logging.getLogger("routine.perf")
+
+# 当前重新运行正在记录的页面指标（None 表示未开启记录）
+_page_profile = ContextVar("routine_page_profile", default=None)
+
+
+def _configure_logger():
+    """按 ROUTINE_PERF_LOG 配置 JSON 日志输出，只配置一次"""
+    if logger.handlers:
+        return
+    target = os.environ.get(PERF_LOG_ENV)
+    if not target:
+        logger.addHandler(logging.NullHandler())
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == "-" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))  # 每行一个 JSON 对象
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def debug_enabled():
+    """是否显示侧边栏性能面板"""
+    return os.environ.get(DEBUG_ENV, "").lower() in ("1", "true", "yes", "on") or st.query_params.get("debug") == "1"
+
+
+def profiling_enabled():
+    """是否记录页面指标：显示性能面板或写入 JSON 日志时才记录，否则不产生任何额外开销"""
+    return bool(os.environ.get(PERF_LOG_ENV)) or debug_enabled()
+
+
+def record_dataframe(df):
+    """
+    记录一个将要发送到前端的 DataFrame 的大小（未开启记录时不做任何事）
+    st.dataframe 以 Arrow 格式发送数据，因此记录转换为 Arrow 表后的大小，而不是 pandas 的内存占用
+    :param df: 数据 (pandas.DataFrame)
+    """
+    profile = _page_profile.get()
+    if profile is None:
+        return
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # 与 Streamlit 一致：无法直接转换的混合类型列按字符串发送
+        table = pa.Table.from_pandas(df.astype({column: str for column in df.select_dtypes("object").columns}))
+    profile["dataframe_bytes"] += table.nbytes
+    profile["dataframe_count"] += 1
+
+
+def show_dataframe(df, **kwargs):
+    """
+    显示 DataFrame，开启记录时同时记录其大小，参数与 st.dataframe 相同
+    :param df: 数据 (pandas.DataFrame)
+    """
+    if _page_profile.get() is not None:
+        record_dataframe(df)
+    return st.dataframe(df, **kwargs)
+
+
+@contextmanager
+def profile_page(page_name):
+    """
+    记录一次页面运行的指标：SQL 语句数、SQL 耗时、返回行数、Python 处理耗时和 DataFrame 大小，
+    结束后写入 JSON 日志；未开启性能面板和 JSON 日志时不记录
+    用法：
+        with profile_page("账单管理") as profile:
+            account_book_management_page()
+    :param page_name: 页面名称 (str)
+    :return: 页面指标 (dict)，with 块结束后补全耗时；未开启记录时为 None
+    """
+    if not profiling_enabled():
+        yield None
+        return
+    _configure_logger()
+    profile = {
+        "page": page_name,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "dataframe_count": 0,
+        "dataframe_bytes": 0,
+    }
+    token = _page_profile.set(profile)
+    started = time.perf_counter()
+    try:
+        with collect_query_stats() as query_stats:
+            yield profile
+    finally:
+        _page_profile.reset(token)
+        profile.update(query_stats)
+        profile["total_seconds"] = time.perf_counter() - started
+        # 扣除 SQL 耗时后剩余的部分，主要是 Python 端的聚合和构建页面
+        profile["python_seconds"] = max(profile["total_seconds"] - profile["sql_seconds"], 0.0)
+        logger.info(json.dumps(profile, ensure_ascii=False))
+
+
+def profiled_fragment(func):
+    """
+    代替 st.fragment 装饰页面片段：整页运行时片段的指标计入所在页面；
+    片段单独重新运行时（筛选、翻页、侧边栏表单等交互）单独记录一次，名称为 "模块名.函数名"，
+    开启性能面板时显示在片段末尾（片段只能写入自己的容器，无法更新侧边栏的页面面板）
+    用法：
+        @profiled_fragment
+        def _account_book_ledger(user_id): ...
+    :param func: 片段函数 (callable)
+    :return: 片段 (callable)
+    """
+    fragment_name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        if _page_profile.get() is not None:
+            return func(*args, **kwargs)
+        with profile_page(fragment_name) as profile:
+            result = func(*args, **kwargs)
+        if profile is not None and debug_enabled():
+            render_debug_panel(profile, st)
+        return result
+
+    return st.fragment(run)
+
+
+def render_debug_panel(profile, container):
+    """
+    在指定容器中显示一次运行的指标
+    :param profile: profile_page 记录的指标 (dict)
+    :param container: 显示位置，如 st.sidebar 或 st（当前容器）
+    """
+    with container.expander("性能面板", expanded=True):
+        st.caption(f"{profile['page']} · {profile['started_at']}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("总耗时", f"{profile['total_seconds'] * 1000:.0f} ms")
+            st.metric("SQL 语句数", profile["query_count"])
+            st.metric("返回行数", profile["rows"])
+        with col2:
+            st.metric("SQL 耗时", f"{profile['sql_seconds'] * 1000:.0f} ms")
+            st.metric("Python 耗时", f"{profile['python_seconds'] * 1000:.0f} ms")
+            st.metric("表格数据", f"{profile['dataframe_bytes'] / 1024:.1f} KB")
+
+
+def render_debug_sidebar(profile):
+    """
+    在侧边栏显示本次页面运行的指标
+    :param profile: profile_page 记录的页面指标 (dict)
+    """
+    render_debug_panel(profile, st.sidebar)
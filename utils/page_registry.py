@@ -0,0 +1,25 @@
+# 应用的页面表，app.py 据此注册导航，benchmarks/page_latency.py 据此逐个驱动页面。
+# {导航分组: [(page 包下的模块名, 页面函数名, 页面标题), ...]}，url_path 与页面函数名相同
+PAGE_GROUPS = {
+    "图表": [
+        ("routine_dashboard", "routine_dashboard_page", "图表分析"),
+    ],
+    "主数据": [
+        ("fitness_management", "fitness_management_page", "健身管理"),
+        ("account_book_management", "account_book_management_page", "账单管理"),
+    ],
+    "元数据": [
+        ("user_management", "user_management_page", "用户管理"),
+        ("category_management", "category_management_page", "分类管理"),
+        ("item_management", "item_management_page", "分类项目管理"),
+    ],
+}
+
+
+def iter_pages():
+    """
+    按导航顺序遍历所有页面
+    :return: (模块名, 页面函数名, 页面标题) 的迭代器
+    """
+    for pages in PAGE_GROUPS.values():
+        yield from pages
@@ -0,0 +1,30 @@
+import streamlit as st
+
+from utils.helpers import SEARCH_LIMIT
+
+
+def record_picker(label, search, id_field, format_record, key, placeholder="", limit=SEARCH_LIMIT, **search_kwargs):
+    """
+    可搜索的记录选择器：输入搜索词后由数据库返回前 limit 条匹配记录，下拉列表的值为主键
+    用法：
+        account_book_id = record_picker(
+            "选择要删除的账单记录", search_account_books, "account_book_id",
+            lambda book: f"{book.date} ({book.account_book_id})", key="delete_account_book_select", user_id=user_id
+        )
+    :param label: 下拉列表标题 (str)
+    :param search: 搜索函数 (callable)，参数为 (搜索词, limit=..., **search_kwargs)，返回 Row 列表
+    :param id_field: 主键列名 (str)
+    :param format_record: 记录的显示文本 (callable)
+    :param key: 下拉列表的 key (str)，搜索框使用 f"{key}_query"
+    :param placeholder: 搜索框提示 (str)
+    :param limit: 最多显示的匹配记录数 (int)
+    :return: 选中记录的主键 (str)，没有匹配记录时返回 None
+    """
+    query = st.text_input("搜索", key=f"{key}_query", placeholder=placeholder)
+    records = {getattr(record, id_field): record for record in search(query, limit=limit, **search_kwargs)}
+    if not records:
+        st.caption("没有匹配的记录。")
+        return None
+    if len(records) == limit:
+        st.caption(f"只显示前 {limit} 条匹配记录，请输入更精确的搜索词。")
+    return st.selectbox(label, list(records), format_func=lambda record_id: format_record(records[record_id]), key=key)
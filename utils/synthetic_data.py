@@ -0,0 +1,132 @@
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from models.account_book_model import add_account_books, INCOME_CATEGORY_ID
+from models.cache import invalidate_on_commit
+from models.category_model import add_category
+from models.database import session_scope
+from models.fitness_model import upsert_fitness_records
+from models.item_model import add_item
+from models.metadata_index import get_metadata_index
+from models.user_model import User
+
+# 每批写入的行数：每批一个事务、一次 executemany
+DEFAULT_CHUNK_SIZE = 10000
+
+# 模拟健身活动，与健身管理页面的选项一致
+FITNESS_ACTIVITIES = ["胸部", "背部", "手臂", "肩部", "腹部", "腿部", "有氧"]
+
+# 收入账单占全部账单的比例
+INCOME_RATIO = 0.05
+
+# 已健身的天数占比
+TRAINING_RATIO = 0.6
+
+
+def _days(start, end):
+    """逐日遍历 [start, end]"""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+def _chunks(rows, chunk_size):
+    """把生成器按 chunk_size 分批"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_synthetic_data(account_book_rows, users=3, categories=8, items_per_category=6, years=3,
+                            seed=42, end=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    向空数据库写入可复现的模拟数据（相同参数生成相同数据）：用户、分类和项目，
+    最近 years 年内均匀分布的账单，以及每个用户每天一条健身记录
+    :param account_book_rows: 账单行数 (int)
+    :param users: 用户数量 (int)
+    :param categories: 支出分类数量 (int)，另有一个收入分类
+    :param items_per_category: 每个分类的项目数量 (int)
+    :param years: 数据覆盖的年数 (int)
+    :param seed: 随机数种子 (int)
+    :param end: 最后一天 (datetime.date, 默认今天)
+    :param chunk_size: 每批写入的行数 (int)
+    :param progress: 每批写入后调用的回调 (callable, 可选)，参数为 (表名, 已写入行数)
+    :return: 每张表写入的行数 (dict)
+    """
+    if get_metadata_index().users:
+        raise ValueError("数据库中已有用户，请使用空数据库生成模拟数据")
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=365 * years - 1)
+    total_days = (end - start).days + 1
+
+    # 用户：ID 由随机数种子生成，保证可复现
+    user_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(users)]
+    with session_scope() as session:
+        invalidate_on_commit(session, "users")
+        session.execute(User.__table__.insert(), [
+            {"user_id": user_id, "username": f"用户{index + 1}", "password": "password", "email": f"user{index + 1}@example.com"}
+            for index, user_id in enumerate(user_ids)
+        ])
+
+    # 分类和项目：项目 ID 为分类 ID + 两位序号，收入分类的第一个项目即工资项目（1301）
+    expense_categories = [str(20 + index) for index in range(categories)]
+    category_items = {
+        category_id: [f"{category_id}{number:02d}" for number in range(1, items_per_category + 1)]
+        for category_id in [INCOME_CATEGORY_ID] + expense_categories
+    }
+    metadata = get_metadata_index()
+    for category_id, item_ids in category_items.items():
+        if category_id not in metadata.categories:
+            add_category(category_id, "收入" if category_id == INCOME_CATEGORY_ID else f"分类{category_id}")
+        for item_id in item_ids:
+            if item_id not in metadata.items:
+                add_item(item_id, category_id, f"项目{item_id}")
+
+    def account_book_records():
+        for _ in range(account_book_rows):
+            record_date = start + timedelta(days=rng.randrange(total_days))
+            if rng.random() < INCOME_RATIO:
+                category_id = INCOME_CATEGORY_ID
+                expense = Decimal(rng.randrange(500000, 2000000)) / 100
+            else:
+                category_id = rng.choice(expense_categories)
+                expense = Decimal(rng.randrange(100, 50000)) / 100
+            yield {
+                "date": record_date,
+                "category_id": category_id,
+                "item_id": rng.choice(category_items[category_id]),
+                "expense": expense,
+                "refund": Decimal(rng.randrange(100, 1000)) / 100 if rng.random() < 0.02 else None,
+                "remarks": None,
+                "user_id": rng.choice(user_ids),
+            }
+
+    def fitness_records():
+        for activity_date in _days(start, end):
+            for user_id in user_ids:
+                trained = rng.random() < TRAINING_RATIO
+                yield {
+                    "user_id": user_id,
+                    "activity_date": activity_date,
+                    "activities": rng.sample(FITNESS_ACTIVITIES, rng.randint(1, 3)) if trained else [],  # 与页面打卡一致：未健身时活动为空
+                    "status": 1 if trained else 0,
+                }
+
+    counts = {"users": len(user_ids), "account_book": 0, "fitness": 0}
+    for chunk in _chunks(account_book_records(), chunk_size):
+        add_account_books(chunk)
+        counts["account_book"] += len(chunk)
+        if progress:
+            progress("account_book", counts["account_book"])
+    for chunk in _chunks(fitness_records(), chunk_size):
+        counts["fitness"] += upsert_fitness_records(chunk)
+        if progress:
+            progress("fitness", counts["fitness"])
+    return counts